@@ -1,10 +1,22 @@
-"""Conditionally configure runtime typechecking."""
+"""Conditionally configure runtime typechecking.
 
+The checked modules can be scoped with comma-separated module or package names in the
+`RUNTIME_TYPE_CHECKING_INCLUDE` and `RUNTIME_TYPE_CHECKING_EXCLUDE` environment variables (or with the `_CALCIPY`
+suffix) or with `{"runtime_type_checking": {"include": [...], "exclude": [...]}}` in `.calcipy.json`. Excluding a
+package also excludes all of its submodules, so hot modules can skip the import hook entirely.
+
+"""
+
+from __future__ import annotations
+
+import json
 from contextlib import suppress
 from datetime import datetime, timezone
 from enum import Enum
 from os import getenv
-from warnings import filterwarnings
+from pathlib import Path
+from typing import Any
+from warnings import filterwarnings, warn
 
 from typing_extensions import Self
 
@@ -36,19 +48,60 @@ class _RuntimeTypeCheckingModes(Enum):
             raise ValueError(msg) from None
 
 
+def _split_names(value: str) -> list[str]:
+    """Split a comma-separated list of module names."""
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+def runtime_type_checking_scope(config_path: Path = Path('.calcipy.json')) -> tuple[list[str], list[str]]:
+    """Return the module names to include and exclude from runtime type checking.
+
+    Environment variables take precedence over `.calcipy.json`. When not configured, the whole package is included.
+    Invalid values in `.calcipy.json` are replaced by the default scope with a warning rather than failing the import.
+
+    Returns:
+        Tuple of the included and the excluded module names
+
+    """
+    config: Any = {}
+    with suppress(OSError, ValueError, AttributeError):
+        config = json.loads(config_path.read_text(encoding='utf-8')).get('runtime_type_checking') or {}
+    if not isinstance(config, dict):
+        warn(f'Ignoring "runtime_type_checking" in {config_path}, which must be an object: {config!r}', stacklevel=2)
+        config = {}
+
+    def _get(key: str) -> list[str]:
+        env_value = getenv(f'RUNTIME_TYPE_CHECKING_{key.upper()}') or getenv(
+            f'RUNTIME_TYPE_CHECKING_{key.upper()}_{NAME}',
+        )
+        value = env_value or config.get(key) or []
+        if isinstance(value, str):
+            return _split_names(value)
+        if isinstance(value, list) and all(isinstance(name, str) for name in value):
+            return value
+        msg = f'Ignoring "runtime_type_checking.{key}" in {config_path}, which must be a string or list of strings'
+        warn(f'{msg}: {value!r}', stacklevel=3)
+        return []
+
+    return _get('include') or [NAME.lower()], _get('exclude')
+
+
 def configure_runtime_type_checking_mode() -> None:  # pragma: no cover
-    """Optionally configure runtime type checking mode globally."""
+    """Optionally configure runtime type checking mode for the configured modules."""
     rtc_mode = _RuntimeTypeCheckingModes.from_environment()
 
     if rtc_mode is not _RuntimeTypeCheckingModes.OFF:
         with suppress(ImportError, ModuleNotFoundError):
-            # Requires beartype >=0.15.0 and Python >= 3.8
+            # 'claw_skip_package_names' requires the minimum beartype version from pyproject.toml
             from beartype import BeartypeConf  # noqa: PLC0415
-            from beartype.claw import beartype_this_package  # noqa: PLC0415
+            from beartype.claw import beartype_packages  # noqa: PLC0415
             from beartype.roar import BeartypeClawDecorWarning  # noqa: PLC0415
 
-            beartype_this_package(
+            include, exclude = runtime_type_checking_scope()
+            beartype_packages(
+                include,
                 conf=BeartypeConf(
+                    claw_skip_package_names=tuple(exclude),
                     warning_cls_on_decorator_exception=(
                         None if rtc_mode is _RuntimeTypeCheckingModes.ERROR else BeartypeClawDecorWarning
                     ),
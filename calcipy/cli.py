@@ -1,18 +1,22 @@
 """Extend Invoke for Calcipy."""
 
+import os
 import sys
 from base64 import b64encode
 from functools import wraps
 from pathlib import Path
 from types import ModuleType
 
-from beartype.typing import Any, Callable, Dict, List, Optional, Union
+from beartype.typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from corallium.log import LOGGER
 from invoke.collection import Collection as InvokeCollection  # noqa: TID251
 from invoke.config import Config, merge_dicts
+from invoke.exceptions import ParseError
 from invoke.program import Program
 
-from .collection import TASK_ARGS_ATTR, TASK_KWARGS_ATTR, Collection, GlobalTaskOptions
+from .collection import TASK_ARGS_ATTR, TASK_KWARGS_ATTR, CalcipyExecutor, Collection, GlobalTaskOptions
 from .invoke_helpers import use_pty
+from .tracing import start_tracing
 
 
 class _CalcipyProgram(Program):
@@ -30,7 +34,11 @@ class _CalcipyProgram(Program):
         self.print_columns(
             [
                 ('*file_args', 'List of Paths available globally to all tasks. Will resolve paths with working_dir'),
+                ('--daemon', 'Keep a warm server for "calcipy-client" (must be the only argument)'),
+                ('-j INT, --jobs=INT', 'Run up to INT independent tasks concurrently ("auto" for the CPU count)'),
                 ('--keep-going', 'Continue running tasks even on failure'),
+                ('--no-cache', 'Run tasks even when their declared inputs are unchanged since the last success'),
+                ('--trace=STRING', 'Write a Chrome trace (open with ui.perfetto.dev) of task and subprocess timing'),
                 ('--working_dir=STRING', 'Set the cwd for the program. Example: "../run --working-dir .. lint test"'),
                 ('-v,-vv,-vvv', 'Globally configure logger verbosity (-vvv for most verbose)'),
             ],
@@ -55,6 +63,69 @@ class CalcipyConfig(Config):
         return merge_dicts(invoke_defaults, calcipy_defaults)
 
 
+def _parse_jobs(value: str) -> int:
+    """Parse the `--jobs` value, where 'auto' uses the number of available CPUs.
+
+    Raises:
+        ParseError: if not 'auto' or a positive integer
+
+    """
+    if value == 'auto':
+        return os.cpu_count() or 1
+    if not value.isdigit() or int(value) < 1:
+        msg = f"Invalid value for --jobs: {value!r}. Use 'auto' or a positive integer"
+        raise ParseError(msg)
+    return int(value)
+
+
+_GTO_FLAGS = {'--keep-going': 'keep_going', '--no-cache': 'no_cache'}
+"""Lookup of boolean CLI flags to the `GlobalTaskOptions` attribute that they enable."""
+
+_GTO_OPTIONS: Dict[str, Tuple[str, Callable[[str], Any]]] = {
+    '--working-dir': ('working_dir', lambda value: Path(value).resolve()),
+    '-j': ('jobs', _parse_jobs),
+    '--jobs': ('jobs', _parse_jobs),
+    '--trace': ('trace', lambda value: Path(value).resolve()),
+}
+"""Lookup of CLI options with values to the `GlobalTaskOptions` attribute and a parser for the value."""
+
+
+def parse_global_options(argv: List[str]) -> Tuple[GlobalTaskOptions, List[str]]:
+    """Extract the calcipy-specific global options from the CLI arguments.
+
+    Args:
+        argv: CLI arguments without the program name
+
+    Returns:
+        Tuple of the parsed options and the remaining arguments for invoke
+
+    """
+    gto = GlobalTaskOptions()
+    remaining: List[str] = []
+    last_argv = ''
+    for argv_ in argv:
+        option, _, value = argv_.partition('=')
+        if not last_argv.startswith('-') and Path(argv_).is_file():
+            gto.file_args.append(Path(argv_))
+        # Check for CLI flags
+        elif argv_ in {'-v', '-vv', '-vvv', '--verbose'}:
+            gto.verbose = argv_.count('v')
+        elif argv_ in _GTO_FLAGS:
+            setattr(gto, _GTO_FLAGS[argv_], True)
+        # Check for CLI arguments with values
+        elif value and option in _GTO_OPTIONS:
+            attr, parser = _GTO_OPTIONS[option]
+            setattr(gto, attr, parser(value))
+        elif last_argv in _GTO_OPTIONS:
+            attr, parser = _GTO_OPTIONS[last_argv]
+            setattr(gto, attr, parser(argv_))
+        elif argv_ not in _GTO_OPTIONS:
+            remaining.append(argv_)
+        last_argv = argv_
+    gto.file_args = [f_ if f_.is_absolute() else Path.cwd() / f_ for f_ in gto.file_args]
+    return gto, remaining
+
+
 def start_program(
     pkg_name: str,
     pkg_version: str,
@@ -68,25 +139,12 @@ def start_program(
 
     """
     # Manipulate 'sys.argv' to hide arguments that invoke can't parse
-    lgto = GlobalTaskOptions()
-    sys_argv: List[str] = sys.argv[:1]
-    last_argv = ''
-    for argv in sys.argv[1:]:
-        if not last_argv.startswith('-') and Path(argv).is_file():
-            lgto.file_args.append(Path(argv))
-        # Check for CLI flags
-        elif argv in {'-v', '-vv', '-vvv', '--verbose'}:
-            lgto.verbose = argv.count('v')
-        elif argv == '--keep-going':
-            lgto.keep_going = True
-        # Check for CLI arguments with values
-        elif last_argv == '--working-dir':
-            lgto.working_dir = Path(argv).resolve()
-        elif argv != '--working-dir':
-            sys_argv.append(argv)
-        last_argv = argv
-    lgto.file_args = [f_ if f_.is_absolute() else Path.cwd() / f_ for f_ in lgto.file_args]
-    sys.argv = sys_argv
+    try:
+        lgto, remaining_argv = parse_global_options(sys.argv[1:])
+    except ParseError as exc:
+        print(exc, file=sys.stderr)  # noqa: T201
+        raise SystemExit(1) from exc
+    sys.argv = sys.argv[:1] + remaining_argv
 
     class _CalcipyConfig(CalcipyConfig):
         gto: GlobalTaskOptions = lgto
@@ -94,15 +152,22 @@ def start_program(
     if module and collection:
         raise ValueError('Only one of collection or module can be specified')
 
-    _CalcipyProgram(
-        name=pkg_name,
-        version=pkg_version,
-        # Shell completion is supported via Invoke: calcipy --print-completion-script zsh
-        # See DEVELOPER_GUIDE.md for setup instructions
-        # Future: consider usage spec (https://usage.jdx.dev/spec) for mise integration
-        namespace=Collection.from_module(module) if module else collection,
-        config_class=_CalcipyConfig,
-    ).run()
+    tracer = start_tracing() if lgto.trace else None
+    try:
+        _CalcipyProgram(
+            name=pkg_name,
+            version=pkg_version,
+            # Shell completion is supported via Invoke: calcipy --print-completion-script zsh
+            # See DEVELOPER_GUIDE.md for setup instructions
+            # Future: consider usage spec (https://usage.jdx.dev/spec) for mise integration
+            namespace=Collection.from_module(module) if module else collection,
+            config_class=_CalcipyConfig,
+            executor_class=CalcipyExecutor,
+        ).run()
+    finally:
+        if tracer and lgto.trace:
+            tracer.write(lgto.trace)
+            LOGGER.text(f'Wrote trace to {lgto.trace}')
 
 
 def task(*dec_args: Any, **dec_kwargs: Any) -> Callable:  # type: ignore[type-arg]
@@ -2,23 +2,41 @@
 
 from __future__ import annotations
 
+import importlib
 import logging
 import os
-from contextlib import redirect_stderr, redirect_stdout
+import sys
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import redirect_stderr, redirect_stdout, suppress
 from dataclasses import dataclass, field
 from functools import wraps
-from io import StringIO
 from pathlib import Path
 from types import ModuleType
 
-from beartype.typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from beartype.typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple, TypeVar, Union
 from corallium.log import LOGGER, configure_logger
 from invoke.collection import Collection as InvokeCollection  # noqa: TID251
 from invoke.context import Context
-from invoke.tasks import Task
+from invoke.exceptions import Exit
+from invoke.executor import Executor
+from invoke.parser.argument import Argument
+from invoke.parser.context import ParserContext
+from invoke.tasks import Call, Task
+
+from .invoke_helpers import record_results
+from .output_capture import DEFAULT_TAIL_KB, SpillingCapture
+from .task_cache import CACHE_DIR_NAME, CachedOutput, ResultCache, fingerprint
+from .tracing import span
 
 TASK_ARGS_ATTR = 'dev_args'
 TASK_KWARGS_ATTR = 'dev_kwargs'
+TASK_AFTER_ATTR = 'calcipy_after'
+"""Attribute on built Tasks with the keys of tasks that must complete first when scheduled together."""
+TASK_REQUIRES_ATTR = 'calcipy_requires'
+"""Attribute on built Tasks with the executables that must be installed before any task is started."""
+TASK_BARRIER_ATTR = 'calcipy_barrier'
+"""Attribute on built Tasks that must complete before every later post-task of the same task when run concurrently."""
 
 DeferredTask = Union[Callable, Task]  # type: ignore[type-arg]
 
@@ -44,18 +62,32 @@ class GlobalTaskOptions:
     capture_output: bool = False
     """Capture stdout and stderr output from tasks."""
 
+    capture_tail_kb: int = DEFAULT_TAIL_KB
+    """Size of the in-memory tail of captured output. The full output is written to a temporary log file."""
+
+    jobs: int = 1
+    """Maximum number of independent tasks to run concurrently."""
+
+    no_cache: bool = False
+    """Always run tasks, even when their declared inputs are unchanged since the last success."""
+
+    trace: Optional[Path] = None
+    """Optional path to write a Chrome trace-event file with timing for each task and subprocess."""
+
     def __post_init__(self) -> None:
         """Validate dataclass."""
         options_verbose = [*LOG_LOOKUP.keys()]
         if self.verbose not in options_verbose:
             error = f'verbose must be one of: {options_verbose}'
             raise ValueError(error)
+        if self.jobs < 1:
+            raise ValueError('jobs must be a positive integer')
 
 
-def _configure_task_logger(ctx: Context) -> None:  # pragma: no cover
-    """Configure the logger based on task context."""
-    verbose = ctx.config.gto.verbose
-    raw_log_level = LOG_LOOKUP.get(verbose)
+def _configure_process(gto: GlobalTaskOptions) -> None:  # pragma: no cover
+    """Set the process-wide working directory and logger from the global task options."""
+    os.chdir(gto.working_dir)
+    raw_log_level = LOG_LOOKUP.get(gto.verbose)
     log_level = logging.ERROR if raw_log_level is None else raw_log_level
     configure_logger(log_level=log_level)
 
@@ -68,17 +100,29 @@ def _run_task(func: Any, ctx: Context, *args: Any, show_task_info: bool, **kwarg
         LOGGER.text_debug('With task arguments', args=args, kwargs=kwargs)
 
     if ctx.config.gto.capture_output:
-        stdout_capture = StringIO()
-        stderr_capture = StringIO()
-        with redirect_stdout(stdout_capture), redirect_stderr(stderr_capture):
-            result = func(ctx, *args, **kwargs)
-        captured_stdout = stdout_capture.getvalue()
-        captured_stderr = stderr_capture.getvalue()
+        tail_chars = ctx.config.gto.capture_tail_kb * 1024
+        stdout_capture = SpillingCapture(tail_chars=tail_chars, name='stdout')
+        stderr_capture = SpillingCapture(tail_chars=tail_chars, name='stderr')
+        try:
+            with redirect_stdout(stdout_capture), redirect_stderr(stderr_capture):
+                result = func(ctx, *args, **kwargs)
+        except Exception:
+            stdout_capture.close(keep=True)
+            stderr_capture.close(keep=True)
+            LOGGER.warning(
+                f'Failed {func.__name__}. Full captured output was written to the log files',
+                stdout=stdout_capture.path,
+                stderr=stderr_capture.path,
+                stderr_tail=stderr_capture.tail(),
+            )
+            raise
         if show_task_info:
-            if captured_stdout:
+            if captured_stdout := stdout_capture.tail():
                 LOGGER.text_debug('Captured stdout', output=captured_stdout)
-            if captured_stderr:
+            if captured_stderr := stderr_capture.tail():
                 LOGGER.text_debug('Captured stderr', output=captured_stderr)
+        stdout_capture.close()
+        stderr_capture.close()
     else:
         result = func(ctx, *args, **kwargs)
 
@@ -89,19 +133,66 @@ def _run_task(func: Any, ctx: Context, *args: Any, show_task_info: bool, **kwarg
     return result
 
 
-def _wrapped_task(ctx: Context, *args: Any, func: Any, show_task_info: bool, **kwargs: Any) -> Any:  # pragma: no cover
+def _run_cached_task(  # pragma: no cover
+    func: Any,
+    ctx: Context,
+    *args: Any,
+    inputs: Tuple[str, ...],
+    show_task_info: bool,
+    **kwargs: Any,
+) -> Any:
+    """Skip the task and replay its output when the declared inputs match a previous success."""
+    gto = ctx.config.gto
+    cache = ResultCache(Path(gto.working_dir) / CACHE_DIR_NAME)
+    extra = {'args': args, 'kwargs': kwargs, 'file_args': [path.as_posix() for path in gto.file_args]}
+    key = fingerprint(task_key(func), inputs, base_dir=Path(gto.working_dir), hasher=cache.hasher, extra=extra)
+    if (outputs := cache.load(key)) is not None:
+        LOGGER.text(f'Skipping {func.__name__} (inputs unchanged since the last success)')
+        for output in outputs:
+            sys.stdout.write(output.stdout)
+            sys.stderr.write(output.stderr)
+        return None
+
+    with record_results() as results:
+        result = _run_task(func, ctx, *args, show_task_info=show_task_info, **kwargs)
+    cache.store(
+        key,
+        [
+            CachedOutput(
+                command=res.command,
+                stdout='' if 'stdout' in res.hide else res.stdout,
+                stderr='' if 'stderr' in res.hide else res.stderr,
+            )
+            for res in results
+        ],
+    )
+    return result
+
+
+def _wrapped_task(  # pragma: no cover
+    ctx: Context,
+    *args: Any,
+    func: Any,
+    show_task_info: bool,
+    inputs: Tuple[str, ...] = (),
+    **kwargs: Any,
+) -> Any:
     """Wrap task with extended logic."""
     try:
         ctx.config.gto  # noqa: B018
     except AttributeError:
         ctx.config.gto = GlobalTaskOptions()
 
-    # Begin utilizing Global Task Options
-    os.chdir(ctx.config.gto.working_dir)
-    _configure_task_logger(ctx)
+    # Begin utilizing Global Task Options. With `--jobs`, the executor configures the process once before any worker
+    # thread starts, because the working directory and logger are shared by every thread
+    if threading.current_thread() is threading.main_thread():
+        _configure_process(ctx.config.gto)
 
     try:
-        return _run_task(func, ctx, *args, show_task_info=show_task_info, **kwargs)
+        with span(task_key(func), 'task', args=args, kwargs=kwargs):
+            if inputs and not (ctx.config.gto.no_cache or ctx.config.run.dry):
+                return _run_cached_task(func, ctx, *args, inputs=inputs, show_task_info=show_task_info, **kwargs)
+            return _run_task(func, ctx, *args, show_task_info=show_task_info, **kwargs)
     except Exception:
         if not ctx.config.gto.keep_going:
             raise
@@ -109,25 +200,342 @@ def _wrapped_task(ctx: Context, *args: Any, func: Any, show_task_info: bool, **k
     return None
 
 
+def task_key(task: DeferredTask) -> str:
+    """Return a stable identifier for a task function, deferred task, or built Task.
+
+    Every wrapper applied by calcipy uses `functools.wraps`, so the module and qualified name of the original
+    function are preserved regardless of how many times the task was built or partially applied.
+
+    """
+    func = task.body if isinstance(task, Task) else task
+    return f'{func.__module__}.{func.__qualname__}'
+
+
 def _build_task(task: DeferredTask) -> Task:  # type: ignore[type-arg]  # pragma: no cover
     """Defer creation of the Task."""
     if hasattr(task, TASK_ARGS_ATTR) or hasattr(task, TASK_KWARGS_ATTR):
 
         @wraps(task)
         def inner(*args: Any, **kwargs: Any) -> Any:
-            return _wrapped_task(*args, func=task, show_task_info=show_task_info, **kwargs)
+            return _wrapped_task(*args, func=task, show_task_info=show_task_info, inputs=inputs, **kwargs)
 
-        kwargs = getattr(task, TASK_KWARGS_ATTR)
+        # Copy so that the same deferred task can be built more than once (e.g. for a namespace and a pipeline)
+        kwargs = dict(getattr(task, TASK_KWARGS_ATTR))
         show_task_info = kwargs.pop('show_task_info', None) or False
         pre = [_build_task(pre) for pre in kwargs.pop('pre', None) or []]
         post = [_build_task(post) for post in kwargs.pop('post', None) or []]
-        return Task(inner, *getattr(task, TASK_ARGS_ATTR), pre=pre, post=post, **kwargs)  # type: ignore[misc,arg-type]  # ty: ignore[invalid-argument-type]
+        after = tuple(task_key(after) for after in kwargs.pop('after', None) or [])
+        inputs = tuple(kwargs.pop('inputs', None) or [])
+        requires = tuple(kwargs.pop('requires', None) or [])
+        barrier = bool(kwargs.pop('barrier', None))
+        built: Task[Any] = Task(inner, *getattr(task, TASK_ARGS_ATTR), pre=pre, post=post, **kwargs)  # type: ignore[misc,arg-type]  # ty: ignore[invalid-argument-type]
+        setattr(built, TASK_AFTER_ATTR, after)
+        setattr(built, TASK_REQUIRES_ATTR, requires)
+        setattr(built, TASK_BARRIER_ATTR, barrier)
+        return built
     return task  # type: ignore[return-value]  # ty: ignore[invalid-return-type]
 
 
+# ----------------------------------------------------------------------------------------------------------------------
+# Concurrent Execution
+
+_NodeT = TypeVar('_NodeT')
+
+
+def run_task_graph(
+    nodes: Sequence[_NodeT],
+    dependencies: Dict[int, Set[int]],
+    run_node: Callable[[_NodeT], Any],
+    jobs: int,
+) -> List[Any]:
+    """Run each node in a worker pool as soon as all of its dependencies have completed.
+
+    Ready nodes are started in their original order. After the first failure, no new nodes are started, the
+    running nodes are allowed to finish, and then the error is re-raised.
+
+    Args:
+        nodes: ordered nodes to run
+        dependencies: lookup of node index to the indices of the nodes that must complete first
+        run_node: function called with each node
+        jobs: maximum number of nodes to run concurrently
+
+    Returns:
+        List of the results from `run_node` in the same order as `nodes`
+
+    Raises:
+        ValueError: if the dependencies contain a cycle
+
+    """
+    results: List[Any] = [None] * len(nodes)
+    pending = {idx: set(dependencies.get(idx, set())) for idx in range(len(nodes))}
+    running: Dict[Future[Any], int] = {}
+    error: Optional[BaseException] = None
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        while pending or running:
+            if error is None:
+                ready = [idx for idx, deps in pending.items() if not deps][: jobs - len(running)]
+                for idx in ready:
+                    del pending[idx]
+                    running[pool.submit(run_node, nodes[idx])] = idx
+            if not running:
+                if error is None:
+                    msg = f'Circular task ordering between: {[nodes[idx] for idx in pending]}'
+                    raise ValueError(msg)
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                idx = running.pop(future)
+                try:
+                    results[idx] = future.result()
+                except Exception as exc:
+                    error = error or exc
+                    continue
+                for deps in pending.values():
+                    deps.discard(idx)
+
+    if error is not None:
+        raise error
+    return results
+
+
+class CalcipyExecutor(Executor):
+    """Executor that runs independent tasks concurrently when `GlobalTaskOptions.jobs` is greater than one.
+
+    Pre-tasks must complete before their task and post-tasks start after their task. Post-tasks declared with
+    `barrier=True` (such as the progress messages of a pipeline) complete before every later post-task of the same
+    task. Tasks that declare `after` only wait for the named tasks when both are scheduled in the same run. Everything
+    else is independent.
+
+    Tasks run serially when output is captured, because `sys.stdout` and `sys.stderr` are shared by every thread.
+
+    """
+
+    def execute(self, *tasks: Union[str, Tuple[str, Dict[str, Any]], ParserContext]) -> Dict[Task, Any]:  # type: ignore[type-arg]
+        """Execute the tasks sequentially or in a dependency-aware worker pool."""
+        gto: Optional[GlobalTaskOptions] = None
+        with suppress(AttributeError):
+            gto = self.config.gto
+        jobs = gto.jobs if gto else 1
+        direct = self.normalize(tasks)
+        calls, dependencies = self.expand_graph(direct)
+        self.check_requirements(calls)
+        if gto and jobs > 1 and gto.capture_output:
+            LOGGER.warning('Running tasks serially because output capture is not thread-safe', jobs=jobs)
+            jobs = 1
+        if jobs <= 1:
+            return super().execute(*tasks)
+
+        # Configuration and process-wide state are shared by every task, so set them once before any worker starts
+        self.config.load_collection(self.collection.configuration(direct[0].called_as if direct else None))
+        self.config.load_shell_env()
+        if gto:
+            _configure_process(gto)
+
+        def _run_call(call: Call) -> Any:
+            result = call.task(call.make_context(self.config), *call.args, **call.kwargs)
+            if call in direct and call.autoprint:
+                print(result)  # noqa: T201
+            return result
+
+        results = run_task_graph(calls, dependencies, _run_call, jobs=jobs)
+        return {call.task: result for call, result in zip(calls, results, strict=True)}
+
+    def check_requirements(self, calls: Sequence[Call]) -> None:
+        """Fail before starting any task if an executable required by a scheduled task is not installed.
+
+        With `keep_going`, the missing executables are logged instead and the affected tasks fail when run. The check
+        is skipped in a dry run, which doesn't run any executable.
+
+        Raises:
+            Exit: with the messages for every missing executable
+
+        """
+        if self.config.run.dry:
+            return
+        if requires := {name for call in calls for name in getattr(call.task, TASK_REQUIRES_ATTR, ())}:
+            from .tasks.executable_utils import check_all_installed  # noqa: PLC0415
+
+            gto: Optional[GlobalTaskOptions] = None
+            with suppress(AttributeError):
+                gto = self.config.gto
+            try:
+                # The working directory may not be changed yet, so the cache is resolved from the configured directory
+                check_all_installed(requires, base_dir=Path(gto.working_dir) if gto else None)
+            except RuntimeError as exc:
+                if not (gto and gto.keep_going):
+                    raise Exit(str(exc), code=1) from exc
+                LOGGER.warning('Missing executables', details=str(exc))
+
+    @staticmethod
+    def expand_graph(calls: List[Call]) -> Tuple[List[Call], Dict[int, Set[int]]]:
+        """Expand pre- and post-tasks into a de-duplicated list of calls and their dependencies.
+
+        Returns:
+            Tuple of the calls and a lookup of call index to the indices of the calls that must complete first
+
+        """
+        nodes: List[Call] = []
+        dependencies: Dict[int, Set[int]] = {}
+
+        def _add(call: Union[Call, Task], upstream: Set[int]) -> int:  # type: ignore[type-arg]
+            call = Call(call) if isinstance(call, Task) else call
+            required = set(upstream) | {_add(pre, upstream) for pre in call.pre}
+            if call in nodes:
+                return nodes.index(call)
+            idx = len(nodes)
+            nodes.append(call)
+            dependencies[idx] = required
+            barriers: Set[int] = set()
+            for post in call.post:
+                post_idx = _add(post, {idx} | barriers)
+                if getattr(nodes[post_idx].task, TASK_BARRIER_ATTR, False):
+                    barriers.add(post_idx)
+            return idx
+
+        for call in calls:
+            _add(call, set())
+
+        keys = [task_key(call.task) for call in nodes]
+        for idx, call in enumerate(nodes):
+            after = set(getattr(call.task, TASK_AFTER_ATTR, ()))
+            dependencies[idx] |= {other for other, key in enumerate(keys) if key in after and other != idx}
+        return nodes, dependencies
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Lazy Tasks from the Task Manifest
+
+_ARGUMENT_KINDS = {kind.__name__: kind for kind in (bool, float, int, list, str)}
+"""Lookup of serialized argument kinds."""
+
+
+def manifest_entry(task: Task, name: str, *, is_default: bool) -> Dict[str, Any]:  # type: ignore[type-arg]
+    """Serialize the metadata that invoke needs to list, complete, parse, and document a task.
+
+    Returns:
+        JSON-serializable dictionary that can be loaded by `LazyTask`
+
+    """
+    return {
+        'name': name,
+        'aliases': sorted(task.aliases),
+        'default': is_default,
+        'module': task.body.__module__,
+        'attr': task.body.__name__,
+        'doc': task.__doc__ or '',
+        'arguments': [
+            {
+                'names': list(arg.names),
+                'kind': arg.kind.__name__,
+                'default': arg.default,
+                'help': arg.help,
+                'positional': arg.positional,
+                'optional': arg.optional,
+                'incrementable': arg.incrementable,
+                'attr_name': arg.attr_name,
+            }
+            for arg in task.get_arguments(ignore_unknown_help=True)
+        ],
+    }
+
+
+class LazyTask(Task):  # type: ignore[type-arg]
+    """Task created from a manifest entry that only imports the task module when needed.
+
+    Listing, help, and argument parsing use the manifest entry. The module is imported when the task is called or
+    when the executor resolves the pre- and post-tasks of a task that is about to run.
+
+    """
+
+    def __init__(self, entry: Dict[str, Any]) -> None:
+        """Initialize from a manifest entry created by `manifest_entry`."""
+        self.entry = entry
+        self._loaded: Optional[Task] = None  # type: ignore[type-arg]
+
+        def body(*args: Any, **kwargs: Any) -> Any:
+            return self.load()(*args, **kwargs)
+
+        # Match the metadata of the real task function so that `task_key` and `helpline` are unchanged
+        body.__module__ = entry['module']
+        body.__name__ = body.__qualname__ = entry['attr']
+        body.__doc__ = entry['doc']
+        super().__init__(body, name=entry['name'], aliases=entry['aliases'], positional=[], default=entry['default'])
+
+    def load(self) -> Task:  # type: ignore[type-arg]
+        """Import the task module and build the real Task.
+
+        Raises:
+            Exit: with the missing extras message if the task module cannot be imported
+
+        """
+        if self._loaded is None:
+            try:
+                module = importlib.import_module(self.entry['module'])
+            except RuntimeError as exc:  # Raised by the subpackages that require an extra
+                msg = f'Unable to run {self.name!r}: {exc}'
+                raise Exit(msg, code=1) from exc
+            except ImportError as exc:
+                msg = f"Unable to run {self.name!r}: {exc}. Install the missing extras, such as 'calcipy[recommended]'"
+                raise Exit(msg, code=1) from exc
+            self._loaded = _build_task(getattr(module, self.entry['attr']))
+        return self._loaded
+
+    def __eq__(self, other: object) -> bool:
+        """Compare by identity of the task function so that calls are deduplicated with the real Task."""
+        return isinstance(other, Task) and self.name == other.name and task_key(self) == task_key(other)
+
+    def __hash__(self) -> int:
+        """Hash consistently with `__eq__` for LazyTasks."""
+        return hash((self.name, task_key(self)))
+
+    def __getattr__(self, name: str) -> Any:
+        """Resolve the scheduling attributes from the real Task, which are only needed to run."""
+        if name not in {TASK_AFTER_ATTR, TASK_BARRIER_ATTR, TASK_REQUIRES_ATTR}:
+            raise AttributeError(name)
+        return getattr(self.load(), name)
+
+    @property
+    def pre(self) -> List[Any]:
+        """Pre-tasks of the real Task."""
+        return self.load().pre  # type: ignore[return-value]
+
+    @pre.setter
+    def pre(self, _value: Any) -> None:
+        """Ignore the value from `Task.__init__` because it is resolved from the real Task."""
+
+    @property
+    def post(self) -> List[Any]:
+        """Post-tasks of the real Task."""
+        return self.load().post  # type: ignore[return-value]
+
+    @post.setter
+    def post(self, _value: Any) -> None:
+        """Ignore the value from `Task.__init__` because it is resolved from the real Task."""
+
+    def get_arguments(self, ignore_unknown_help: Optional[bool] = None) -> List[Argument]:  # noqa: ARG002
+        """Return the arguments from the manifest without inspecting the task function."""
+        return [
+            Argument(**{**argument, 'kind': _ARGUMENT_KINDS[argument['kind']]}) for argument in self.entry['arguments']
+        ]
+
+
 class Collection(InvokeCollection):
     """Calcipy Task Collection."""
 
+    @classmethod
+    def from_manifest(cls, name: str, entries: List[Dict[str, Any]]) -> Collection:
+        """Create a collection of `LazyTask` from task manifest entries.
+
+        Returns:
+            Collection populated with lazily imported tasks.
+
+        """
+        collection = cls(name)
+        for entry in entries:
+            collection.add_task(LazyTask(entry))
+        return collection
+
     @classmethod
     def from_module(
         cls,
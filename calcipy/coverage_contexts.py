@@ -0,0 +1,246 @@
+"""Line-level test selection from coverage recorded with the node ID of each test as the context.
+
+After `test.coverage --contexts`, the lines covered by each test are merged into a SQLite database next to
+`coverage.json`. Each run replaces the rows of the tests that ran. Because `test.coverage` runs the full test suite,
+tests that did not run were deleted or renamed and are removed, so that their node IDs are never selected.
+`test.affected --lines` then selects the tests that cover a line in the changed hunks of `git diff`.
+
+Files that are not in the database (such as test files or new modules), deleted files, and lines that only run on
+import fall back to the import-level selection from `calcipy.import_graph`.
+
+"""
+
+from __future__ import annotations
+
+import re
+import sqlite3
+from collections import defaultdict
+from contextlib import closing, suppress
+from pathlib import Path
+
+from beartype.typing import Dict, Iterable, List, Optional, Set
+
+from . import import_graph
+from .import_graph import run_git
+
+CONTEXT_DB_NAME = 'coverage-contexts.db'
+"""Name of the database of covered lines by test, which is created next to `coverage.json`."""
+
+PLUGIN = 'calcipy.pytest_coverage_context'
+"""Pytest plugin that sets the coverage context to the node ID of each test."""
+
+IMPORT_CONTEXT = ''
+"""Context of lines that run outside of a test, such as module-level statements on import."""
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS tests (id INTEGER PRIMARY KEY, nodeid TEXT UNIQUE NOT NULL);
+CREATE TABLE IF NOT EXISTS files (id INTEGER PRIMARY KEY, path TEXT UNIQUE NOT NULL);
+CREATE TABLE IF NOT EXISTS lines (
+    file_id INTEGER NOT NULL,
+    lineno INTEGER NOT NULL,
+    test_id INTEGER NOT NULL,
+    PRIMARY KEY (file_id, lineno, test_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS lines_by_test ON lines (test_id);
+"""
+
+_HUNK = re.compile(r'^@@ -(\d+)(?:,(\d+))? \+\d+(?:,\d+)? @@')
+
+
+def _connect(db_path: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path)
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def _row_id(conn: sqlite3.Connection, table: str, column: str, value: str) -> int:
+    conn.execute(f'INSERT OR IGNORE INTO {table} ({column}) VALUES (?)', (value,))  # noqa: S608
+    return int(conn.execute(f'SELECT id FROM {table} WHERE {column} = ?', (value,)).fetchone()[0])  # noqa: S608
+
+
+def _relative(filename: str, base_dir: Path) -> Optional[str]:
+    path = Path(filename)
+    if not path.is_absolute():
+        return path.as_posix()
+    try:
+        return path.resolve().relative_to(base_dir.resolve()).as_posix()
+    except ValueError:
+        return None
+
+
+def update_database(db_path: Path, *, base_dir: Path, data_file: Optional[Path] = None, prune: bool = False) -> int:
+    """Merge the covered lines of each test from the coverage data into the database.
+
+    The current git commit is recorded as the default base to compare with in `test.affected --lines`, because the
+    line numbers in the database are only accurate for that commit.
+
+    Args:
+        db_path: path to the SQLite database, which is created if necessary
+        base_dir: project directory that the file paths are relative to
+        data_file: coverage data file. Defaults to the `data_file` from the coverage configuration
+        prune: if True, remove the tests that are not in the coverage data. Only use after a run of the full test suite
+
+    Returns:
+        Number of tests that were updated
+
+    """
+    from coverage import Coverage  # noqa: PLC0415
+
+    cov = Coverage(data_file=data_file) if data_file else Coverage()
+    cov.load()
+    data = cov.get_data()
+
+    by_test: Dict[str, Dict[str, List[int]]] = defaultdict(lambda: defaultdict(list))
+    for filename in data.measured_files():
+        if (rel_path := _relative(filename, base_dir)) is None:
+            continue
+        for lineno, contexts in data.contexts_by_lineno(filename).items():
+            for context in contexts:
+                by_test[context][rel_path].append(lineno)
+
+    commit = ''
+    with suppress(RuntimeError):
+        commit = run_git(base_dir, 'rev-parse', 'HEAD')[0]
+
+    with closing(_connect(db_path)) as conn, conn:
+        file_ids: Dict[str, int] = {}
+        for nodeid, files in by_test.items():
+            test_id = _row_id(conn, 'tests', 'nodeid', nodeid)
+            conn.execute('DELETE FROM lines WHERE test_id = ?', (test_id,))
+            for rel_path, linenos in files.items():
+                if rel_path not in file_ids:
+                    file_ids[rel_path] = _row_id(conn, 'files', 'path', rel_path)
+                conn.executemany(
+                    'INSERT OR IGNORE INTO lines (file_id, lineno, test_id) VALUES (?, ?, ?)',
+                    [(file_ids[rel_path], lineno, test_id) for lineno in linenos],
+                )
+        if prune:
+            conn.execute('CREATE TEMP TABLE ran (nodeid TEXT PRIMARY KEY)')
+            conn.executemany('INSERT INTO ran (nodeid) VALUES (?)', [(nodeid,) for nodeid in by_test])
+            conn.execute('DELETE FROM tests WHERE nodeid NOT IN (SELECT nodeid FROM ran)')
+            conn.execute('DELETE FROM lines WHERE test_id NOT IN (SELECT id FROM tests)')
+            conn.execute('DELETE FROM files WHERE id NOT IN (SELECT file_id FROM lines)')
+        conn.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', ('commit', commit))
+    return len(by_test.keys() - {IMPORT_CONTEXT})
+
+
+def recorded_commit(db_path: Path) -> Optional[str]:
+    """Return the commit of the last update or None if there is no database."""
+    if not db_path.is_file():
+        return None
+    with closing(_connect(db_path)) as conn:
+        row = conn.execute("SELECT value FROM meta WHERE key = 'commit'").fetchone()
+    return row[0] if row and row[0] else None
+
+
+def parse_diff(lines: Iterable[str]) -> Dict[str, Set[int]]:
+    """Return the changed line numbers of each file from the original side of a `git diff --unified=0 --no-prefix`.
+
+    Insertions between lines select the lines on either side. New files have no original lines.
+
+    """
+    changes: Dict[str, Set[int]] = {}
+    current: Optional[str] = None
+    in_header = False
+    for line in lines:
+        if line.startswith('diff --git '):
+            in_header, current = True, None
+        elif in_header and line.startswith('--- '):
+            if (path := line[4:]) != '/dev/null':
+                current = path
+                changes[current] = set()
+        elif in_header and line.startswith('+++ ') and current is None:
+            if (path := line[4:]) != '/dev/null':
+                changes[path] = set()
+        elif match := _HUNK.match(line):
+            in_header = False
+            if current:
+                start, count = int(match[1]), int(match[2] or 1)
+                changes[current].update(range(start, start + count) if count else (start, start + 1))
+    return changes
+
+
+def changed_lines(base_dir: Path, since: str) -> Dict[str, Set[int]]:
+    """Return the changed lines by file since the merge base with the git ref, including untracked files.
+
+    Returns:
+        Lookup of posix path relative to `base_dir` to the changed lines in the original file
+
+    """
+    diff = run_git(
+        base_dir,
+        'diff',
+        '--unified=0',
+        '--no-prefix',
+        '--no-renames',
+        '--no-color',
+        '--relative',
+        import_graph.merge_base(base_dir, since),
+    )
+    changes = parse_diff(diff)
+    for rel_path in run_git(base_dir, 'ls-files', '--others', '--exclude-standard'):
+        changes.setdefault(rel_path, set())
+    return changes
+
+
+def _covering_tests(conn: sqlite3.Connection, rel_path: str, linenos: Set[int]) -> Optional[Set[str]]:
+    """Return the tests that cover any of the lines or None if the file is not in the database."""
+    if conn.execute('SELECT 1 FROM files WHERE path = ?', (rel_path,)).fetchone() is None:
+        return None
+    rows = conn.execute(
+        """
+        SELECT DISTINCT tests.nodeid FROM lines
+        JOIN files ON files.id = lines.file_id
+        JOIN tests ON tests.id = lines.test_id
+        WHERE files.path = ? AND lines.lineno IN (SELECT value FROM json_each(?))
+        """,
+        (rel_path, f'[{",".join(map(str, sorted(linenos)))}]'),
+    )
+    return {nodeid for (nodeid,) in rows}
+
+
+def select_tests(
+    base_dir: Path,
+    db_path: Path,
+    changes: Dict[str, Set[int]],
+    *,
+    cache_dir: Path,
+    test_dir: str = 'tests',
+) -> Optional[List[str]]:
+    """Select the tests that cover a changed line with a fallback to the import graph.
+
+    Args:
+        base_dir: project directory
+        db_path: database created by `update_database`
+        changes: changed lines by file from `changed_lines`
+        cache_dir: directory for the cached import graph
+        test_dir: directory of the tests relative to `base_dir`
+
+    Returns:
+        Sorted pytest node IDs and test files or None if the full test suite should run
+
+    """
+    node_ids: Set[str] = set()
+    fallback: List[str] = []
+    with closing(_connect(db_path)) as conn:
+        for rel_path, linenos in changes.items():
+            covering = _covering_tests(conn, rel_path, linenos)
+            if covering is None or IMPORT_CONTEXT in covering or not (base_dir / rel_path).is_file():
+                fallback.append(rel_path)
+            node_ids.update(covering or ())
+    node_ids.discard(IMPORT_CONTEXT)
+
+    test_files: List[str] = []
+    if fallback:
+        selected = import_graph.affected_tests(base_dir, fallback, cache_dir=cache_dir, test_dir=test_dir)
+        if selected is None:
+            return None
+        test_files = selected
+    # A selected test file already runs all of its tests and node IDs of deleted files would fail to collect
+    node_ids = {
+        nodeid
+        for nodeid in node_ids
+        if (path := nodeid.split('::', 1)[0]) not in test_files and (base_dir / path).is_file()
+    }
+    return sorted([*node_ids, *test_files])
@@ -0,0 +1,162 @@
+"""Write the terminal, HTML, and JSON coverage reports in-process from a single load of the coverage data.
+
+Running `coverage report`, `coverage html`, and `coverage json` separately starts three interpreters that each read the
+data file and analyze every measured file. Here, the data is loaded once and the analysis of each file is shared by the
+reporters when the installed coverage.py is a version that is known to be compatible (see `SHARED_ANALYSIS_VERSIONS`).
+
+The HTML report is updated incrementally. Coverage.py already skips the page of each file whose source and coverage
+data match the hashes in `status.json`, so the report is rendered in a staging directory and only the files that
+changed are copied into the output directory. Unchanged pages, static files, and indexes keep their modification time,
+and the pages of files that are no longer reported are removed.
+
+"""
+
+from __future__ import annotations
+
+import inspect
+import re
+import shutil
+from dataclasses import dataclass
+from fnmatch import fnmatch
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from beartype.typing import Any, Dict, Optional, Set
+from corallium.log import LOGGER
+
+STATUS_FILE = 'status.json'
+"""Coverage.py file in the HTML directory with the hashes of the source and data of each page."""
+
+GENERATED_PATTERNS = (
+    '*_py.html',
+    'coverage_html_cb_*.js',
+    'favicon_32_cb_*.png',
+    'keybd_closed_cb_*.png',
+    'style_cb_*.css',
+)
+"""Generated file names that are removed when no longer part of the report. Other files are never removed."""
+
+SHARED_ANALYSIS_VERSIONS = ((7, 13), (8, 0))
+"""Range (inclusive, exclusive) of coverage.py versions with a compatible private `Coverage._analyze`."""
+
+_HREF = re.compile(r'href="([^"#?]+)')
+
+
+@dataclass
+class HtmlChanges:
+    """Number of files changed in the HTML directory."""
+
+    written: int = 0
+    unchanged: int = 0
+    removed: int = 0
+
+
+def _share_analysis(cov: Any) -> bool:
+    """Cache the analysis of each file for every report, since it only depends on the loaded data and the file.
+
+    `Coverage._analyze` is private, so it is only replaced for the `SHARED_ANALYSIS_VERSIONS` with the expected
+    signature. Otherwise, each report analyzes the files again.
+
+    Returns:
+        True if the analysis is shared
+
+    """
+    from coverage import __version__, version_info  # noqa: PLC0415
+
+    analyze = getattr(cov, '_analyze', None)
+    low, high = SHARED_ANALYSIS_VERSIONS
+    if not (low <= version_info[:2] < high and analyze and 'file_reporter' in inspect.signature(analyze).parameters):
+        LOGGER.text_debug('Analyzing the files for each coverage report', coverage=__version__)
+        return False
+    analyses: Dict[str, Any] = {}
+
+    def _cached_analyze(morf: Any, file_reporter: Any = None) -> Any:
+        if file_reporter is None:
+            return analyze(morf)
+        if (analysis := analyses.get(file_reporter.filename)) is None:
+            analysis = analyze(morf, file_reporter=file_reporter)
+            analyses[file_reporter.filename] = analysis
+        return analysis
+
+    cov._analyze = _cached_analyze  # noqa: SLF001
+    return True
+
+
+def write_reports(out_dir: Path, *, min_cover: int = 0, data_file: Optional[Path] = None) -> float:
+    """Write the terminal report with missing lines, the HTML report, and `coverage.json`.
+
+    Args:
+        out_dir: directory for the HTML report
+        min_cover: fail if the total coverage is less than this percentage. When 0, the `fail_under` from the
+            coverage configuration is used, which matches the `coverage report` CLI
+        data_file: coverage data file. Defaults to the `data_file` from the coverage configuration
+
+    Returns:
+        Total coverage percentage
+
+    Raises:
+        RuntimeError: if the total coverage is less than `min_cover` or the configured `fail_under`
+
+    """
+    from coverage import Coverage  # noqa: PLC0415
+    from coverage.results import display_covered, should_fail_under  # noqa: PLC0415
+
+    cov = Coverage(data_file=data_file) if data_file else Coverage()
+    _share_analysis(cov)
+    cov.load()
+    total = cov.report(show_missing=True)
+    changes = write_html(cov, out_dir)
+    LOGGER.text('Updated the HTML coverage report', out_dir=out_dir, **vars(changes))
+    cov.json_report()
+
+    precision = cov.config.precision
+    fail_under = min_cover or cov.config.fail_under
+    if fail_under > 0 and should_fail_under(total, fail_under, precision):
+        msg = f'Coverage failure: total of {display_covered(total, precision)} is less than fail-under={fail_under}'
+        raise RuntimeError(msg)
+    return total
+
+
+def write_html(cov: Any, out_dir: Path) -> HtmlChanges:
+    """Render the HTML report and only replace the files in `out_dir` that changed.
+
+    Args:
+        cov: `coverage.Coverage` with the loaded data
+        out_dir: directory for the HTML report
+
+    Returns:
+        HtmlChanges
+
+    """
+    changes = HtmlChanges()
+    out_dir.mkdir(parents=True, exist_ok=True)
+    with TemporaryDirectory() as tmp_dir:
+        staging = Path(tmp_dir)
+        for name in (STATUS_FILE, '.gitignore'):
+            if (existing := out_dir / name).is_file():
+                shutil.copy2(existing, staging / name)
+        cov.html_report(directory=str(staging))
+
+        staged = {path.name for path in staging.iterdir() if path.is_file()}
+        linked: Set[str] = set()
+        for name in sorted(staged):
+            content = (staging / name).read_bytes()
+            if name.endswith('.html'):
+                linked.update(_HREF.findall(content.decode('utf-8', errors='replace')))
+            target = out_dir / name
+            if target.is_file() and target.read_bytes() == content:
+                changes.unchanged += 1
+            else:
+                target.write_bytes(content)
+                changes.written += 1
+
+    for path in out_dir.iterdir():
+        if not path.is_file() or path.name in staged:
+            continue
+        # Pages that coverage.py skipped are not in the staging directory, but are still linked from an index
+        if path.name in linked:
+            changes.unchanged += 1
+        elif any(fnmatch(path.name, pattern) for pattern in GENERATED_PATTERNS):
+            path.unlink()
+            changes.removed += 1
+    return changes
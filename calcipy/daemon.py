@@ -0,0 +1,179 @@
+"""Persistent server that keeps the task modules imported to avoid the startup cost of each invocation.
+
+Start with `calcipy --daemon` and then use `calcipy-client` in place of `calcipy`. Each request is run in a process
+forked from the warm server, so the task, working directory, environment, and global state are isolated between
+requests and the server never runs task code itself. Stop the daemon with `calcipy-client --stop` (or Ctrl-C).
+
+The daemon is keyed by the Python executable and calcipy version (see `calcipy.daemon_client.socket_path`), but
+restart it after editing task code, which is only imported once.
+
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import signal
+import socket
+import sys
+import traceback
+from contextlib import suppress
+from pathlib import Path
+
+from beartype.typing import Any, Dict, List, Tuple
+from corallium.log import LOGGER, configure_logger
+
+from .daemon_client import (
+    SOCKET_ENV_VAR,
+    connect,
+    current_uid,
+    ensure_private_dir,
+    peer_uid,
+    socket_dir,
+    socket_path,
+)
+
+
+def _preload() -> None:
+    """Import the modules that are otherwise imported on every invocation."""
+    from .cli import start_program  # noqa: F401, PLC0415
+    from .tasks import all_tasks  # noqa: F401, PLC0415
+
+
+def _read_request(conn: socket.socket) -> Tuple[Dict[str, Any], List[int]]:
+    """Receive the standard stream file descriptors and the JSON request.
+
+    Returns:
+        Tuple of the request and the received file descriptors
+
+    """
+    _, fds, _, _ = socket.recv_fds(conn, 1, 3)
+    with conn.makefile('rb') as reader:
+        request = json.loads(reader.readline() or b'{}')
+    return request, fds
+
+
+def _respond(conn: socket.socket, **message: Any) -> None:
+    conn.sendall(json.dumps(message).encode() + b'\n')
+
+
+def _exit_code(exc: SystemExit) -> int:
+    """Convert the `SystemExit` code to an integer like the interpreter."""
+    if exc.code is None or isinstance(exc.code, int):
+        return exc.code or 0
+    print(exc.code, file=sys.stderr)  # noqa: T201
+    return 1
+
+
+def _run_request(conn: socket.socket, request: Dict[str, Any], fds: List[int]) -> int:  # pragma: no cover
+    """Run the CLI in the forked process with the client's streams, working directory, and environment.
+
+    Returns:
+        Exit code
+
+    """
+    for target, fd in enumerate(fds):
+        os.dup2(fd, target)
+        os.close(fd)
+    for stream in (sys.stdout, sys.stderr):
+        stream.reconfigure(line_buffering=True)  # type: ignore[union-attr]
+    os.chdir(request['cwd'])
+    os.environ.clear()
+    os.environ.update(request['env'])
+    sys.argv = ['calcipy', *request['argv']]
+    _respond(conn, pid=os.getpid())
+
+    from .scripts import start  # noqa: PLC0415
+
+    try:
+        start()
+    except SystemExit as exc:
+        return _exit_code(exc)
+    except BaseException:
+        traceback.print_exc()
+        return 1
+    return 0
+
+
+def _handle(server: socket.socket, conn: socket.socket) -> bool:  # pragma: no cover
+    """Fork a process to run the request.
+
+    Returns:
+        False if the daemon should stop
+
+    """
+    if peer_uid(conn) not in {None, current_uid()}:
+        return True  # Never accept requests from other users
+    request, fds = _read_request(conn)
+    if request.get('command') != 'run' or len(fds) != 3:  # noqa: PLR2004
+        for fd in fds:
+            os.close(fd)
+        if request.get('command') == 'stop':
+            _respond(conn, exit=0)
+            return False
+        return True  # Ignore connections that only check if the daemon is running
+
+    if os.fork() == 0:
+        code = 1
+        try:
+            signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.default_int_handler)
+            server.close()
+            code = _run_request(conn, request, fds)
+        finally:
+            # Never return to the server loop from the forked process
+            with suppress(Exception):
+                sys.stdout.flush()
+                sys.stderr.flush()
+                _respond(conn, exit=code)
+            os._exit(code)
+    for fd in fds:
+        os.close(fd)
+    return True
+
+
+def serve(path: Path | None = None) -> None:  # pragma: no cover
+    """Listen for requests from `calcipy-client` until stopped.
+
+    Raises:
+        RuntimeError: if the platform is not supported or a daemon is already running
+
+    """
+    if path is None and not os.getenv(SOCKET_ENV_VAR):
+        ensure_private_dir(socket_dir())
+    path = path or socket_path()
+    if not hasattr(os, 'fork') or not hasattr(socket, 'recv_fds'):
+        raise RuntimeError('The daemon requires Unix sockets and fork')
+    if (existing := connect(path)) is not None:
+        existing.close()
+        msg = f'A daemon is already listening on {path}'
+        raise RuntimeError(msg)
+    path.unlink(missing_ok=True)
+
+    _preload()
+    configure_logger(log_level=logging.INFO)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    umask = os.umask(0o177)  # Create the socket as 0600 rather than changing the mode after it is reachable
+    try:
+        server.bind(str(path))
+    finally:
+        os.umask(umask)
+    server.listen()
+    # Reap the forked processes automatically and stop cleanly on SIGTERM
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, lambda *_args: sys.exit(0))
+    LOGGER.text(f'calcipy daemon listening on {path}')
+    try:
+        while True:
+            conn, _ = server.accept()
+            with conn:
+                if not _handle(server, conn):
+                    break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        path.unlink(missing_ok=True)
+        LOGGER.text('calcipy daemon stopped')
@@ -0,0 +1,158 @@
+"""Thin client that forwards the CLI invocation to a running `calcipy --daemon`.
+
+Only the standard library is imported so that the client starts quickly. The client's stdin, stdout, and stderr file
+descriptors are passed to the daemon, so output (including colors and interactive prompts) goes directly to the
+terminal. When no daemon is running, the program is run in this process instead.
+
+Because the environment and file descriptors are sent to the daemon, the socket is only used when both the socket
+file and the process listening on it belong to the current user. The socket is created in `$XDG_RUNTIME_DIR` or
+otherwise in a per-user directory in the temporary directory that only the user can access.
+
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import signal
+import socket
+import stat
+import struct
+import sys
+import tempfile
+from pathlib import Path
+
+from . import __version__
+
+SOCKET_ENV_VAR = 'CALCIPY_DAEMON_SOCKET'
+"""Optional environment variable to override the socket path."""
+
+
+def current_uid() -> int:
+    """Return the user ID of this process or 0 on platforms without user IDs."""
+    return os.getuid() if hasattr(os, 'getuid') else 0
+
+
+def socket_dir() -> Path:
+    """Return the directory for the socket, which is `$XDG_RUNTIME_DIR` or a per-user temporary directory."""
+    if (runtime_dir := os.getenv('XDG_RUNTIME_DIR')) and Path(runtime_dir).is_dir():
+        return Path(runtime_dir)
+    return Path(tempfile.gettempdir()) / f'calcipy-{current_uid()}'
+
+
+def socket_path() -> Path:
+    """Return the socket path, which is unique to the user, Python environment, and calcipy version."""
+    if override := os.getenv(SOCKET_ENV_VAR):
+        return Path(override)
+    key = hashlib.blake2b(f'{sys.executable}\0{__version__}'.encode(), digest_size=6).hexdigest()
+    return socket_dir() / f'calcipy-{key}.sock'
+
+
+def ensure_private_dir(path: Path) -> None:
+    """Create the directory with mode 0700 if missing and check that only the current user can access it.
+
+    Raises:
+        PermissionError: if the directory is a symlink, belongs to another user, or is accessible to other users
+
+    """
+    path.mkdir(mode=0o700, exist_ok=True)
+    info = path.lstat()
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != current_uid() or info.st_mode & 0o077:
+        msg = f'Refusing to use {path} for the daemon socket because other users can access it'
+        raise PermissionError(msg)
+
+
+def peer_uid(sock: socket.socket) -> int | None:
+    """Return the user ID of the process on the other end of a Unix socket or None if not supported."""
+    if hasattr(socket, 'SO_PEERCRED'):  # Linux: struct ucred {pid, uid, gid}
+        _pid, uid, _gid = struct.unpack('i2I', sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, 12))
+        return int(uid)
+    if hasattr(socket, 'LOCAL_PEERCRED'):  # macOS: struct xucred {version, uid, ...}
+        _version, uid = struct.unpack('2I', sock.getsockopt(0, socket.LOCAL_PEERCRED, 76)[:8])
+        return int(uid)
+    return None
+
+
+def _is_owned_socket(path: Path) -> bool:
+    """Return True if the path is a socket that belongs to the current user."""
+    try:
+        info = path.lstat()
+    except OSError:
+        return False
+    return stat.S_ISSOCK(info.st_mode) and info.st_uid == current_uid()
+
+
+def is_supported() -> bool:
+    """Return True if the platform supports passing file descriptors over Unix sockets."""
+    return hasattr(socket, 'AF_UNIX') and hasattr(socket, 'send_fds')
+
+
+def connect(path: Path | None = None) -> socket.socket | None:
+    """Return a connection to the daemon or None if the daemon isn't running or belongs to another user."""
+    if not is_supported():
+        return None
+    path = path or socket_path()
+    if not path.exists():
+        return None
+    if not _is_owned_socket(path):
+        print(f'Ignoring {path} because it is not a socket owned by the current user', file=sys.stderr)  # noqa: T201
+        return None
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(str(path))
+    except OSError:
+        client.close()
+        return None
+    if peer_uid(client) not in {None, current_uid()}:
+        client.close()
+        print(f'Ignoring {path} because the daemon belongs to another user', file=sys.stderr)  # noqa: T201
+        return None
+    return client
+
+
+def send_request(client: socket.socket, request: dict[str, object]) -> int:
+    """Send the request with the standard streams and wait for the exit code.
+
+    A KeyboardInterrupt is forwarded to the process that runs the request.
+
+    Returns:
+        Exit code of the request
+
+    """
+    socket.send_fds(client, [b'\0'], [0, 1, 2])
+    client.sendall(json.dumps(request).encode() + b'\n')
+    pid = None
+    with client.makefile('rb') as responses:
+        while True:
+            try:
+                line = responses.readline()
+            except KeyboardInterrupt:
+                if pid:
+                    os.kill(pid, signal.SIGINT)
+                continue
+            if not line:
+                return 1  # The daemon closed the connection without an exit code
+            response = json.loads(line)
+            if 'exit' in response:
+                return int(response['exit'])
+            pid = response.get('pid')
+
+
+def main() -> None:  # pragma: no cover
+    """Run the calcipy CLI through the daemon if available."""
+    argv = sys.argv[1:]
+    client = connect()
+    if client is None and argv == ['--stop']:
+        print(f'No daemon is listening on {socket_path()}', file=sys.stderr)  # noqa: T201
+        return
+    if client is None:
+        from .scripts import start  # noqa: PLC0415
+
+        start()
+        return
+
+    with client:
+        command = 'stop' if argv == ['--stop'] else 'run'
+        request: dict[str, object] = {'command': command, 'argv': argv, 'cwd': str(Path.cwd()), 'env': dict(os.environ)}
+        sys.exit(send_request(client, request))
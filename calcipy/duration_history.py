@@ -0,0 +1,287 @@
+"""SQLite history of the setup, call, and teardown duration of each test.
+
+Each pytest run with the `calcipy.pytest_duration_history` plugin is stored with the git commit and Python version, so
+that durations can be compared over time. The rolling median of recent runs is written to `SHARD_DURATIONS_NAME` to
+balance `calcipy.pytest_shard`, used to order tests fastest first, and by `test.slowest` to report slow tests and
+regressions.
+
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import statistics
+import sys
+import time
+from contextlib import closing, suppress
+from dataclasses import dataclass
+from itertools import starmap
+from pathlib import Path
+
+from beartype.typing import Dict, Iterable, List, Mapping, Optional
+
+HISTORY_NAME = 'test_durations.db'
+"""Name of the duration history database in the cache directory."""
+
+SHARD_DURATIONS_NAME = '.calcipy_shard_durations.json'
+"""File committed to the project root with the median seconds of each test that balances `calcipy.pytest_shard`."""
+
+MAX_RUNS = 500
+"""Number of runs to keep in the history before the oldest are removed."""
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started REAL NOT NULL,
+    commit_sha TEXT NOT NULL,
+    python TEXT NOT NULL,
+    shard TEXT NOT NULL,
+    wall REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tests (id INTEGER PRIMARY KEY, nodeid TEXT UNIQUE NOT NULL);
+CREATE TABLE IF NOT EXISTS durations (
+    run_id INTEGER NOT NULL,
+    test_id INTEGER NOT NULL,
+    setup REAL NOT NULL,
+    call REAL NOT NULL,
+    teardown REAL NOT NULL,
+    outcome TEXT NOT NULL,
+    PRIMARY KEY (run_id, test_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS durations_by_test ON durations (test_id, run_id);
+"""
+
+
+def python_version() -> str:
+    """Return the `major.minor` Python version that runs are recorded with."""
+    return f'{sys.version_info.major}.{sys.version_info.minor}'
+
+
+@dataclass
+class TestDuration:
+    """Durations in seconds of each phase of a single test."""
+
+    __test__ = False  # Not a pytest test class
+
+    nodeid: str
+    setup: float = 0.0
+    call: float = 0.0
+    teardown: float = 0.0
+    outcome: str = 'passed'
+
+    @property
+    def total(self) -> float:
+        """Sum of the phases."""
+        return self.setup + self.call + self.teardown
+
+
+@dataclass
+class Run:
+    """Summary of a recorded test run."""
+
+    started: float
+    commit_sha: str
+    python: str
+    shard: str
+    wall: float
+    tests: int
+
+
+@dataclass
+class Regression:
+    """Latest duration of a test compared with the median of the previous runs."""
+
+    nodeid: str
+    latest: float
+    median: float
+
+    @property
+    def ratio(self) -> float:
+        """Factor that the test slowed down by."""
+        return self.latest / self.median if self.median else float('inf')
+
+
+def _connect(db_path: Path) -> sqlite3.Connection:
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def record_run(
+    db_path: Path,
+    tests: Iterable[TestDuration],
+    *,
+    wall: float,
+    commit_sha: str = '',
+    python: Optional[str] = None,
+    shard: str = '',
+) -> int:
+    """Append a test run to the history and remove the oldest runs beyond `MAX_RUNS`.
+
+    Args:
+        db_path: path to the SQLite database, which is created if necessary
+        tests: durations of each test that ran
+        wall: elapsed time of the whole session in seconds
+        commit_sha: git commit that was tested
+        python: Python version. Defaults to the current version
+        shard: `i/n` shard from `calcipy.pytest_shard` or an empty string for a full run
+
+    Returns:
+        ID of the new run
+
+    """
+    with closing(_connect(db_path)) as conn, conn:
+        cursor = conn.execute(
+            'INSERT INTO runs (started, commit_sha, python, shard, wall) VALUES (?, ?, ?, ?, ?)',
+            (time.time(), commit_sha, python or python_version(), shard, wall),
+        )
+        run_id = int(cursor.lastrowid or 0)
+        for test in tests:
+            conn.execute('INSERT OR IGNORE INTO tests (nodeid) VALUES (?)', (test.nodeid,))
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO durations (run_id, test_id, setup, call, teardown, outcome)
+                SELECT ?, id, ?, ?, ?, ? FROM tests WHERE nodeid = ?
+                """,
+                (run_id, test.setup, test.call, test.teardown, test.outcome, test.nodeid),
+            )
+        conn.execute('DELETE FROM runs WHERE id <= ?', (run_id - MAX_RUNS,))
+        conn.execute('DELETE FROM durations WHERE run_id <= ?', (run_id - MAX_RUNS,))
+    return run_id
+
+
+def _recent_durations(
+    conn: sqlite3.Connection,
+    *,
+    window: int,
+    python: Optional[str],
+    include_shards: bool,
+    before_run: Optional[int] = None,
+) -> Dict[str, List[float]]:
+    """Return the total durations of each passing test in its most recent runs, newest first."""
+    rows = conn.execute(
+        """
+        SELECT nodeid, total FROM (
+            SELECT tests.nodeid, durations.setup + durations.call + durations.teardown AS total,
+                ROW_NUMBER() OVER (PARTITION BY durations.test_id ORDER BY durations.run_id DESC) AS recent
+            FROM durations
+            JOIN runs ON runs.id = durations.run_id
+            JOIN tests ON tests.id = durations.test_id
+            WHERE durations.outcome = 'passed'
+                AND (? IS NULL OR runs.python = ?)
+                AND (? OR runs.shard = '')
+                AND (? IS NULL OR runs.id < ?)
+        ) WHERE recent <= ? ORDER BY recent
+        """,
+        (python, python, include_shards, before_run, before_run, window),
+    )
+    recent: Dict[str, List[float]] = {}
+    for nodeid, total in rows:
+        recent.setdefault(nodeid, []).append(total)
+    return recent
+
+
+def median_durations(
+    db_path: Path,
+    *,
+    window: int = 5,
+    python: Optional[str] = None,
+    include_shards: bool = True,
+) -> Dict[str, float]:
+    """Return the median duration of each test over its most recent passing runs.
+
+    Args:
+        db_path: duration history database
+        window: number of recent runs of each test to use
+        python: only use runs with this Python version. Defaults to all versions
+        include_shards: if False, only use full runs so that the result doesn't change between the shards of a run
+
+    Returns:
+        Lookup of node ID to the median seconds or an empty dictionary if there is no history
+
+    """
+    if not db_path.is_file():
+        return {}
+    with closing(_connect(db_path)) as conn:
+        recent = _recent_durations(conn, window=window, python=python, include_shards=include_shards)
+    return {nodeid: statistics.median(totals) for nodeid, totals in recent.items()}
+
+
+def regressions(
+    db_path: Path,
+    *,
+    window: int = 5,
+    python: Optional[str] = None,
+    min_seconds: float = 0.05,
+) -> List[Regression]:
+    """Compare each test in the latest run with the median of its previous runs.
+
+    Args:
+        db_path: duration history database
+        window: number of previous runs of each test for the median
+        python: only use runs with this Python version. Defaults to all versions
+        min_seconds: ignore tests that took less than this in the latest run, since small durations are noisy
+
+    Returns:
+        Tests that were slower than their median, sorted by the largest increase first
+
+    """
+    if not db_path.is_file():
+        return []
+    with closing(_connect(db_path)) as conn:
+        latest_run = conn.execute('SELECT MAX(id) FROM runs WHERE (? IS NULL OR python = ?)', (python, python))
+        if (run_id := latest_run.fetchone()[0]) is None:
+            return []
+        latest = dict(
+            conn.execute(
+                """
+                SELECT tests.nodeid, durations.setup + durations.call + durations.teardown FROM durations
+                JOIN tests ON tests.id = durations.test_id
+                WHERE durations.run_id = ? AND durations.outcome = 'passed'
+                """,
+                (run_id,),
+            ).fetchall()
+        )
+        previous = _recent_durations(conn, window=window, python=python, include_shards=True, before_run=run_id)
+    found = [
+        Regression(nodeid=nodeid, latest=total, median=statistics.median(previous[nodeid]))
+        for nodeid, total in latest.items()
+        if nodeid in previous and total >= min_seconds
+    ]
+    return sorted(
+        (reg for reg in found if reg.latest > reg.median), key=lambda reg: (reg.median - reg.latest, reg.nodeid)
+    )
+
+
+def recent_runs(db_path: Path, *, limit: int = 10, python: Optional[str] = None) -> List[Run]:
+    """Return the most recent runs oldest first to show the trend of the suite time."""
+    if not db_path.is_file():
+        return []
+    with closing(_connect(db_path)) as conn:
+        rows = conn.execute(
+            """
+            SELECT runs.started, runs.commit_sha, runs.python, runs.shard, runs.wall, COUNT(durations.test_id)
+            FROM runs LEFT JOIN durations ON durations.run_id = runs.id
+            WHERE (? IS NULL OR runs.python = ?)
+            GROUP BY runs.id ORDER BY runs.id DESC LIMIT ?
+            """,
+            (python, python, limit),
+        ).fetchall()
+    return list(starmap(Run, reversed(rows)))
+
+
+def read_shard_durations(path: Path) -> Dict[str, float]:
+    """Return the durations from `SHARD_DURATIONS_NAME` or an empty dictionary if missing or invalid."""
+    with suppress(OSError, ValueError):
+        data = json.loads(path.read_text(encoding='utf-8'))
+        if isinstance(data, dict):
+            return {str(nodeid): float(seconds) for nodeid, seconds in data.items()}
+    return {}
+
+
+def write_shard_durations(path: Path, durations: Mapping[str, float]) -> None:
+    """Write the durations with stable formatting, so that the committed file only changes when a duration does."""
+    rounded = {nodeid: round(seconds, 3) for nodeid, seconds in sorted(durations.items())}
+    path.write_text(json.dumps(rounded, indent=1) + '\n', encoding='utf-8')
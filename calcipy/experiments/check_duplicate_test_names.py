@@ -1,53 +1,152 @@
-"""Experiment with checking for duplicate test names."""
+"""Experiment with checking for duplicate test names.
+
+A test is a duplicate when a module-level test function has the same name in more than one test file, or when a test
+is defined twice in the same module or class so that only the last definition runs.
+
+"""
 
 import ast
+import json
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import suppress
 from pathlib import Path
 
-from beartype.typing import List, Union
+from beartype.typing import Any, Callable, Dict, List, Optional, Union
 from corallium.log import LOGGER
 
+from calcipy.task_cache import FileHasher, write_atomic
+
+PARALLEL_MIN_FILES = 32
+"""Minimum number of files to parse before a process pool is used, since starting the workers has a fixed cost."""
+
+_HASH_INDEX = 'test_scan_hashes.json'
+
+_Scanner = Callable[[str], Dict[str, Any]]
+
 
-def _show_info(function: Union[ast.FunctionDef, ast.AsyncFunctionDef]) -> None:
-    """Print info about the function."""
-    LOGGER.info('> name', name=function.name)
-    if function.args.args:
-        LOGGER.info('\t args', args=function.args.args)
+def _scan_path(scanner: _Scanner, path: Path) -> Dict[str, Any]:
+    """Read and scan a single file, which runs in a worker process."""
+    return scanner(path.read_text(encoding='utf-8'))
+
+
+def scan_test_files(
+    test_path: Path,
+    scanner: _Scanner,
+    *,
+    cache_name: str,
+    cache_dir: Optional[Path] = None,
+    workers: Optional[int] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """Scan every `test_*.py` file, reusing the cached result of files with unchanged content.
+
+    Args:
+        test_path: directory of the tests
+        scanner: top-level function that returns a JSON-serializable result for the source of a file
+        cache_name: name of the cache file for the scanner, which should change when the result format changes
+        cache_dir: directory for the cache. Results are not cached when None
+        workers: maximum number of worker processes. Defaults to the number of CPUs
+
+    Returns:
+        Lookup of posix path relative to `test_path` to the result of the scanner
+
+    """
+    paths = sorted(test_path.rglob('test_*.py'))
+    cached: Dict[str, Dict[str, Any]] = {}
+    hasher: Optional[FileHasher] = None
+    if cache_dir:
+        with suppress(OSError, ValueError):
+            cached = json.loads((cache_dir / cache_name).read_text(encoding='utf-8'))
+        hasher = FileHasher(cache_dir / _HASH_INDEX)
 
+    entries: Dict[str, Dict[str, Any]] = {}
+    pending: Dict[str, Path] = {}
+    for path in paths:
+        rel_path = path.relative_to(test_path).as_posix()
+        digest = hasher.digest(path) if hasher else ''
+        if hasher and (entry := cached.get(rel_path)) and entry.get('digest') == digest:
+            entries[rel_path] = entry
+        else:
+            entries[rel_path] = {'digest': digest}
+            pending[rel_path] = path
 
-def run(test_path: Path) -> List[str]:  # noqa: C901
+    if len(pending) >= PARALLEL_MIN_FILES and (workers or os.cpu_count() or 1) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_scan_path, [scanner] * len(pending), pending.values(), chunksize=16))
+    else:
+        results = [_scan_path(scanner, path) for path in pending.values()]
+    for rel_path, result in zip(pending, results, strict=True):
+        entries[rel_path]['result'] = result
+
+    if cache_dir and hasher:
+        hasher.save()
+        if entries != cached:
+            write_atomic(cache_dir / cache_name, json.dumps(entries))
+    LOGGER.info('Scanned test files', files=len(paths), parsed=len(pending), cache=cache_name)
+    return {rel_path: entry['result'] for rel_path, entry in entries.items()}
+
+
+def _scan_scope(body: List[ast.stmt], prefix: str, names: Dict[str, Any]) -> None:
+    """Record the test functions in the module or class body and recurse into classes."""
+    seen = set()
+    for node in body:
+        if isinstance(node, ast.FunctionDef | ast.AsyncFunctionDef) and node.name.startswith('test_'):
+            if node.name in seen:
+                names['shadowed'].append(f'{prefix}{node.name}')
+            seen.add(node.name)
+            names['count'] += 1
+            if not prefix:
+                names['functions'].append(node.name)
+        elif isinstance(node, ast.ClassDef):
+            _scan_scope(node.body, f'{prefix}{node.name}::', names)
+
+
+def scan_test_names(source: str) -> Dict[str, Union[int, List[str]]]:
+    """Return the module-level test functions, the tests that are shadowed in their scope, and the number of tests."""
+    names: Dict[str, Any] = {'functions': [], 'shadowed': [], 'count': 0}
+    with suppress(SyntaxError, ValueError):
+        _scan_scope(ast.parse(source).body, '', names)
+    return names
+
+
+def run(test_path: Path, *, cache_dir: Optional[Path] = None, workers: Optional[int] = None) -> List[str]:
     """Check for duplicates in the test suite.
 
     Inspired by: https://stackoverflow.com/a/67840804/3219667
 
+    Args:
+        test_path: directory of the tests
+        cache_dir: optional directory to cache the test names of each file by content
+        workers: maximum number of processes to parse files in parallel
+
+    Returns:
+        Sorted names of tests defined in more than one module and `path::Class::name` of tests shadowed in their scope
+
     """
-    summary = set()
-    duplicates = []
-
-    for path_test in test_path.rglob('test_*.py'):
-        LOGGER.info(path_test.as_posix())
-        parsed_ast = ast.parse(path_test.read_text())
-
-        for node in parsed_ast.body:
-            if isinstance(node, ast.FunctionDef):
-                if node.name in summary and node.name.startswith('test_'):
-                    duplicates.append(node.name)
-                summary.add(node.name)
-                _show_info(node)
-            elif isinstance(node, ast.ClassDef):
-                LOGGER.info('Class name', name=node.name)
-                for method in node.body:
-                    if isinstance(method, ast.FunctionDef):
-                        _show_info(method)
-
-        for node in ast.walk(parsed_ast):  # type: ignore[assignment]
-            if isinstance(node, ast.FunctionDef | ast.AsyncFunctionDef) and node.name not in summary:
-                LOGGER.info('Found new function(s) through walking')
-                _show_info(node)
-                summary.add(node.name)
-
-    if duplicates:
-        LOGGER.error('Found Duplicates', duplicates=duplicates)
-    return duplicates
+    scanned = scan_test_files(
+        test_path, scan_test_names, cache_name='test_names.json', cache_dir=cache_dir, workers=workers
+    )
+
+    modules_by_name: Dict[str, List[str]] = defaultdict(list)
+    shadowed: List[str] = []
+    for rel_path, names in scanned.items():
+        for name in dict.fromkeys(names['functions']):
+            modules_by_name[name].append(rel_path)
+        shadowed.extend(f'{rel_path}::{qualname}' for qualname in names['shadowed'])
+    across_modules = {name: paths for name, paths in modules_by_name.items() if len(paths) > 1}
+
+    LOGGER.info(
+        'Checked test names',
+        files=len(scanned),
+        tests=sum(names['count'] for names in scanned.values()),
+        duplicates=len(across_modules) + len(shadowed),
+    )
+    for name, paths in sorted(across_modules.items()):
+        LOGGER.error('Test name is used in multiple modules', name=name, paths=paths)
+    for qualname in shadowed:
+        LOGGER.error('Test is redefined in the same scope and only the last definition runs', test=qualname)
+    return sorted([*across_modules, *shadowed])
 
 
 if __name__ == '__main__':  # pragma: no cover
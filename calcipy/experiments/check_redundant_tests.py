@@ -0,0 +1,186 @@
+"""Experiment with finding redundant tests by fingerprinting the normalized AST of each test function.
+
+Two fingerprints are computed for each test:
+
+- `identical`: the AST without the test name and docstrings, so only copy-pasted tests match
+- `similar`: the AST without any names, attributes, or literal values, so tests with the same structure match, such as
+    tests that could be combined with `pytest.mark.parametrize`
+
+Fingerprints are cached by file content and computed in parallel with `check_duplicate_test_names.scan_test_files`.
+
+"""
+
+import ast
+import copy
+import hashlib
+from collections import defaultdict
+from contextlib import suppress
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from beartype.typing import Any, Dict, List, Mapping, Optional
+from corallium.log import LOGGER
+
+from .check_duplicate_test_names import scan_test_files
+
+DEFAULT_MIN_SIZE = 20
+"""Default minimum number of AST nodes for a test to be compared by structure, since short tests are often similar."""
+
+
+class _Normalizer(ast.NodeTransformer):
+    """Remove the parts of a test function that don't change what it does."""
+
+    def __init__(self, *, strip_names: bool) -> None:
+        self.strip_names = strip_names
+
+    def _visit_definition(self, node: Any) -> Any:
+        if ast.get_docstring(node, clean=False) is not None:
+            node.body = node.body[1:] or [ast.Pass()]
+        node.name = '_'
+        return self.generic_visit(node)
+
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> Any:
+        return self._visit_definition(node)
+
+    def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef) -> Any:
+        return self._visit_definition(node)
+
+    def visit_ClassDef(self, node: ast.ClassDef) -> Any:
+        return self._visit_definition(node)
+
+    def visit_Name(self, node: ast.Name) -> ast.Name:
+        if self.strip_names:
+            node.id = '_'
+        return node
+
+    def visit_arg(self, node: ast.arg) -> ast.arg:
+        if self.strip_names:
+            node.arg = '_'
+        return self.generic_visit(node)  # type: ignore[return-value]
+
+    def visit_Attribute(self, node: ast.Attribute) -> ast.Attribute:
+        if self.strip_names:
+            node.attr = '_'
+        return self.generic_visit(node)  # type: ignore[return-value]
+
+    def visit_keyword(self, node: ast.keyword) -> ast.keyword:
+        if self.strip_names and node.arg:
+            node.arg = '_'
+        return self.generic_visit(node)  # type: ignore[return-value]
+
+    def visit_Constant(self, node: ast.Constant) -> ast.Constant:
+        if self.strip_names:
+            node.value = type(node.value).__name__
+        return node
+
+
+def _fingerprint(node: ast.AST, *, strip_names: bool) -> str:
+    normalized = _Normalizer(strip_names=strip_names).visit(node)
+    dumped = ast.dump(normalized, annotate_fields=False, include_attributes=False)
+    return hashlib.blake2b(dumped.encode('utf-8'), digest_size=12).hexdigest()
+
+
+def _collect_tests(body: List[ast.stmt], prefix: str, found: List[List[Any]]) -> None:
+    for node in body:
+        if isinstance(node, ast.FunctionDef | ast.AsyncFunctionDef) and node.name.startswith('test_'):
+            size = sum(1 for _ in ast.walk(node))
+            identical = _fingerprint(copy.deepcopy(node), strip_names=False)
+            similar = _fingerprint(copy.deepcopy(node), strip_names=True)
+            found.append([f'{prefix}{node.name}', node.lineno, identical, similar, size])
+        elif isinstance(node, ast.ClassDef):
+            _collect_tests(node.body, f'{prefix}{node.name}::', found)
+
+
+def fingerprint_tests(source: str) -> Dict[str, List[List[Any]]]:
+    """Return `[qualname, line number, identical fingerprint, similar fingerprint, AST node count]` for each test."""
+    found: List[List[Any]] = []
+    with suppress(SyntaxError, ValueError):
+        _collect_tests(ast.parse(source).body, '', found)
+    return {'tests': found}
+
+
+@dataclass
+class Cluster:
+    """Tests with the same fingerprint."""
+
+    kind: str
+    """Either 'identical' or 'similar'."""
+
+    tests: List[str] = field(default_factory=list)
+    """Node IDs of each test."""
+
+    size: int = 0
+    """Number of AST nodes in the first test."""
+
+    seconds: Optional[float] = None
+    """Median duration of the tests that could be removed (all but the slowest) if there is duration history."""
+
+
+def _median_seconds(nodeid: str, durations: Mapping[str, float]) -> Optional[float]:
+    """Return the total median duration of a test and each of its parameters."""
+    matches = [seconds for key, seconds in durations.items() if key == nodeid or key.startswith(f'{nodeid}[')]
+    return sum(matches) if matches else None
+
+
+def run(
+    test_path: Path,
+    *,
+    cache_dir: Optional[Path] = None,
+    workers: Optional[int] = None,
+    min_size: int = DEFAULT_MIN_SIZE,
+    durations: Optional[Mapping[str, float]] = None,
+) -> List[Cluster]:
+    """Find clusters of identical or similar tests.
+
+    Args:
+        test_path: directory of the tests. Node IDs are relative to the parent, so pass a relative path from the rootdir
+        cache_dir: optional directory to cache the fingerprints of each file by content
+        workers: maximum number of processes to parse files in parallel
+        min_size: minimum number of AST nodes for a test to be reported as similar to another
+        durations: optional median duration by node ID, such as from `calcipy.duration_history.median_durations`
+
+    Returns:
+        Identical clusters and then similar clusters that aren't entirely identical, largest first
+
+    """
+    scanned = scan_test_files(
+        test_path, fingerprint_tests, cache_name='test_fingerprints.json', cache_dir=cache_dir, workers=workers
+    )
+    by_identical: Dict[str, List[Any]] = defaultdict(list)
+    by_similar: Dict[str, List[Any]] = defaultdict(list)
+    for rel_path, result in scanned.items():
+        for qualname, _lineno, identical, similar, size in result['tests']:
+            test = ((test_path / rel_path).as_posix() + f'::{qualname}', size)
+            by_identical[identical].append(test)
+            if size >= min_size:
+                by_similar[similar].append(test)
+
+    identical_groups = [group for group in by_identical.values() if len(group) > 1]
+    in_identical = {frozenset(name for name, _ in group) for group in identical_groups}
+    similar_groups = [
+        group
+        for group in by_similar.values()
+        if len(group) > 1 and frozenset(name for name, _ in group) not in in_identical
+    ]
+
+    clusters = []
+    for kind, groups in (('identical', identical_groups), ('similar', similar_groups)):
+        for group in sorted(groups, key=lambda grp: (-len(grp), grp[0][0])):
+            cluster = Cluster(kind=kind, tests=sorted(name for name, _ in group), size=group[0][1])
+            if durations:
+                seconds = [sec for name in cluster.tests if (sec := _median_seconds(name, durations)) is not None]
+                cluster.seconds = sum(seconds) - max(seconds) if seconds else None
+            clusters.append(cluster)
+
+    LOGGER.info(
+        'Checked for redundant tests',
+        files=len(scanned),
+        tests=sum(len(result['tests']) for result in scanned.values()),
+        identical=len(identical_groups),
+        similar=len(similar_groups),
+    )
+    return clusters
+
+
+if __name__ == '__main__':  # pragma: no cover
+    run(Path('tests'))
@@ -0,0 +1,337 @@
+"""Benchmark the startup latency of each console script against a stored budget.
+
+Each script in `[project.scripts]` is started in a subprocess for `--version`, `--list`, and a no-op task (the full
+dispatch of a real task with the task body replaced). The cold start uses an empty bytecode cache (an OS page cache
+can't be cleared without elevated permissions), the warm start is the median of repeated runs, and one additional
+run with `-X importtime` attributes the import time to each top-level package.
+
+Absolute timings are machine-specific, so the budget stores each timing relative to the startup of a bare interpreter
+(`python -c pass`) that is measured the same way in the same run. The number of imported modules is also budgeted and
+is comparable across machines for the same Python version. The benchmark is not part of the test suite because it
+still depends on the load of the machine.
+
+`calcipy-client` is measured without a daemon (the `noop_no_daemon` scenario), which is the fallback that runs the
+task in the client process.
+
+```sh
+# Compare against the budget and exit with a non-zero code on regression
+python -m calcipy.experiments.startup_benchmark
+# Record a new baseline after an intentional change
+python -m calcipy.experiments.startup_benchmark --update
+```
+
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shlex
+import statistics
+import subprocess  # noqa: S404
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from beartype.typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+from corallium.file_helpers import read_pyproject
+
+from calcipy.daemon_client import SOCKET_ENV_VAR
+
+DEFAULT_BUDGET_PATH = Path('tests/data/startup_budget.json')
+"""Default location of the baseline budget relative to the project directory."""
+
+DEFAULT_TOLERANCE = 0.25
+"""Default fraction that a measurement may exceed the baseline before failing."""
+
+REFERENCE_CODE = 'pass'
+"""Code for the bare interpreter startup that the timings are relative to."""
+
+NOOP_TASKS = {
+    'calcipy': 'lint.check',
+    'calcipy-client': 'lint.check',
+    'calcipy-docs': 'doc.build',
+    'calcipy-lint': 'lint.check',
+    'calcipy-pack': 'pack.lock',
+    'calcipy-tags': 'tags.collect-code-tags',
+    'calcipy-test': 'test.pytest',
+    'calcipy-types': 'types.mypy',
+}
+"""Task dispatched for the no-op scenario of each script."""
+
+_NOOP_SETUP = 'import calcipy.collection as _c; _c._run_task = lambda *_args, **_kwargs: None; '
+"""Replace the task body so that only the startup and dispatch overhead is measured."""
+
+
+@dataclass
+class ImportTiming:
+    """Single line of `-X importtime` output."""
+
+    module: str
+    self_us: int
+    cumulative_us: int
+
+
+@dataclass
+class StartupResult:
+    """Startup measurements for one script and scenario."""
+
+    script: str
+    scenario: str
+    cold_ms: float
+    warm_ms: float
+    modules: int
+    packages: List[Tuple[str, float]] = field(default_factory=list)
+    """Import self-time in milliseconds by top-level package in descending order."""
+
+    reference: Tuple[float, float] = (1.0, 1.0)
+    """Cold and warm start in milliseconds of a bare interpreter, which the timings are relative to."""
+
+    def metrics(self) -> Dict[str, Union[int, float]]:
+        """Return the metrics that are compared against the budget."""
+        return {
+            'cold_ratio': round(self.cold_ms / self.reference[0], 2),
+            'warm_ratio': round(self.warm_ms / self.reference[1], 2),
+            'modules': self.modules,
+        }
+
+
+def parse_importtime(stderr: str) -> List[ImportTiming]:
+    """Parse the `import time: self [us] | cumulative | imported package` lines from stderr.
+
+    Returns:
+        Timings in import order, without the header
+
+    """
+    timings = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        self_us, cumulative_us, module = line.removeprefix('import time:').split('|', maxsplit=2)
+        if self_us.strip().isdigit():
+            timings.append(ImportTiming(module.strip(), int(self_us), int(cumulative_us)))
+    return timings
+
+
+def attribute_by_package(timings: Sequence[ImportTiming]) -> List[Tuple[str, float]]:
+    """Sum the self-time of each top-level package.
+
+    Returns:
+        `(package, milliseconds)` in descending order
+
+    """
+    totals: Dict[str, int] = {}
+    for timing in timings:
+        package = timing.module.split('.', maxsplit=1)[0]
+        totals[package] = totals.get(package, 0) + timing.self_us
+    return sorted(((package, us / 1000) for package, us in totals.items()), key=lambda item: (-item[1], item[0]))
+
+
+def entry_point_code(entry_point: str, script: str) -> str:
+    """Return the `python -c` code that starts the console script like the generated wrapper."""
+    module, func = entry_point.split(':')
+    return f'import sys; from {module} import {func}; sys.argv[0] = {script!r}; sys.exit({func}())'
+
+
+def _run(code: str, args: Sequence[str], *, env: Dict[str, str], importtime: bool = False) -> Tuple[float, str]:
+    """Run the code in a new interpreter and return the wall time in milliseconds and stderr.
+
+    Raises:
+        RuntimeError: if the process exits with a non-zero code
+
+    """
+    cmd = [sys.executable, *(['-X', 'importtime'] if importtime else []), '-c', code, *args]
+    start = time.perf_counter()
+    result = subprocess.run(cmd, capture_output=True, text=True, env=env, check=False)  # noqa: S603
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    if result.returncode:
+        msg = f'Failed ({result.returncode}): {shlex.join(cmd)}\n{result.stderr}'
+        raise RuntimeError(msg)
+    return elapsed_ms, result.stderr
+
+
+def _time_startup(code: str, args: Sequence[str], *, runs: int) -> Tuple[float, float, str]:
+    """Return the cold and median warm start in milliseconds and the stderr of a run with `-X importtime`."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        env = {
+            **os.environ,
+            'PYTHONPYCACHEPREFIX': tmp_dir,
+            'NO_COLOR': '1',
+            # Never forward to a running daemon, which would run the real task body
+            SOCKET_ENV_VAR: str(Path(tmp_dir) / 'no-daemon.sock'),
+        }
+        env.pop('PYTHONDONTWRITEBYTECODE', None)
+        cold_ms, _ = _run(code, args, env=env)
+        warm_ms = statistics.median(_run(code, args, env=env)[0] for _ in range(runs))
+        _, stderr = _run(code, args, env=env, importtime=True)
+    return cold_ms, warm_ms, stderr
+
+
+def measure_reference(*, runs: int) -> Tuple[float, float]:
+    """Measure the cold and warm start of a bare interpreter in milliseconds.
+
+    Returns:
+        `(cold_ms, warm_ms)`
+
+    """
+    cold_ms, warm_ms, _ = _time_startup(REFERENCE_CODE, [], runs=runs)
+    return cold_ms, warm_ms
+
+
+def measure(
+    script: str,
+    entry_point: str,
+    scenario: str,
+    args: Sequence[str],
+    *,
+    runs: int,
+    reference: Tuple[float, float] = (1.0, 1.0),
+) -> StartupResult:
+    """Measure the cold, warm, and per-package import time of one script scenario.
+
+    Args:
+        script: console script name
+        entry_point: `module:function` from `[project.scripts]`
+        scenario: name of the scenario
+        args: CLI arguments for the scenario
+        runs: number of warm runs to take the median of
+        reference: cold and warm start of a bare interpreter from `measure_reference`
+
+    Returns:
+        StartupResult
+
+    """
+    code = entry_point_code(entry_point, script)
+    if scenario.startswith('noop'):
+        code = _NOOP_SETUP + code
+    cold_ms, warm_ms, stderr = _time_startup(code, args, runs=runs)
+    timings = parse_importtime(stderr)
+    return StartupResult(
+        script=script,
+        scenario=scenario,
+        cold_ms=cold_ms,
+        warm_ms=warm_ms,
+        modules=len(timings),
+        packages=attribute_by_package(timings),
+        reference=reference,
+    )
+
+
+def scenarios(script: str) -> Dict[str, List[str]]:
+    """Return the CLI arguments for each benchmarked scenario of a script."""
+    result = {'version': ['--version'], 'list': ['--list']}
+    if noop_task := NOOP_TASKS.get(script):
+        result['noop_no_daemon' if script == 'calcipy-client' else 'noop'] = ['--no-cache', noop_task]
+    return result
+
+
+def find_regressions(
+    results: Sequence[StartupResult],
+    budget: Dict[str, Any],
+    *,
+    tolerance: float,
+) -> List[str]:
+    """Compare each result against the baseline budget.
+
+    Returns:
+        Messages for every metric that exceeded the baseline by more than the tolerance
+
+    """
+    regressions = []
+    for result in results:
+        baseline = budget.get(result.script, {}).get(result.scenario)
+        if baseline is None:
+            regressions.append(f'{result.script} {result.scenario}: missing from the budget (run with --update)')
+            continue
+        for metric, value in result.metrics().items():
+            limit = baseline[metric] * (1 + tolerance)
+            if value > limit:
+                regressions.append(
+                    f'{result.script} {result.scenario}: {metric}={value} exceeds {limit:.1f} '
+                    f'(baseline {baseline[metric]} + {tolerance:.0%})',
+                )
+    return regressions
+
+
+def _print_report(results: Sequence[StartupResult], top: int) -> None:
+    """Print the measurements and the slowest packages to import for each result."""
+    for result in results:
+        timings = f'cold_ms={result.cold_ms:.1f}, warm_ms={result.warm_ms:.1f}'
+        metrics = ', '.join([timings, *(f'{key}={value}' for key, value in result.metrics().items())])
+        packages = ', '.join(f'{package}={ms:.1f}ms' for package, ms in result.packages[:top])
+        print(f'{result.script} {result.scenario}: {metrics}\n    {packages}')  # noqa: T201
+
+
+def run(
+    *,
+    budget_path: Path = DEFAULT_BUDGET_PATH,
+    runs: int = 5,
+    tolerance: Optional[float] = None,
+    update: bool = False,
+    scripts: Optional[Sequence[str]] = None,
+    top: int = 8,
+) -> List[str]:
+    """Benchmark the console scripts and compare against (or update) the budget.
+
+    Returns:
+        List of regressions, which is empty when every measurement is within budget
+
+    """
+    entry_points: Dict[str, str] = read_pyproject()['project']['scripts']
+    reference = measure_reference(runs=runs)
+    print(f'python -c {REFERENCE_CODE!r}: cold_ms={reference[0]:.1f}, warm_ms={reference[1]:.1f}')  # noqa: T201
+    results = [
+        measure(script, entry_point, scenario, args, runs=runs, reference=reference)
+        for script, entry_point in sorted(entry_points.items())
+        if not scripts or script in scripts
+        for scenario, args in scenarios(script).items()
+    ]
+    _print_report(results, top)
+
+    stored = json.loads(budget_path.read_text(encoding='utf-8')) if budget_path.is_file() else {}
+    if update:
+        budget = stored.get('scripts', {})
+        for result in results:
+            budget.setdefault(result.script, {})[result.scenario] = result.metrics()
+        stored = {'tolerance': stored.get('tolerance', DEFAULT_TOLERANCE), 'scripts': budget}
+        budget_path.write_text(json.dumps(stored, indent=2, sort_keys=True) + '\n', encoding='utf-8')
+        return []
+
+    tolerance = stored.get('tolerance', DEFAULT_TOLERANCE) if tolerance is None else tolerance
+    return find_regressions(results, stored.get('scripts', {}), tolerance=tolerance)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """CLI entry point.
+
+    Returns:
+        Exit code
+
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--budget', type=Path, default=DEFAULT_BUDGET_PATH, help='Path to the baseline budget')
+    parser.add_argument('--runs', type=int, default=5, help='Number of warm runs to take the median of')
+    parser.add_argument('--tolerance', type=float, help='Allowed fraction over the baseline')
+    parser.add_argument('--update', action='store_true', help='Record the measurements as the new baseline')
+    parser.add_argument('--script', action='append', help='Only benchmark the named console script(s)')
+    parser.add_argument('--top', type=int, default=8, help='Number of packages to attribute import time to')
+    args = parser.parse_args(argv)
+
+    regressions = run(
+        budget_path=args.budget,
+        runs=args.runs,
+        tolerance=args.tolerance,
+        update=args.update,
+        scripts=args.script,
+        top=args.top,
+    )
+    for regression in regressions:
+        print(f'Over budget: {regression}', file=sys.stderr)  # noqa: T201
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,156 @@
+"""Measure the overhead of runtime type checking by running the tests with checking ON and OFF.
+
+The per-file durations from the JUnit XML report show which tests (and therefore which modules) are the most
+expensive to check, so they can be excluded with `RUNTIME_TYPE_CHECKING_EXCLUDE` or `.calcipy.json` (see
+`calcipy._runtime_type_check_setup`).
+
+```sh
+python -m calcipy.experiments.type_checking_overhead
+# Compare WARNING mode with an exclusion for a subset of the tests
+RUNTIME_TYPE_CHECKING_EXCLUDE=calcipy.md_writer python -m calcipy.experiments.type_checking_overhead \
+    --mode WARNING -- tests/md_writer
+```
+
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess  # noqa: S404
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from xml.etree import ElementTree as ET  # noqa: S405
+
+from beartype.typing import Dict, List, Optional, Sequence
+from corallium.log import LOGGER
+
+
+@dataclass
+class TypeCheckRun:
+    """Timing of one test run."""
+
+    mode: str
+    wall_s: float
+    durations: Dict[str, float]
+    """Total test duration in seconds by JUnit `classname` (the test module or class)."""
+
+
+@dataclass
+class OverheadRow:
+    """Comparison of the durations with checking ON and OFF."""
+
+    name: str
+    on_s: float
+    off_s: float
+
+    @property
+    def overhead(self) -> float:
+        """Fractional increase with checking ON."""
+        return (self.on_s - self.off_s) / self.off_s if self.off_s else 0.0
+
+
+def parse_junit_durations(junit_path: Path) -> Dict[str, float]:
+    """Sum the test durations by `classname` from a JUnit XML report.
+
+    Returns:
+        Lookup of classname to seconds
+
+    """
+    durations: Dict[str, float] = {}
+    root = ET.parse(junit_path).getroot()  # noqa: S314
+    for testcase in root.iter('testcase'):
+        name = testcase.get('classname') or testcase.get('file') or '<unknown>'
+        durations[name] = durations.get(name, 0.0) + float(testcase.get('time') or 0)
+    return durations
+
+
+def run_tests(mode: str, pytest_args: Sequence[str]) -> TypeCheckRun:
+    """Run pytest in a subprocess with the runtime type checking mode.
+
+    Args:
+        mode: 'WARNING', 'ERROR', or 'OFF'
+        pytest_args: additional arguments for pytest
+
+    Returns:
+        TypeCheckRun
+
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        junit_path = Path(tmp_dir) / 'junit.xml'
+        cmd = [sys.executable, '-m', 'pytest', '-q', '-p', 'no:randomly', f'--junitxml={junit_path}', *pytest_args]
+        # An empty value disables checking (corallium reads the same variable and does not accept 'OFF')
+        env = {**os.environ, 'RUNTIME_TYPE_CHECKING_MODE': '' if mode == 'OFF' else mode}
+        start = time.perf_counter()
+        result = subprocess.run(cmd, capture_output=True, text=True, env=env, check=False)  # noqa: S603
+        wall_s = time.perf_counter() - start
+        if result.returncode:
+            LOGGER.warning('Tests failed, so the timing may not be comparable', mode=mode, output=result.stdout[-2000:])
+        return TypeCheckRun(mode=mode, wall_s=wall_s, durations=parse_junit_durations(junit_path))
+
+
+def compare_runs(on_runs: Sequence[TypeCheckRun], off_runs: Sequence[TypeCheckRun]) -> List[OverheadRow]:
+    """Compare the mean durations by classname in descending order of the absolute overhead.
+
+    Returns:
+        List of OverheadRow
+
+    """
+
+    def _mean(runs: Sequence[TypeCheckRun], name: str) -> float:
+        return statistics.mean(run.durations.get(name, 0.0) for run in runs)
+
+    names = {name for run in [*on_runs, *off_runs] for name in run.durations}
+    rows = [OverheadRow(name, _mean(on_runs, name), _mean(off_runs, name)) for name in names]
+    return sorted(rows, key=lambda row: (row.off_s - row.on_s, row.name))
+
+
+def format_report(on_runs: Sequence[TypeCheckRun], off_runs: Sequence[TypeCheckRun], *, top: int) -> str:
+    """Format the total and the per-module overhead as a markdown table.
+
+    Returns:
+        Markdown report
+
+    """
+    total = OverheadRow(
+        'Total (wall time)',
+        statistics.median(run.wall_s for run in on_runs),
+        statistics.median(run.wall_s for run in off_runs),
+    )
+    rows = [total, *compare_runs(on_runs, off_runs)[:top]]
+    lines = [
+        f'| Tests | {on_runs[0].mode} (s) | OFF (s) | Overhead |',
+        '|:------|-----:|-----:|-----:|',
+        *(f'| {row.name} | {row.on_s:.3f} | {row.off_s:.3f} | {row.overhead:+.1%} |' for row in rows),
+    ]
+    return '\n'.join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """CLI entry point.
+
+    Returns:
+        Exit code
+
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--mode', default='ERROR', choices=['ERROR', 'WARNING'], help='Mode when checking is ON')
+    parser.add_argument('--runs', type=int, default=1, help='Number of runs for each mode')
+    parser.add_argument('--top', type=int, default=10, help='Number of test modules to show')
+    parser.add_argument('pytest_args', nargs='*', help='Arguments for pytest (after "--")')
+    args = parser.parse_args(argv)
+
+    on_runs, off_runs = [], []
+    for _ in range(args.runs):
+        on_runs.append(run_tests(args.mode, args.pytest_args))
+        off_runs.append(run_tests('OFF', args.pytest_args))
+    print(format_report(on_runs, off_runs, top=args.top))  # noqa: T201
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
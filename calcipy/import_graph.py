@@ -0,0 +1,227 @@
+"""Static import graph to select the tests affected by a change.
+
+Every Python file in the project is parsed with `ast` to find its imports, which are cached by the content digest of
+the file, so only changed files are parsed again. A test file is affected when it (or a `conftest.py` that applies to
+it) transitively imports a changed module. Imports that can't be found statically (such as `importlib.import_module`)
+are not followed.
+
+"""
+
+from __future__ import annotations
+
+import ast
+import json
+import subprocess  # noqa: S404
+from collections import defaultdict, deque
+from contextlib import suppress
+from dataclasses import dataclass, field
+from fnmatch import fnmatch
+from pathlib import Path
+
+from beartype.typing import Any, Dict, Iterable, List, Optional, Set
+
+from .task_cache import FileHasher, list_input_files, write_atomic
+
+GRAPH_CACHE_NAME = 'import_graph.json'
+"""Name of the file in the cache directory with the imports of each file by content digest."""
+
+_HASH_INDEX = 'import_graph_hashes.json'
+
+GLOBAL_FILES = ('conftest.py', 'pyproject.toml', 'pytest.ini', 'setup.cfg', 'tox.ini', 'uv.lock')
+"""Project files that can affect any test. A change to any of them selects the full test suite."""
+
+DOCS_ONLY_PATTERNS = ('*.md', '*.rst', 'docs/*', 'mkdocs.yml', 'LICENSE*')
+"""`fnmatch` patterns of the non-Python files that can't affect any test. Other non-Python files select all tests."""
+
+TEST_FILE_PATTERNS = ('test_*.py', '*_test.py')
+"""Default pytest `python_files` patterns."""
+
+
+def module_name(rel_path: str) -> str:
+    """Return the dotted module name for a posix path relative to the project, with support for a `src/` layout."""
+    parts = rel_path.removesuffix('.py').split('/')
+    if parts[0] == 'src' and len(parts) > 1:
+        parts = parts[1:]
+    if parts[-1] == '__init__' and len(parts) > 1:
+        parts = parts[:-1]
+    return '.'.join(parts)
+
+
+def parse_imports(source: str, module: str, *, is_package: bool) -> List[str]:
+    """Return every name that may refer to an imported module with relative imports resolved.
+
+    For `from package import name`, both `package` and `package.name` are returned because `name` may be a submodule.
+
+    """
+    package_parts = module.split('.') if is_package else module.split('.')[:-1]
+    names: Set[str] = set()
+    for node in ast.walk(ast.parse(source)):
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                parent = package_parts[: len(package_parts) - node.level + 1]
+                base = '.'.join([*parent, node.module] if node.module else parent)
+            else:
+                base = node.module or ''
+            if base:
+                names.add(base)
+            names.update(f'{base}.{alias.name}' if base else alias.name for alias in node.names if alias.name != '*')
+    return sorted(names)
+
+
+@dataclass
+class ImportGraph:
+    """Imports between the modules of a project."""
+
+    paths: Dict[str, str] = field(default_factory=dict)
+    """Lookup of module name to the posix path relative to the project."""
+
+    imports: Dict[str, Set[str]] = field(default_factory=dict)
+    """Lookup of module name to the names that it imports, including the parent packages."""
+
+    @classmethod
+    def build(cls, base_dir: Path, cache_dir: Path) -> ImportGraph:
+        """Parse the imports of every project Python file, reusing the cached imports of unchanged files.
+
+        Returns:
+            ImportGraph
+
+        """
+        cache_path = cache_dir / GRAPH_CACHE_NAME
+        cached: Dict[str, Dict[str, Any]] = {}
+        with suppress(OSError, ValueError):
+            cached = json.loads(cache_path.read_text(encoding='utf-8'))
+        hasher = FileHasher(cache_dir / _HASH_INDEX)
+
+        entries: Dict[str, Dict[str, Any]] = {}
+        for path in list_input_files(base_dir, ['**/*.py']):
+            rel_path = path.relative_to(base_dir).as_posix()
+            digest = hasher.digest(path)
+            if (entry := cached.get(rel_path)) and entry.get('digest') == digest:
+                entries[rel_path] = entry
+                continue
+            module = module_name(rel_path)
+            try:
+                names = parse_imports(path.read_text(encoding='utf-8'), module, is_package=path.name == '__init__.py')
+            except (SyntaxError, UnicodeDecodeError, ValueError):
+                names = []
+            entries[rel_path] = {'digest': digest, 'imports': names}
+        hasher.save()
+        if entries != cached:
+            write_atomic(cache_path, json.dumps(entries))
+        return cls.from_entries({rel_path: entry['imports'] for rel_path, entry in entries.items()})
+
+    @classmethod
+    def from_entries(cls, entries: Dict[str, Iterable[str]]) -> ImportGraph:
+        """Create the graph from the imported names of each file.
+
+        Every module also depends on its parent packages, which Python imports first. Test modules depend on each
+        `conftest.py` in their package or its parents, since pytest loads them implicitly.
+
+        Returns:
+            ImportGraph
+
+        """
+        graph = cls(paths={module_name(rel_path): rel_path for rel_path in entries})
+        for rel_path, names in entries.items():
+            module = module_name(rel_path)
+            deps: Set[str] = set()
+            for name in [*names, module]:
+                # Keep names that aren't project files, so that the importers of a deleted module are still found
+                parts = name.split('.')
+                deps.update('.'.join(parts[:idx]) for idx in range(1, len(parts) + 1))
+            deps.update(
+                conftest
+                for idx in range(len(module.split('.')))
+                if (conftest := '.'.join([*module.split('.')[:idx], 'conftest'])) in graph.paths
+            )
+            deps.discard(module)
+            graph.imports[module] = deps
+        return graph
+
+    def dependents(self, modules: Iterable[str]) -> Set[str]:
+        """Return the modules and every module that transitively imports any of them."""
+        reverse: Dict[str, Set[str]] = defaultdict(set)
+        for module, deps in self.imports.items():
+            for dep in deps:
+                reverse[dep].add(module)
+        found = set(modules)
+        queue = deque(found)
+        while queue:
+            for importer in reverse[queue.popleft()] - found:
+                found.add(importer)
+                queue.append(importer)
+        return found
+
+
+def run_git(base_dir: Path, *args: str) -> List[str]:
+    """Return the lines of output from a git command.
+
+    Raises:
+        RuntimeError: if the git command fails
+
+    """
+    try:
+        result = subprocess.run(['git', *args], capture_output=True, check=True, cwd=base_dir, text=True)  # noqa: S603, S607
+    except (subprocess.CalledProcessError, FileNotFoundError) as exc:
+        msg = f'Failed to run git {" ".join(args)}: {getattr(exc, "stderr", exc)}'
+        raise RuntimeError(msg) from exc
+    return [line for line in result.stdout.splitlines() if line]
+
+
+def merge_base(base_dir: Path, since: str) -> str:
+    """Return the commit where the git ref and `HEAD` diverged."""
+    return run_git(base_dir, 'merge-base', since, 'HEAD')[0]
+
+
+def changed_files(base_dir: Path, since: str) -> List[str]:
+    """Return the files changed since the merge base with the git ref, including uncommitted and untracked files.
+
+    Returns:
+        Sorted posix paths relative to `base_dir`
+
+    """
+    diff = run_git(base_dir, 'diff', '--name-only', '--no-renames', '--relative', merge_base(base_dir, since))
+    untracked = run_git(base_dir, 'ls-files', '--others', '--exclude-standard')
+    return sorted({*diff, *untracked})
+
+
+def affected_tests(
+    base_dir: Path,
+    changed: Iterable[str],
+    *,
+    cache_dir: Path,
+    test_dir: str = 'tests',
+) -> Optional[List[str]]:
+    """Select the test files that are affected by the changed files.
+
+    Args:
+        base_dir: project directory
+        changed: posix paths relative to `base_dir` (deleted files are supported)
+        cache_dir: directory for the cached imports
+        test_dir: directory of the tests relative to `base_dir`
+
+    Returns:
+        Sorted test file paths or None if the full test suite should run, which is for a change to a file in
+            `GLOBAL_FILES` or to a non-Python file that doesn't match `DOCS_ONLY_PATTERNS` (e.g. test or package data)
+
+    """
+    changed_modules = set()
+    for rel_path in changed:
+        if rel_path in GLOBAL_FILES:
+            return None
+        if rel_path.endswith('.py'):
+            changed_modules.add(module_name(rel_path))
+        elif not any(fnmatch(rel_path, pattern) for pattern in DOCS_ONLY_PATTERNS):
+            return None
+
+    graph = ImportGraph.build(base_dir, cache_dir)
+    affected = graph.dependents(changed_modules)
+    return sorted(
+        test_path
+        for module in affected
+        if (test_path := graph.paths.get(module))
+        and test_path.startswith(f'{test_dir}/')
+        and any(fnmatch(Path(test_path).name, pattern) for pattern in TEST_FILE_PATTERNS)
+    )
@@ -1,18 +1,21 @@
 """Invoke Helpers."""
 
 import platform
-from contextlib import suppress
+from contextlib import contextmanager, suppress
+from contextvars import ContextVar
 from functools import lru_cache
 from os import environ
 from pathlib import Path
 
-from beartype.typing import Any, Optional
+from beartype.typing import Any, Iterator, List, Optional
 from corallium.file_helpers import COPIER_ANSWERS, read_yaml_file
 from corallium.log import LOGGER
 from corallium.vcs import find_repo_root
 from invoke.context import Context
 from invoke.runners import Result
 
+from .tracing import span
+
 # ----------------------------------------------------------------------------------------------------------------------
 # General Invoke
 
@@ -25,14 +28,37 @@ def use_pty() -> bool:
     return not environ.get('GITHUB_ACTION')
 
 
+_RECORDED_RESULTS: ContextVar[Optional[List[Result]]] = ContextVar('_RECORDED_RESULTS', default=None)
+"""Results from `run` within the active `record_results` block of the current thread."""
+
+
+@contextmanager
+def record_results() -> Iterator[List[Result]]:
+    """Collect the `Result` of every `run` call in the current thread while the context is active.
+
+    Yields:
+        List that is extended with each `Result`
+
+    """
+    results: List[Result] = []
+    token = _RECORDED_RESULTS.set(results)
+    try:
+        yield results
+    finally:
+        _RECORDED_RESULTS.reset(token)
+
+
 def run(ctx: Context, *run_args: Any, **run_kwargs: Any) -> Optional[Result]:
     """Return wrapped `invoke.run` to run within the `working_dir`."""
     working_dir = '.'
     with suppress(AttributeError):
         working_dir = ctx.config.gto.working_dir
 
-    with ctx.cd(working_dir):
-        return ctx.run(*run_args, **run_kwargs)
+    with ctx.cd(working_dir), span(str(run_args[0]) if run_args else 'run', 'run'):
+        result = ctx.run(*run_args, **run_kwargs)
+    if result is not None and (recorded := _RECORDED_RESULTS.get()) is not None:
+        recorded.append(result)
+    return result
 
 
 # ----------------------------------------------------------------------------------------------------------------------
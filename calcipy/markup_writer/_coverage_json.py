@@ -0,0 +1,161 @@
+"""Streaming reader for the summary blocks of `coverage.json`.
+
+The report from `coverage json` has arrays of the executed, missing, and excluded lines (and branches) of every file,
+which can be hundreds of megabytes. The file is read in chunks and only `meta`, `totals`, and the `summary` of each
+file are decoded. Every other value is skipped by searching for the next structural character without being parsed.
+
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from pathlib import Path
+
+from beartype.typing import Any, Dict, Iterator, Optional, TextIO
+
+CHUNK_SIZE = 1 << 20
+"""Number of characters read at a time."""
+
+_STRUCTURAL = re.compile(r'["{}\[\]]')
+_SCALAR = re.compile(r'[^,}\]\s]+')
+_WHITESPACE = re.compile(r'\s*')
+_STRING_BODY = re.compile(r'(?:[^"\\]|\\.)*"', re.DOTALL)
+_scanstring = json.decoder.scanstring  # type: ignore[attr-defined]
+
+
+class _JsonStream:
+    """Buffered JSON reader that can decode or skip one value at a time."""
+
+    def __init__(self, handle: TextIO, chunk_size: int = CHUNK_SIZE) -> None:
+        self.handle = handle
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self._mark: Optional[int] = None
+
+    def _fill(self) -> bool:
+        """Read the next chunk and drop the consumed text unless a value is being captured."""
+        chunk = self.handle.read(self.chunk_size)
+        if not chunk:
+            return False
+        if self._mark is None:
+            self.buf = self.buf[self.pos :]
+            self.pos = 0
+        self.buf += chunk
+        return True
+
+    def peek(self) -> str:
+        """Return the next character that isn't whitespace without consuming it."""
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()  # type: ignore[union-attr]
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                msg = 'Unexpected end of JSON'
+                raise ValueError(msg)
+
+    def expect(self, char: str) -> None:
+        if (found := self.peek()) != char:
+            msg = f'Expected {char!r} in JSON at {self.pos}, but found {found!r}'
+            raise ValueError(msg)
+        self.pos += 1
+
+    def read_string(self) -> str:
+        self.expect('"')
+        while _STRING_BODY.match(self.buf, self.pos) is None:
+            if not self._fill():
+                msg = 'Unterminated string in JSON'
+                raise ValueError(msg)
+        value, self.pos = _scanstring(self.buf, self.pos)
+        return value
+
+    def skip_value(self) -> None:
+        """Consume the next value without decoding it."""
+        char = self.peek()
+        if char == '"':
+            self.read_string()
+            return
+        if char not in '[{':
+            while (match := _SCALAR.match(self.buf, self.pos)) and match.end() == len(self.buf) and self._fill():
+                pass
+            self.pos = match.end() if match else self.pos
+            return
+        depth = 0
+        while True:
+            if (match := _STRUCTURAL.search(self.buf, self.pos)) is None:
+                self.pos = len(self.buf)
+                if not self._fill():
+                    msg = 'Unexpected end of JSON'
+                    raise ValueError(msg)
+                continue
+            if match.group() == '"':
+                self.pos = match.start()
+                self.read_string()
+                continue
+            self.pos = match.end()
+            depth += 1 if match.group() in '[{' else -1
+            if depth == 0:
+                return
+
+    def load_value(self) -> Any:
+        """Decode the next value."""
+        self._mark = self.pos + len(_WHITESPACE.match(self.buf, self.pos).group())  # type: ignore[union-attr]
+        try:
+            self.skip_value()
+            return json.loads(self.buf[self._mark : self.pos])
+        finally:
+            self._mark = None
+
+    def iter_object(self) -> Iterator[str]:
+        """Yield each key of an object, where the caller must consume the value before the next key."""
+        self.expect('{')
+        if self.peek() == '}':
+            self.pos += 1
+            return
+        while True:
+            key = self.read_string()
+            self.expect(':')
+            yield key
+            if self.peek() == ',':
+                self.pos += 1
+                continue
+            self.expect('}')
+            return
+
+
+def _read_file_summaries(stream: _JsonStream) -> Dict[str, Any]:
+    files: Dict[str, Any] = {}
+    for path_file in stream.iter_object():
+        file_obj: Dict[str, Any] = {}
+        for key in stream.iter_object():
+            if key == 'summary':
+                file_obj['summary'] = stream.load_value()
+            else:
+                stream.skip_value()
+        files[path_file] = file_obj
+    return files
+
+
+def read_coverage_summary(path_coverage: Path, *, chunk_size: int = CHUNK_SIZE) -> Dict[str, Any]:
+    """Read `coverage.json` without the per-line data.
+
+    Args:
+        path_coverage: path to the output of `coverage json`
+        chunk_size: number of characters to read at a time
+
+    Returns:
+        Dict[str, Any]: `meta`, `totals`, and `files` with only the `summary` of each file
+
+    """
+    data: Dict[str, Any] = {'meta': {}, 'files': {}, 'totals': {}}
+    with path_coverage.open(encoding='utf-8') as handle:
+        stream = _JsonStream(handle, chunk_size=chunk_size)
+        for key in stream.iter_object():
+            if key in {'meta', 'totals'}:
+                data[key] = stream.load_value()
+            elif key == 'files':
+                data['files'] = _read_file_summaries(stream)
+            else:
+                stream.skip_value()
+    return data
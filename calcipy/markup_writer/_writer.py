@@ -1,39 +1,193 @@
-"""Markup Machine."""
+"""Markup Machine.
+
+Files are streamed line by line to a temporary file that atomically replaces the original, so only the output of the
+current handler is held in memory and an interrupted run never leaves a partial file. Files are only replaced when their
+content changed and files without a `cts` marker are skipped without being decoded.
+
+Each section has a manifest of its input files in `.calcipy_cache/markup_sections.json`, so a section is only
+regenerated when an input changed or when the text of the section no longer matches the last output.
+
+The `CLI_OUTPUT` commands of all files are found before any file is processed and run concurrently. Their output is
+cached by the command and the content of the project files in `CLI_OUTPUT_INPUTS`, so unchanged commands are not run.
+
+"""
 
 from __future__ import annotations
 
+import ast
+import asyncio
+import filecmp
+import hashlib
 import json
+import os
 import re
 import shlex
-import subprocess  # noqa: S404
+import shutil
+import textwrap
+from contextlib import suppress
+from dataclasses import dataclass
+from functools import cached_property, lru_cache, partial
 from pathlib import Path
+from tempfile import NamedTemporaryFile
 
-from beartype.typing import Any, Callable, Dict, List, Optional
+from beartype.typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Pattern, Set, Tuple
 from corallium.file_helpers import read_lines
 from corallium.file_search import find_project_files_by_suffix
 from corallium.log import LOGGER
 from corallium.markup_table import format_table
 
+from calcipy import __version__
 from calcipy.invoke_helpers import get_project_path
+from calcipy.task_cache import (
+    CACHE_DIR_NAME,
+    CachedOutput,
+    FileHasher,
+    ResultCache,
+    fingerprint,
+    write_atomic,
+)
+
+from ._coverage_json import read_coverage_summary
 
 HandlerLookupT = Dict[str, Callable[[str, Path], List[str]]]
 """Handler Lookup."""
 
+InputsLookupT = Dict[str, Callable[[str, Path], List[Path]]]
+"""Lookup of the input files for the sections of each handler, which are regenerated when any input changes."""
+
+SECTION_MANIFEST_NAME = 'markup_sections.json'
+"""Name of the manifest of section inputs and outputs in the cache directory."""
+
+CLI_OUTPUT_INPUTS = ('**/*.py', 'pyproject.toml', 'uv.lock', 'run')
+"""Glob patterns of the project files that can change the output of a `CLI_OUTPUT` command."""
+
+CLI_OUTPUT_TIMEOUT = 30
+"""Maximum seconds for each `CLI_OUTPUT` command."""
+
+_HASH_INDEX = 'markup_hashes.json'
+_START_BYTES = (b'[cts]', b'{cts}')
+_CHUNK_SIZE = 1 << 16
+
 
 class _ParseSkipError(RuntimeError):
     """Exception caught if the handler does not want to replace the text."""
 
 
+class _LineDigest:
+    """Incremental digest of lines that are joined by newlines."""
+
+    def __init__(self) -> None:
+        self._hasher = hashlib.blake2b(digest_size=16)
+        self._separator = b''
+
+    def update(self, line: str) -> None:
+        self._hasher.update(self._separator + line.encode('utf-8'))
+        self._separator = b'\n'
+
+    def hexdigest(self) -> str:
+        return self._hasher.hexdigest()
+
+
+def _digest_lines(lines: Iterable[str]) -> str:
+    digest = _LineDigest()
+    for line in lines:
+        digest.update(line)
+    return digest.hexdigest()
+
+
+class _SectionManifest:
+    """Record of the inputs and output of each section from the last time that it was generated."""
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        inputs_lookup: InputsLookupT,
+        *,
+        shared_inputs: Optional[Mapping[str, Callable[[], str]]] = None,
+        hasher: Optional[FileHasher] = None,
+    ) -> None:
+        """Load the manifest from `cache_dir`.
+
+        Args:
+            cache_dir: directory of the manifest and file digests
+            inputs_lookup: input files of the sections of each handler
+            shared_inputs: digest of the inputs that are the same for every section of a handler, which is used
+                instead of `inputs_lookup`
+            hasher: `FileHasher` to share with other users of the cache directory
+
+        """
+        self.path = cache_dir / SECTION_MANIFEST_NAME
+        self.inputs_lookup = inputs_lookup
+        self.shared_inputs = shared_inputs or {}
+        self.hasher = hasher or FileHasher(cache_dir / _HASH_INDEX)
+        self.sections: Dict[str, Dict[str, str]] = {}
+        with suppress(OSError, ValueError):
+            self.sections = json.loads(self.path.read_text(encoding='utf-8'))
+        self._loaded = dict(self.sections)
+
+    def fingerprint(self, match: str, line: str, path_file: Path) -> Optional[str]:
+        """Return the digest of the start line and the content of each input or None if the inputs are unknown."""
+        hasher = hashlib.blake2b(digest_size=16)
+        hasher.update(f'{__version__}\0{line.strip()}'.encode())
+        if (get_shared := self.shared_inputs.get(match)) is not None:
+            hasher.update(f'\0{get_shared()}'.encode())
+            return hasher.hexdigest()
+        if (get_inputs := self.inputs_lookup.get(match)) is None:
+            return None
+        for path in sorted(set(get_inputs(line, path_file))):
+            digest = self.hasher.digest(path) if path.is_file() else 'missing'
+            hasher.update(f'\0{path.as_posix()}\0{digest}'.encode())
+        return hasher.hexdigest()
+
+    def has_inputs(self, section_id: str, fingerprint: str) -> bool:
+        """Check if the inputs are unchanged since the section was last generated."""
+        return self.sections.get(section_id, {}).get('inputs') == fingerprint
+
+    def has_output(self, section_id: str, digest: str) -> bool:
+        """Check if the section still contains the last output."""
+        return self.sections.get(section_id, {}).get('output') == digest
+
+    def discard(self, section_id: str) -> None:
+        """Forget the section so that it is regenerated."""
+        self.sections.pop(section_id, None)
+
+    def record(self, section_id: str, fingerprint: str, lines: List[str]) -> None:
+        """Store the inputs and output of a regenerated section."""
+        self.sections[section_id] = {'inputs': fingerprint, 'output': _digest_lines(lines)}
+
+    def save(self) -> None:
+        """Persist the manifest and file digests when changed, dropping the sections of deleted files."""
+        self.hasher.save()
+        sections = {key: value for key, value in self.sections.items() if Path(key.rsplit('#', 1)[0]).is_file()}
+        if sections != self._loaded:
+            write_atomic(self.path, json.dumps(sections, indent=1, sort_keys=True))
+
+
 class _ReplacementMachine:
     """State machine to replace content with user-specified handlers.
 
-    Uses `[cts]`/`{cts}` and `[cte]`/`{cte}` to demarcate sections (calcipy-template-start/end).
+    Uses `[cts]`/`{cts}` and `[cte]`/`{cte}` to demarcate sections (calcipy-template-start/end). Sections are never
+    buffered. When the inputs of a section are unchanged, its lines are passed through while their digest is computed
+    and compared at the end marker. A section whose text no longer matches the last output is marked as `stale` and
+    regenerated on the next pass. Otherwise, the handler is called at the start marker and the old lines are dropped.
 
     """
 
-    def __init__(self) -> None:
-        """Initialize the state machine."""
+    def __init__(self, manifest: Optional[_SectionManifest] = None) -> None:
+        """Initialize the state machine.
+
+        Args:
+            manifest: optional record of section inputs to skip regenerating sections that are not stale
+
+        """
+        self.manifest = manifest
         self.in_template = False
+        self.section_count = 0
+        # True if a section with unchanged inputs was edited and must be regenerated by parsing the file again
+        self.stale = False
+        self._section_id = ''
+        self._output_digest: Optional[_LineDigest] = None
+        self._replacement: Optional[List[str]] = None
 
     def parse(
         self,
@@ -52,16 +206,37 @@ class _ReplacementMachine:
             List[str]: modified list of strings
 
         """
-        updated_lines = []
+        return list(self.stream(lines, handler_lookup, path_file))
+
+    def stream(
+        self,
+        lines: Iterable[str],
+        handler_lookup: HandlerLookupT,
+        path_file: Path,
+    ) -> Iterator[str]:
+        """Lazily parse lines and yield the updated lines, so that only the output of the current handler is in memory.
+
+        Args:
+            lines: iterable of lines without line endings
+            handler_lookup: Lookup dictionary for template-formatted sections
+            path_file: path to the file, which is passed to the handlers
+
+        Yields:
+            str: each updated line
+
+        """
+        key_matcher = _compile_key_matcher(tuple(handler_lookup))
         for line in lines:
-            updated_lines.extend(self._parse_line(line, handler_lookup, path_file))
-        return updated_lines
+            yield from self._parse_line(line, handler_lookup, path_file, key_matcher)
+        if self.in_template:  # A section without an end marker is replaced through the end of the file
+            yield from self._finish_section(path_file)
 
     def _parse_line(
         self,
         line: str,
         handler_lookup: HandlerLookupT,
         path_file: Path,
+        key_matcher: Pattern[str],
     ) -> List[str]:
         """Parse lines and insert new_text based on provided handler_lookup.
 
@@ -69,38 +244,82 @@ class _ReplacementMachine:
             line: single line
             handler_lookup: lookup dictionary for template-formatted sections
             path_file: optional path to the file. Only useful for debugging
+            key_matcher: pattern from `_compile_key_matcher` for the keys of `handler_lookup`
 
         Returns:
             List[str]: modified list of strings
 
         """
-        lines: List[str] = []
-        if _has_marker(line, 'end') and self.in_template:
-            self.in_template = False
-        elif _has_marker(line, 'start'):
-            self.in_template = True
-            matches = [text_match for text_match in handler_lookup if text_match in line]
+        markers = _find_markers(line)
+        if self.in_template:
+            kept = self._keep_line(line)
+            return kept + self._finish_section(path_file) if _END in markers else kept
+        if _START in markers:
+            matches = set(key_matcher.findall(line))
             if len(matches) == 1:
                 [match] = matches
-                try:
-                    lines.extend(handler_lookup[match](line, path_file))
-                except _ParseSkipError:
-                    lines.append(line)
-                    self.in_template = False
+                return self._start_section(line, match, handler_lookup, path_file)
+            LOGGER.debug('Could not parse. Skipping:', line=line)
+        return [line]
+
+    def _start_section(self, line: str, match: str, handler_lookup: HandlerLookupT, path_file: Path) -> List[str]:
+        """Keep the section if the inputs are unchanged and otherwise call the handler for the replacement."""
+        self.in_template = True
+        self._section_id = f'{path_file.resolve().as_posix()}#{self.section_count}'
+        self.section_count += 1
+        self._output_digest = self._replacement = None
+        fingerprint = self.manifest.fingerprint(match, line, path_file) if self.manifest else None
+        if self.manifest and fingerprint and self.manifest.has_inputs(self._section_id, fingerprint):
+            self._output_digest = _LineDigest()
+        else:
+            try:
+                self._replacement = handler_lookup[match](line, path_file)
+            except _ParseSkipError:
+                return [line]
+            if self.manifest and fingerprint:
+                self.manifest.record(self._section_id, fingerprint, self._replacement)
+            return []
+        return self._keep_line(line)
+
+    def _keep_line(self, line: str) -> List[str]:
+        """Pass through the line of a kept section or drop the line of a section that is replaced."""
+        if self._replacement is not None:
+            return []
+        if self._output_digest is not None:
+            self._output_digest.update(line)
+        return [line]
+
+    def _finish_section(self, path_file: Path) -> List[str]:
+        """Return the replacement or check that the kept section still matches the last output."""
+        self.in_template = False
+        if self._replacement is not None:
+            return self._replacement
+        if self.manifest and self._output_digest is not None:
+            if self.manifest.has_output(self._section_id, self._output_digest.hexdigest()):
+                LOGGER.text_debug('Section is up to date', path=path_file, section=self._section_id)
             else:
-                LOGGER.debug('Could not parse. Skipping:', line=line)
-                lines.append(line)
-                self.in_template = False
-        elif not self.in_template:
-            lines.append(line)
-        # else: discard the lines in the template-section
-        return lines
+                self.manifest.discard(self._section_id)
+                self.stale = True
+        return []
 
 
-_COMMENT_VARS = re.compile(r'[<!\-{%]+ [{\[]cts[}\]] (?P<key>[^=]+)=(?P<value>[^;]+);')
+_COMMENT_VARS = re.compile(r'[<!\-{%]+ (?:\[cts\]|\{cts\}) (?P<key>[^=]+)=(?P<value>[^;]+);')
 """Regex for extracting the variable from a markup comment."""
 
 
+_MARKERS_PATTERN = re.compile(r'\[(ct[se])\]|\{(ct[se])\}')
+"""Regex for the `[cts]`/`{cts}` and `[cte]`/`{cte}` markers, where the brackets must match."""
+
+_START = 'cts'
+_END = 'cte'
+
+
+@lru_cache(maxsize=8)
+def _compile_key_matcher(keys: Tuple[str, ...]) -> Pattern[str]:
+    """Compile a single pattern for all handler keys, where the longest key wins when keys overlap."""
+    return re.compile('|'.join(re.escape(key) for key in sorted(keys, key=len, reverse=True)) or r'(?!)')
+
+
 def _has_marker(line: str, marker_type: str) -> bool:
     """Check if line contains a marker.
 
@@ -112,8 +331,12 @@ def _has_marker(line: str, marker_type: str) -> bool:
         True if line contains the marker
 
     """
-    marker = 'cts' if marker_type == 'start' else 'cte'
-    return f'[{marker}]' in line or f'{{{marker}}}' in line
+    return (_START if marker_type == 'start' else _END) in _find_markers(line)
+
+
+def _find_markers(line: str) -> Set[str]:
+    """Return the names of the markers in the line, such as `cts` for `[cts]` or `{cts}`."""
+    return {square or curly for square, curly in _MARKERS_PATTERN.findall(line)}
 
 
 def _parse_var_comment(line: str) -> Dict[str, str]:
@@ -151,33 +374,162 @@ def _format_end_marker(line: str) -> str:
     return '{% [cte] %}'
 
 
-def _handle_source_file(line: str, path_file: Path) -> List[str]:
+def _source_file_path(path_rel: str, path_file: Path) -> Path:
+    """Resolve the source file relative to the project for a leading slash or otherwise the markup file."""
+    path_base = get_project_path() if path_rel.startswith('/') else path_file.resolve().parent
+    return path_base / path_rel.lstrip('/')
+
+
+_LINE_RANGE = re.compile(r'L(?P<start>\d+)(?:-L?(?P<end>\d+))?')
+"""Regex for the `#L10` or `#L10-L40` line range of a `SOURCE_FILE`."""
+
+
+def _split_source_ref(value: str) -> Tuple[str, str, str]:
+    """Split `path`, `path#L10-L40`, or `path::Class.method` into the path, symbol, and line range."""
+    path_rel, _, line_range = value.partition('#')
+    path_rel, _, symbol = path_rel.partition('::')
+    return path_rel.strip(), symbol.strip(), line_range.strip()
+
+
+class _SourceCache:
+    """Lines and symbol index of each source file, which are read and parsed at most once per run."""
+
+    def __init__(self) -> None:
+        """Initialize the empty cache."""
+        self._lines: Dict[Path, List[str]] = {}
+        self._symbols: Dict[Path, Dict[str, Tuple[int, int]]] = {}
+
+    def lines(self, path: Path) -> List[str]:
+        """Return the lines of the file or an empty list if it does not exist."""
+        if path not in self._lines:
+            self._lines[path] = read_lines(path)
+        return self._lines[path]
+
+    def symbols(self, path: Path) -> Dict[str, Tuple[int, int]]:
+        """Return the first and last line number of each class and function by qualified name, such as `Class.method`.
+
+        The first line includes any decorators. Files that can't be parsed have no symbols.
+
+        """
+        if path not in self._symbols:
+            index: Dict[str, Tuple[int, int]] = {}
+            with suppress(SyntaxError, ValueError):
+                _index_symbols(ast.parse('\n'.join(self.lines(path))).body, '', index)
+            self._symbols[path] = index
+        return self._symbols[path]
+
+
+def _index_symbols(body: List[ast.stmt], prefix: str, index: Dict[str, Tuple[int, int]]) -> None:
+    for node in body:
+        if isinstance(node, ast.FunctionDef | ast.AsyncFunctionDef | ast.ClassDef):
+            name = f'{prefix}{node.name}'
+            first = min([node.lineno, *(decorator.lineno for decorator in node.decorator_list)])
+            index[name] = (first, node.end_lineno or node.lineno)
+            _index_symbols(node.body, f'{name}.', index)
+
+
+def _select_source_lines(lines: List[str], symbols: Callable[[], Dict[str, Tuple[int, int]]], value: str) -> List[str]:
+    """Return the lines of the symbol or line range in the `SOURCE_FILE` value or all lines.
+
+    Raises:
+        _ParseSkipError: if the symbol is not found or the line range is invalid
+
+    """
+    _path_rel, symbol, line_range = _split_source_ref(value)
+    if symbol:
+        if (span := symbols().get(symbol)) is None:
+            msg = f'Could not locate {symbol!r} in {value!r}'
+            raise _ParseSkipError(msg)
+        return textwrap.dedent('\n'.join(lines[span[0] - 1 : span[1]])).split('\n')
+    if line_range:
+        if not (match := _LINE_RANGE.fullmatch(line_range)):
+            msg = f'Line range must be formatted as #L10 or #L10-L40 in {value!r}'
+            raise _ParseSkipError(msg)
+        first = int(match['start'])
+        last = int(match['end'] or first)
+        if not 1 <= first <= last <= len(lines):
+            msg = f'Line range is outside of the {len(lines)} lines of {value!r}'
+            raise _ParseSkipError(msg)
+        return lines[first - 1 : last]
+    return lines
+
+
+def _handle_source_file(line: str, path_file: Path, sources: Optional[_SourceCache] = None) -> List[str]:
     """Replace commented sections in README with linked file contents.
 
+    The value can select part of the file with a line range, such as `SOURCE_FILE=/calcipy/cli.py#L10-L40`, or with
+    the qualified name of a class or function, such as `SOURCE_FILE=/calcipy/cli.py::Class.method`.
+
     Args:
         line: first line of the section
         path_file: path to the file that contained the string
+        sources: optional cache of source files that is shared by every section in a run
 
     Returns:
         List[str]: list of template-formatted text
 
+    Raises:
+        _ParseSkipError: if the symbol or line range can't be found
+
     """
-    key, path_rel = next(iter(_parse_var_comment(line).items()))
-    path_base = get_project_path() if path_rel.startswith('/') else path_file.resolve().parent
-    path_source = path_base / path_rel.lstrip('/')
+    key, value = next(iter(_parse_var_comment(line).items()))
+    sources = sources or _SourceCache()
+    path_source = _source_file_path(_split_source_ref(value)[0], path_file)
     language = path_source.suffix.lstrip('.')
-    lines_source = [f'```{language}', *read_lines(path_source), '```']
     if not path_source.is_file():  # pragma: no cover
         LOGGER.warning('Could not locate source file', path_source=path_source)
-
-    return [_format_start_marker(line, key, path_rel), *lines_source, _format_end_marker(line)]
-
-
-def _format_cov_table(coverage_data: Dict[str, Any]) -> List[str]:
+    try:
+        selected = _select_source_lines(sources.lines(path_source), partial(sources.symbols, path_source), value)
+    except _ParseSkipError as err:
+        LOGGER.warning(str(err), path_file=path_file)
+        raise
+
+    return [_format_start_marker(line, key, value), f'```{language}', *selected, '```', _format_end_marker(line)]
+
+
+_SUMMARY_COUNTS = (
+    'covered_lines',
+    'num_statements',
+    'missing_lines',
+    'excluded_lines',
+    'num_branches',
+    'covered_branches',
+)
+"""Summary counts that are summed for each directory."""
+
+_COVERAGE_OPTIONS = re.compile(r'\b(?P<key>rollup|top)=(?P<value>\d+)')
+"""Regex for the table options of a `COVERAGE` section, such as `<!-- {cts} COVERAGE rollup=1; top=10; -->`."""
+
+
+def _rollup_summaries(files: Dict[str, Any], depth: int) -> Dict[str, Any]:
+    """Sum the summary of each file by the first `depth` directories of its path."""
+    rollups: Dict[str, Dict[str, Any]] = {}
+    for path_file, file_obj in files.items():
+        parts = Path(path_file).parent.parts[:depth]
+        name = f'{Path(*parts).as_posix()}/' if parts else './'
+        summary = rollups.setdefault(name, {'summary': dict.fromkeys(_SUMMARY_COUNTS, 0)})['summary']
+        for key in _SUMMARY_COUNTS:
+            summary[key] += file_obj['summary'].get(key, 0)
+    for rollup in rollups.values():
+        summary = rollup['summary']
+        total = summary['num_statements'] + summary['num_branches']
+        covered = summary['covered_lines'] + summary['covered_branches']
+        summary['percent_covered'] = 100.0 * covered / total if total else 100.0
+    return dict(sorted(rollups.items()))
+
+
+def _format_cov_table(
+    coverage_data: Dict[str, Any],
+    *,
+    rollup: Optional[int] = None,
+    top: Optional[int] = None,
+) -> List[str]:
     """Format code coverage data table.
 
     Args:
         coverage_data: dictionary created by `python -m coverage json`
+        rollup: if set, show one row per directory with this many levels instead of each file
+        top: if set, only show this many rows with the lowest coverage
 
     Returns:
         List[str]: list of string lines to insert
@@ -189,12 +541,16 @@ def _format_cov_table(coverage_data: Dict[str, Any]) -> List[str]:
         'Excluded': 'excluded_lines',
         'Coverage': 'percent_covered',
     }
+    files = _rollup_summaries(coverage_data['files'], rollup) if rollup else coverage_data['files']
+    rows = list(files.items())
+    if top is not None and top < len(rows):
+        rows = sorted(rows, key=lambda row: (row[1]['summary']['percent_covered'], row[0]))[:top]
     records = [
         {
-            'File': f'`{Path(path_file).as_posix()}`',
+            'File': f'`{path_file if rollup else Path(path_file).as_posix()}`',
             **{col: file_obj['summary'][key] for col, key in col_key_map.items()},
         }
-        for path_file, file_obj in coverage_data['files'].items()
+        for path_file, file_obj in rows
     ]
     records.append(
         {
@@ -206,6 +562,9 @@ def _format_cov_table(coverage_data: Dict[str, Any]) -> List[str]:
 
     delimiters = ['-', *(['-:'] * len(col_key_map))]
     lines_table = format_table(headers=['File', *col_key_map], records=records, delimiters=delimiters).split('\n')
+    if len(rows) < len(files):
+        kind = 'directories' if rollup else 'files'
+        lines_table.extend(['', f'Showing the {len(rows)} of {len(files)} {kind} with the lowest coverage'])
     short_date = coverage_data['meta']['timestamp'].split('T')[0]
     lines_table.extend(['', f'Generated on: {short_date}'])
     return lines_table
@@ -214,6 +573,10 @@ def _format_cov_table(coverage_data: Dict[str, Any]) -> List[str]:
 def _handle_coverage(line: str, _path_file: Path, path_coverage: Optional[Path] = None) -> List[str]:
     """Read the coverage.json file and write a table to the README file.
 
+    Only the summaries are read from the coverage.json file. The table can be condensed with `rollup=<depth>;` to
+    show directories instead of files and `top=<count>;` to only show the rows with the lowest coverage, such as
+    `<!-- {cts} COVERAGE rollup=1; top=10; -->`.
+
     Args:
         line: first line of the section
         _path_file: path to the file that contained the string (unused)
@@ -230,20 +593,133 @@ def _handle_coverage(line: str, _path_file: Path, path_coverage: Optional[Path]
     if not path_coverage.is_file():
         msg = f'Could not locate: {path_coverage}'
         raise _ParseSkipError(msg)
-    coverage_data = json.loads(path_coverage.read_text())
-    lines_cov = _format_cov_table(coverage_data)
+    coverage_data = read_coverage_summary(path_coverage)
+    options = {match['key']: int(match['value']) for match in _COVERAGE_OPTIONS.finditer(line)}
+    lines_cov = _format_cov_table(coverage_data, **options)
     return [line, *lines_cov, _format_end_marker(line)]
 
 
 _CLI_ALLOWED_PREFIXES = ('./run', 'uv ', 'python -m ', 'python3 -m ')
 
 
-def _handle_cli_output(line: str, _path_file: Path) -> List[str]:
+@dataclass
+class _CliResult:
+    """Output of a `CLI_OUTPUT` command or the reason that it could not be used."""
+
+    output: str = ''
+    error: str = ''
+    exit_code: int = 0
+
+
+def _cli_command(line: str) -> str:
+    """Return the `CLI_OUTPUT` command of a start marker.
+
+    Raises:
+        _ParseSkipError: if command is not allowed
+
+    """
+    command = _parse_var_comment(line).get('CLI_OUTPUT', '')
+    if not command or not any(command.startswith(prefix) for prefix in _CLI_ALLOWED_PREFIXES):
+        msg = f'Command not allowed. Must start with one of: {_CLI_ALLOWED_PREFIXES}'
+        raise _ParseSkipError(msg)
+    return command
+
+
+async def _run_cli_command(command: str, semaphore: asyncio.Semaphore) -> _CliResult:
+    """Run a single command in the project directory."""
+    pipe = asyncio.subprocess.PIPE
+    async with semaphore:
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *shlex.split(command), stdout=pipe, stderr=pipe, cwd=get_project_path()
+            )
+        except OSError as err:  # pragma: no cover
+            LOGGER.warning('CLI command failed', command=command, error=str(err))
+            return _CliResult(error=str(err))
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=CLI_OUTPUT_TIMEOUT)
+        except asyncio.TimeoutError:  # pragma: no cover
+            process.kill()
+            await process.wait()
+            msg = f'Command timed out after {CLI_OUTPUT_TIMEOUT} seconds'
+            LOGGER.warning(msg, command=command)
+            return _CliResult(error=msg)
+
+    output = (stdout or stderr).decode(errors='replace')
+    if process.returncode != 0 and not output:  # pragma: no cover
+        msg = f'Command failed with exit code {process.returncode}'
+        LOGGER.warning(msg, command=command)
+        return _CliResult(error=msg)
+    return _CliResult(output=output, exit_code=process.returncode or 0)
+
+
+async def _gather_cli_commands(commands: List[str]) -> List[_CliResult]:
+    semaphore = asyncio.Semaphore(os.cpu_count() or 1)
+    return list(await asyncio.gather(*(_run_cli_command(command, semaphore) for command in commands)))
+
+
+class _CliOutputInputs:
+    """Fingerprint of the project files in `CLI_OUTPUT_INPUTS`, which is computed at most once per run."""
+
+    def __init__(self, hasher: FileHasher) -> None:
+        """Store the `FileHasher` for the content digests."""
+        self.hasher = hasher
+
+    @cached_property
+    def fingerprint(self) -> str:
+        """Digest shared by the manifest of every `CLI_OUTPUT` section and the cached output of every command."""
+        return fingerprint('CLI_OUTPUT', CLI_OUTPUT_INPUTS, base_dir=get_project_path(), hasher=self.hasher, extra=None)
+
+
+def _run_cli_commands(
+    commands: Iterable[str],
+    *,
+    cache_dir: Optional[Path] = None,
+    inputs: Optional[_CliOutputInputs] = None,
+) -> Dict[str, _CliResult]:
+    """Run the unique commands concurrently, reusing cached output when the project inputs are unchanged.
+
+    Args:
+        commands: `CLI_OUTPUT` commands
+        cache_dir: directory for the cached output. Output is not cached when None
+        inputs: fingerprint of the project files from the current run. Defaults to computing it
+
+    Returns:
+        Lookup of each command to its result
+
+    """
+    unique = list(dict.fromkeys(commands))
+    results: Dict[str, _CliResult] = {}
+    keys: Dict[str, str] = {}
+    cache = ResultCache(cache_dir) if cache_dir else None
+    if cache and unique:
+        digest = (inputs or _CliOutputInputs(cache.hasher)).fingerprint
+        for command in unique:
+            keys[command] = hashlib.blake2b(f'{digest}\0{command}'.encode(), digest_size=16).hexdigest()
+            if outputs := cache.load(keys[command]):
+                results[command] = _CliResult(output=outputs[0].stdout)
+
+    pending = [command for command in unique if command not in results]
+    if pending:
+        LOGGER.text_debug('Running CLI_OUTPUT commands', count=len(pending), cached=len(results))
+        for command, result in zip(pending, asyncio.run(_gather_cli_commands(pending)), strict=True):
+            if cache and not result.error and result.exit_code == 0:
+                cache.store(keys[command], [CachedOutput(command=command, stdout=result.output, stderr='')])
+            results[command] = result
+    return results
+
+
+def _handle_cli_output(
+    line: str,
+    _path_file: Path,
+    results: Optional[Mapping[str, _CliResult]] = None,
+) -> List[str]:
     """Execute CLI command and insert output into markdown.
 
     Args:
         line: marker line containing command
         _path_file: path to the markdown file (unused)
+        results: optional output of commands that were already run by `_run_cli_commands`
 
     Returns:
         List of lines with command output wrapped in code fence
@@ -252,49 +728,143 @@ def _handle_cli_output(line: str, _path_file: Path) -> List[str]:
         _ParseSkipError: if command is not allowed or execution fails
 
     """
-    vars_parsed = _parse_var_comment(line)
-    command = vars_parsed.get('CLI_OUTPUT', '')
+    command = _cli_command(line)
+    if (result := (results or {}).get(command)) is None:
+        result = _run_cli_commands([command])[command]
+    if result.error:
+        raise _ParseSkipError(result.error)
 
-    if not command or not any(command.startswith(prefix) for prefix in _CLI_ALLOWED_PREFIXES):
-        msg = f'Command not allowed. Must start with one of: {_CLI_ALLOWED_PREFIXES}'
-        raise _ParseSkipError(msg)
+    lines_output = ['```txt', *result.output.rstrip().split('\n'), '```']
+    return [_format_start_marker(line, 'CLI_OUTPUT', command), *lines_output, _format_end_marker(line)]
+
+
+def _find_cli_commands(paths: Iterable[Path]) -> List[str]:
+    """Return the allowed `CLI_OUTPUT` commands in the start markers of each file."""
+    commands = []
+    for path in paths:
+        for line in _iter_lines(path):
+            if 'CLI_OUTPUT=' in line and _has_marker(line, 'start'):
+                with suppress(_ParseSkipError):
+                    commands.append(_cli_command(line))
+    return commands
+
+
+def _contains_marker(path: Path) -> bool:
+    """Search the bytes of a file for a start marker in chunks without decoding."""
+    if not path.is_file():
+        return False
+    overlap = max(map(len, _START_BYTES)) - 1
+    tail = b''
+    with path.open('rb') as handle:
+        while chunk := handle.read(_CHUNK_SIZE):
+            window = tail + chunk
+            if any(marker in window for marker in _START_BYTES):
+                return True
+            tail = window[-overlap:]
+    return False
+
+
+def _iter_lines(path: Path) -> Iterator[str]:
+    """Lazily read the lines of a file.
+
+    Yields:
+        str: each line without the line ending
+
+    """
+    with path.open(encoding='utf-8') as handle:
+        for line in handle:
+            yield line.rstrip('\n')
+
+
+def _write_if_changed(path: Path, lines: Iterable[str]) -> bool:
+    """Write the lines to a temporary file and atomically replace `path` only if the content differs.
 
+    The lines can be lazily read from `path`, since it is only replaced once all lines are written.
+
+    Returns:
+        True if the file was replaced
+
+    """
+    handle = NamedTemporaryFile(  # noqa: SIM115
+        'w', encoding='utf-8', dir=path.parent, prefix=f'.{path.name}.', suffix='.tmp', delete=False
+    )
+    path_tmp = Path(handle.name)
     try:
-        result = subprocess.run(  # noqa: S603
-            shlex.split(command),
-            capture_output=True,
-            text=True,
-            cwd=get_project_path(),
-            timeout=30,
-            check=False,
-        )
-    except (subprocess.TimeoutExpired, FileNotFoundError, OSError) as err:  # pragma: no cover
-        LOGGER.warning('CLI command failed', command=command, error=str(err))
-        raise _ParseSkipError(str(err)) from err
-
-    output = result.stdout or result.stderr
-    if result.returncode != 0 and not output:  # pragma: no cover
-        msg = f'Command failed with exit code {result.returncode}'
-        LOGGER.warning(msg, command=command)
-        raise _ParseSkipError(msg)
+        with handle:
+            handle.writelines(f'{line}\n' for line in lines)
+        if filecmp.cmp(path_tmp, path, shallow=False):
+            return False
+        shutil.copymode(path, path_tmp)
+        path_tmp.replace(path)
+        return True
+    finally:
+        path_tmp.unlink(missing_ok=True)
 
-    lines_output = ['```txt', *output.rstrip().split('\n'), '```']
-    return [_format_start_marker(line, 'CLI_OUTPUT', command), *lines_output, _format_end_marker(line)]
+
+def _source_file_inputs(line: str, path_file: Path) -> List[Path]:
+    """Return the source file of a `SOURCE_FILE` section."""
+    return [_source_file_path(_split_source_ref(value)[0], path_file) for value in _parse_var_comment(line).values()]
+
+
+def _coverage_inputs(_line: str, _path_file: Path) -> List[Path]:
+    """Return the `coverage.json` file of a `COVERAGE` section."""
+    return [get_project_path() / 'coverage.json']
 
 
 def write_template_formatted_sections(
     handler_lookup: Optional[HandlerLookupT] = None,
     paths: Optional[List[Path]] = None,
+    *,
+    inputs_lookup: Optional[InputsLookupT] = None,
+    cache_dir: Optional[Path] = None,
 ) -> None:
-    """Populate the template-formatted sections of markup files with user-configured logic."""
+    """Populate the template-formatted sections of markup files with user-configured logic.
+
+    Args:
+        handler_lookup: handlers for each section. Defaults to `CLI_OUTPUT=`, `COVERAGE `, and `SOURCE_FILE=`
+        paths: markup files to update. Defaults to all Markdown files in the project
+        inputs_lookup: input files of the sections of each handler. Sections of handlers without inputs are always
+            regenerated. Defaults to the inputs of the default handlers when `handler_lookup` is not provided
+        cache_dir: directory for the section manifest. Defaults to the project cache directory
+
+    """
     lookup: HandlerLookupT = handler_lookup or {  # ty: ignore[invalid-assignment]
         'CLI_OUTPUT=': _handle_cli_output,
         'COVERAGE ': _handle_coverage,
         'SOURCE_FILE=': _handle_source_file,
     }
+    cache_dir = cache_dir or get_project_path() / CACHE_DIR_NAME
+    hasher = FileHasher(cache_dir / _HASH_INDEX)
+    cli_inputs = _CliOutputInputs(hasher)
+    shared_inputs: Dict[str, Callable[[], str]] = {}
+    if inputs_lookup is None:
+        inputs_lookup = {}
+        if not handler_lookup:
+            inputs_lookup = {'COVERAGE ': _coverage_inputs, 'SOURCE_FILE=': _source_file_inputs}
+            # Every CLI_OUTPUT section has the same project files, so they are listed and hashed once per run
+            shared_inputs = {'CLI_OUTPUT=': lambda: cli_inputs.fingerprint}
+    manifest = _SectionManifest(cache_dir, inputs_lookup, shared_inputs=shared_inputs, hasher=hasher)
 
     markup_paths: list[Path] = paths or find_project_files_by_suffix(get_project_path()).get('md') or []
-    for path in markup_paths:
+    marked_paths = [path for path in markup_paths if _contains_marker(path)]
+    sources = _SourceCache()
+    lookup = {
+        key: partial(_handle_source_file, sources=sources) if handler is _handle_source_file else handler
+        for key, handler in lookup.items()
+    }
+    if lookup.get('CLI_OUTPUT=') is _handle_cli_output:
+        results = _run_cli_commands(_find_cli_commands(marked_paths), cache_dir=cache_dir, inputs=cli_inputs)
+        lookup = {**lookup, 'CLI_OUTPUT=': partial(_handle_cli_output, results=results)}
+
+    for path in marked_paths:
         LOGGER.text_debug('Processing', path=path)
-        if lines := _ReplacementMachine().parse(read_lines(path), lookup, path):
-            path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+        machine = _ReplacementMachine(manifest)
+        updated = _write_if_changed(path, machine.stream(_iter_lines(path), lookup, path))
+        if machine.stale:  # Regenerate the sections that were edited since they were last generated
+            updated = (
+                _write_if_changed(path, _ReplacementMachine(manifest).stream(_iter_lines(path), lookup, path))
+                or updated
+            )
+        if updated:
+            LOGGER.text('Updated', path=path)
+    manifest.save()
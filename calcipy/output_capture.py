@@ -0,0 +1,93 @@
+"""Bounded capture of task output that spills the full stream to a temporary log file."""
+
+from __future__ import annotations
+
+import io
+from collections import deque
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+
+from beartype.typing import IO, Deque, Optional
+
+DEFAULT_TAIL_KB = 64
+"""Default size of the in-memory tail of captured output."""
+
+
+class SpillingCapture(io.TextIOBase):
+    """Text stream that keeps only the last characters in memory and writes everything to a log file.
+
+    The log file is created on the first write, so no file is created for tasks without output.
+
+    """
+
+    def __init__(self, *, tail_chars: int = DEFAULT_TAIL_KB * 1024, name: str = 'output') -> None:
+        """Initialize an empty capture.
+
+        Args:
+            tail_chars: maximum number of characters to keep in memory
+            name: stream name used in the log file name
+
+        """
+        super().__init__()
+        self.tail_chars = tail_chars
+        self.name = name
+        self._chunks: Deque[str] = deque()
+        self._size = 0
+        self._log: Optional[IO[str]] = None
+
+    @property
+    def path(self) -> Optional[Path]:
+        """Path to the log file with the full output or None if nothing was written."""
+        return Path(self._log.name) if self._log else None
+
+    def writable(self) -> bool:  # noqa: PLR6301
+        """Support writing."""
+        return True
+
+    def write(self, text: str) -> int:
+        """Write to the log file and the bounded in-memory tail.
+
+        Returns:
+            Number of characters written
+
+        """
+        if not text:
+            return 0
+        if self._log is None:
+            self._log = NamedTemporaryFile(  # noqa: SIM115
+                'w',
+                encoding='utf-8',
+                errors='replace',
+                prefix=f'calcipy-{self.name}-',
+                suffix='.log',
+                delete=False,
+            )
+        self._log.write(text)
+        self._chunks.append(text)
+        self._size += len(text)
+        while self._size > self.tail_chars:
+            excess = self._size - self.tail_chars
+            if len(self._chunks[0]) <= excess:
+                self._size -= len(self._chunks.popleft())
+            else:
+                self._chunks[0] = self._chunks[0][excess:]
+                self._size -= excess
+        return len(text)
+
+    def flush(self) -> None:
+        """Flush the log file."""
+        if self._log and not self._log.closed:
+            self._log.flush()
+
+    def tail(self) -> str:
+        """Return the last characters of the output that are kept in memory."""
+        return ''.join(self._chunks)
+
+    def close(self, *, keep: bool = False) -> None:
+        """Close the log file and delete it unless `keep` is True."""
+        if self._log:
+            self._log.close()
+            if not keep:
+                Path(self._log.name).unlink(missing_ok=True)
+                self._log = None
+        super().close()
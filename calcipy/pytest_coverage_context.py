@@ -0,0 +1,33 @@
+"""Pytest plugin that records coverage with the node ID of each test as the dynamic context.
+
+Load the plugin when running pytest under coverage, such as with `test.coverage --contexts`:
+
+```sh
+python -m coverage run --branch --source=calcipy --module pytest ./tests -p calcipy.pytest_coverage_context
+```
+
+Lines that run outside of a test (such as on import or during collection) are recorded with an empty context.
+
+"""
+
+from __future__ import annotations
+
+import coverage
+import pytest
+from beartype.typing import Iterator
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item: pytest.Item) -> Iterator[None]:
+    """Switch the coverage context for the setup, call, and teardown of each test.
+
+    Yields:
+        None
+
+    """
+    cov = coverage.Coverage.current()
+    if cov:
+        cov.switch_context(item.nodeid)
+    yield
+    if cov:
+        cov.switch_context('')
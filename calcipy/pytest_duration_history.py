@@ -0,0 +1,93 @@
+"""Pytest plugin that appends the duration of each test to the history in `calcipy.duration_history`.
+
+`test.pytest` loads the plugin, which can also be loaded directly:
+
+```sh
+python -m pytest -p calcipy.pytest_duration_history --calcipy-fastest-first
+```
+
+With `--calcipy-fastest-first`, tests run in order of their median duration with new tests first, so that a failure
+is found as soon as possible when combined with `--exitfirst`.
+
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import time
+from contextlib import suppress
+from pathlib import Path
+
+import pytest
+from beartype.typing import Dict, List
+
+from . import duration_history
+from .import_graph import run_git
+from .task_cache import CACHE_DIR_NAME
+
+
+def history_path(config: pytest.Config) -> Path:
+    """Return the path to the duration history from the options or the default in the rootdir."""
+    path = config.getoption('calcipy_history', default='')
+    return Path(path) if path else config.rootpath / CACHE_DIR_NAME / duration_history.HISTORY_NAME
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """Register the duration history options."""
+    group = parser.getgroup('calcipy')
+    group.addoption(
+        '--calcipy-history',
+        default='',
+        help=f'Path to the test duration history. Defaults to {CACHE_DIR_NAME}/{duration_history.HISTORY_NAME}',
+    )
+    group.addoption(
+        '--calcipy-fastest-first',
+        action='store_true',
+        help='Run new tests first and then the others by their median duration from the history',
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    """Start recording durations, except in pytest-xdist workers because reports are sent to the controller."""
+    if not hasattr(config, 'workerinput'):
+        config.pluginmanager.register(_HistoryRecorder(history_path(config)), 'calcipy-history')
+
+
+def pytest_collection_modifyitems(config: pytest.Config, items: List[pytest.Item]) -> None:
+    """Sort the tests fastest first when requested."""
+    if config.getoption('calcipy_fastest_first'):
+        medians = duration_history.median_durations(history_path(config))
+        items.sort(key=lambda item: medians.get(item.nodeid, 0.0))
+
+
+class _HistoryRecorder:
+    """Collect the duration of each phase and append the run to the history at the end of the session."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.tests: Dict[str, duration_history.TestDuration] = {}
+        self.start = time.perf_counter()
+
+    def pytest_sessionstart(self) -> None:
+        self.start = time.perf_counter()
+
+    def pytest_runtest_logreport(self, report: pytest.TestReport) -> None:
+        test = self.tests.setdefault(report.nodeid, duration_history.TestDuration(nodeid=report.nodeid))
+        setattr(test, report.when, getattr(test, report.when) + report.duration)
+        if report.outcome != 'passed' and test.outcome == 'passed':
+            test.outcome = report.outcome
+
+    def pytest_sessionfinish(self, session: pytest.Session) -> None:
+        if not self.tests:
+            return
+        commit_sha = ''
+        with suppress(RuntimeError):
+            commit_sha = run_git(session.config.rootpath, 'rev-parse', 'HEAD')[0]
+        with suppress(OSError, sqlite3.Error):
+            duration_history.record_run(
+                self.path,
+                self.tests.values(),
+                wall=time.perf_counter() - self.start,
+                commit_sha=commit_sha,
+                shard=session.config.getoption('calcipy_shard', default=''),
+            )
@@ -0,0 +1,104 @@
+"""Pytest plugin to run one shard of the tests, balanced by the duration of each test.
+
+Every shard collects the full test suite and computes the same partition, so the shards can run on separate machines.
+The partition only depends on the collected tests and the committed `duration_history.SHARD_DURATIONS_NAME` (written
+from the local history by `test.shard-durations`) because the local history differs between machines. Tests with a
+duration are assigned with greedy longest-processing-time bin packing and the tests without one (or every test when
+the file is missing) are spread round-robin by count.
+
+```sh
+python -m pytest -p calcipy.pytest_shard --calcipy-shard=1/4
+```
+
+"""
+
+from __future__ import annotations
+
+import heapq
+from pathlib import Path
+
+import pytest
+from beartype.typing import List, Mapping, Sequence, Tuple
+
+from .duration_history import SHARD_DURATIONS_NAME, read_shard_durations
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """Parse `i/n` into the one-based shard index and the number of shards.
+
+    Returns:
+        Tuple of the index and count
+
+    Raises:
+        ValueError: if the value is not formatted as `i/n` with `1 <= i <= n`
+
+    """
+    index, _, count = value.partition('/')
+    if not (index.isdigit() and count.isdigit() and 1 <= int(index) <= int(count)):
+        msg = f'Expected the shard as "i/n" where 1 <= i <= n, but received: {value!r}'
+        raise ValueError(msg)
+    return int(index), int(count)
+
+
+def partition(nodeids: Sequence[str], durations: Mapping[str, float], count: int) -> List[List[str]]:
+    """Partition the tests into shards with balanced total durations.
+
+    Tests with a duration are assigned longest first to the shard with the lowest total, with ties broken by node ID.
+    The other tests are then assigned round-robin in order of node ID, starting from the shard with the fewest tests.
+    The result is the same for any input order.
+
+    Returns:
+        List of the node IDs in each shard
+
+    """
+    unique = set(nodeids)
+    shards: List[List[str]] = [[] for _ in range(count)]
+    totals = [(0.0, idx) for idx in range(count)]
+    for nodeid in sorted((nid for nid in unique if nid in durations), key=lambda nid: (-durations[nid], nid)):
+        total, idx = heapq.heappop(totals)
+        shards[idx].append(nodeid)
+        heapq.heappush(totals, (total + durations[nodeid], idx))
+
+    order = sorted(range(count), key=lambda idx: (len(shards[idx]), idx))
+    for position, nodeid in enumerate(sorted(nid for nid in unique if nid not in durations)):
+        shards[order[position % count]].append(nodeid)
+    return shards
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """Register the shard options."""
+    group = parser.getgroup('calcipy')
+    group.addoption('--calcipy-shard', default='', help='Only run the tests in shard "i/n" (e.g. "1/4")')
+    group.addoption(
+        '--calcipy-shard-durations',
+        default='',
+        help=f'Path to the durations for the partition. Defaults to {SHARD_DURATIONS_NAME} in the rootdir',
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    """Validate the shard.
+
+    Raises:
+        pytest.UsageError: if the shard is invalid
+
+    """
+    if shard := config.getoption('calcipy_shard'):
+        try:
+            parse_shard(shard)
+        except ValueError as exc:
+            raise pytest.UsageError(str(exc)) from exc
+
+
+def pytest_collection_modifyitems(config: pytest.Config, items: List[pytest.Item]) -> None:
+    """Deselect the tests that are not in the shard."""
+    if not (shard := config.getoption('calcipy_shard')):
+        return
+    index, count = parse_shard(shard)
+    path = config.getoption('calcipy_shard_durations')
+    durations = read_shard_durations(Path(path) if path else config.rootpath / SHARD_DURATIONS_NAME)
+    selected = set(partition([item.nodeid for item in items], durations, count)[index - 1])
+    deselected = [item for item in items if item.nodeid not in selected]
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+        items[:] = [item for item in items if item.nodeid in selected]
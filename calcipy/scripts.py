@@ -1,17 +1,57 @@
-"""Start the command line program."""
+"""Start the command line program.
 
-from types import ModuleType
+Imports are deferred so that `--list` and shell completion can be answered from the task manifest without
+importing invoke or any task module (see `calcipy.task_manifest`).
 
-from beartype.typing import List
-from corallium.log import LOGGER
+"""
+
+from __future__ import annotations
+
+import sys
+from typing import Any
 
 from . import __pkg_name__, __version__
-from .cli import start_program
-from .collection import Collection
+from .task_manifest import read_manifest, try_fast_path
+
+
+def _lazy_collection(namespaces: list[str] | None = None) -> Any:
+    """Return a `Collection` of lazily imported tasks from the manifest or None if the manifest is unavailable."""
+    from .collection import Collection, LazyTask  # noqa: PLC0415
+    from .tasks.defaults import new_collection  # noqa: PLC0415
+
+    manifest = read_manifest()
+    if manifest is None or (namespaces and not set(namespaces).issubset(manifest['namespaces'])):
+        return None
+
+    ns = new_collection()
+    if namespaces is None:
+        for entry in manifest['tasks']:
+            ns.add_task(LazyTask(entry))
+    for name in namespaces or sorted(manifest['namespaces']):
+        ns.add_collection(Collection.from_manifest(name, manifest['namespaces'][name]['tasks']))
+    return ns
 
 
 def start() -> None:  # pragma: no cover
     """Run the customized Invoke Program."""
+    if sys.argv[1:] == ['--daemon']:
+        from .daemon import serve  # noqa: PLC0415
+
+        serve()
+        return
+    if try_fast_path(sys.argv[1:]):
+        return
+
+    from corallium.log import LOGGER  # noqa: PLC0415
+
+    from .cli import start_program  # noqa: PLC0415
+
+    if (ns := _lazy_collection()) is not None:
+        # Missing extras are reported by LazyTask.load when a task is run
+        start_program(__pkg_name__, __version__, collection=ns)
+        return
+
+    # Only reached without a current manifest, such as from a source checkout before regenerating it
     try:
         from .tasks import all_tasks  # noqa: PLC0415
 
@@ -24,54 +64,51 @@ def start() -> None:  # pragma: no cover
         start_program(__pkg_name__, __version__, most_tasks)
 
 
-def _start_subset(modules: List[ModuleType]) -> None:  # pragma: no cover
-    """Run the specified subset."""
+def _start_subset(namespaces: list[str]) -> None:  # pragma: no cover
+    """Run the specified subset of task namespaces."""
+    if try_fast_path(sys.argv[1:], namespaces):
+        return
+
+    from importlib import import_module  # noqa: PLC0415
+
+    from .cli import start_program  # noqa: PLC0415
+    from .collection import Collection  # noqa: PLC0415
     from .tasks.defaults import new_collection  # noqa: PLC0415
 
-    ns = new_collection()
-    for module in modules:
-        ns.add_collection(Collection.from_module(module))
+    ns = _lazy_collection(namespaces)
+    if ns is None:
+        ns = new_collection()
+        for name in namespaces:
+            ns.add_collection(Collection.from_module(import_module(f'.tasks.{name}', __package__)))
 
     start_program(__pkg_name__, __version__, collection=ns)
 
 
 def start_docs() -> None:  # pragma: no cover
     """Run CLI with only the cl and doc namespaces."""
-    from .tasks import cl, doc  # noqa: PLC0415
-
-    _start_subset([cl, doc])
+    _start_subset(['cl', 'doc'])
 
 
 def start_lint() -> None:  # pragma: no cover
     """Run CLI with only the lint namespace."""
-    from .tasks import lint  # noqa: PLC0415
-
-    _start_subset([lint])
+    _start_subset(['lint'])
 
 
 def start_pack() -> None:  # pragma: no cover
     """Run CLI with only the pack namespace."""
-    from .tasks import pack  # noqa: PLC0415
-
-    _start_subset([pack])
+    _start_subset(['pack'])
 
 
 def start_tags() -> None:  # pragma: no cover
     """Run CLI with only the tags namespace."""
-    from .tasks import tags  # noqa: PLC0415
-
-    _start_subset([tags])
+    _start_subset(['tags'])
 
 
 def start_test() -> None:  # pragma: no cover
     """Run CLI with only the test namespace."""
-    from .tasks import test  # noqa: PLC0415
-
-    _start_subset([test])
+    _start_subset(['test'])
 
 
 def start_types() -> None:  # pragma: no cover
     """Run CLI with only the types namespace."""
-    from .tasks import types  # noqa: PLC0415
-
-    _start_subset([types])
+    _start_subset(['types'])
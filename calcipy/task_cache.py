@@ -0,0 +1,213 @@
+"""Content-hash cache of successful task results.
+
+Tasks that declare `inputs` are fingerprinted from the content of every matching project file, the task
+arguments, the global file arguments, the tool environment variables, and the Python and calcipy versions. When the
+fingerprint matches a previous success, the task is skipped and the recorded command output is replayed. Only the
+output is replayed, so tasks that write files (such as coverage reports) must not declare `inputs`.
+
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import subprocess  # noqa: S404
+import sys
+from contextlib import suppress
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+
+from beartype.typing import Any, Dict, List, Optional, Sequence, Tuple
+from corallium.file_search import find_project_files
+from corallium.log import LOGGER
+
+from calcipy import __version__
+
+CACHE_DIR_NAME = '.calcipy_cache'
+"""Name of the cache directory created in the working directory."""
+
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+"""Default size bound for recorded results before the least recently used are evicted."""
+
+EXCLUDED_DIRS = frozenset({'.git', '.nox', '.tox', '.venv', '__pycache__', 'node_modules', 'venv', CACHE_DIR_NAME})
+"""Directory names that never contain task inputs, even when they are not ignored by git."""
+
+ENV_PREFIXES = ('COVERAGE_', 'MYPY', 'PYRIGHT', 'PYTEST_', 'PYTHON', 'RUFF_', 'TY_', 'UV_', 'VIRTUAL_ENV')
+"""Prefixes of the environment variables that can change the outcome of a task and are part of the fingerprint."""
+
+_HASH_INDEX = 'file_hashes.json'
+_RESULTS_DIR = 'results'
+
+
+@dataclass
+class CachedOutput:
+    """Output from a single command that was run by a task."""
+
+    command: str
+    stdout: str
+    stderr: str
+
+
+def write_atomic(path: Path, text: str) -> None:
+    """Write text to a temporary file and then replace the target so that readers never see a partial file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with NamedTemporaryFile('w', encoding='utf-8', dir=path.parent, suffix='.tmp', delete=False) as handle:
+        handle.write(text)
+    Path(handle.name).replace(path)
+
+
+@lru_cache(maxsize=64)
+def _compile_pattern(pattern: str) -> re.Pattern[str]:
+    """Translate a glob pattern that is anchored at the base directory to a regular expression.
+
+    `*` and `?` do not match `/`, while `**/` matches zero or more directories and a trailing `**` matches the rest.
+
+    """
+    wildcards = {'**/': '(?:.*/)?', '**': '.*', '*': '[^/]*', '?': '[^/]'}
+    tokens = re.split(r'(\*\*/|\*\*|\*|\?)', pattern)
+    return re.compile(''.join(wildcards.get(token) or re.escape(token) for token in tokens))
+
+
+def list_input_files(base_dir: Path, patterns: Sequence[str]) -> List[Path]:
+    """Return the sorted project files that match any of the glob patterns.
+
+    Tracked and untracked (but not ignored) files are found with git with a fallback to a filesystem walk. Patterns
+    are matched against the full posix path relative to `base_dir`, so `*.py` only matches files at the top level and
+    `**/*.py` matches files in any directory. Files within `EXCLUDED_DIRS` are always skipped.
+
+    """
+    try:
+        result = subprocess.run(
+            ['git', 'ls-files', '-z', '--cached', '--others', '--exclude-standard'],  # noqa: S607
+            capture_output=True,
+            check=True,
+            cwd=base_dir,
+        )
+        rel_paths = [rel for rel in result.stdout.decode().split('\0') if rel]
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        rel_paths = [path.relative_to(base_dir).as_posix() for path in find_project_files(base_dir, [])]
+    regexes = [_compile_pattern(pattern) for pattern in patterns]
+    matches = {
+        rel
+        for rel in rel_paths
+        if not EXCLUDED_DIRS.intersection(rel.split('/')[:-1]) and any(rgx.fullmatch(rel) for rgx in regexes)
+    }
+    return [base_dir / rel for rel in sorted(matches) if (base_dir / rel).is_file()]
+
+
+def _tool_environment() -> List[str]:
+    """Return the sorted `NAME=value` pairs of the environment variables that match `ENV_PREFIXES`."""
+    return sorted(f'{name}={value}' for name, value in os.environ.items() if name.startswith(ENV_PREFIXES))
+
+
+class FileHasher:
+    """Hash file contents, reusing digests from a persisted index when the size and mtime are unchanged."""
+
+    def __init__(self, path_index: Path) -> None:
+        """Load the persisted index of `path: [mtime_ns, size, digest]`."""
+        self.path_index = path_index
+        self._index: Dict[str, Tuple[int, int, str]] = {}
+        self._changed = False
+        with suppress(OSError, ValueError):
+            self._index = {
+                key: tuple(value) for key, value in json.loads(path_index.read_text(encoding='utf-8')).items()
+            }
+
+    def digest(self, path: Path) -> str:
+        """Return the content digest of a file."""
+        stat = path.stat()
+        key = path.as_posix()
+        if (cached := self._index.get(key)) and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2]
+        hasher = hashlib.blake2b(digest_size=16)
+        with path.open('rb') as handle:
+            for chunk in iter(lambda: handle.read(1 << 20), b''):
+                hasher.update(chunk)
+        digest = hasher.hexdigest()
+        self._index[key] = (stat.st_mtime_ns, stat.st_size, digest)
+        self._changed = True
+        return digest
+
+    def save(self) -> None:
+        """Persist the index if any digest was computed."""
+        if self._changed:
+            write_atomic(self.path_index, json.dumps(self._index))
+            self._changed = False
+
+
+def fingerprint(task_key: str, inputs: Sequence[str], *, base_dir: Path, hasher: FileHasher, extra: Any) -> str:
+    """Return a digest of the task identity, arguments, environment, and the content of all input files.
+
+    Args:
+        task_key: unique identifier of the task
+        inputs: glob patterns for the input files (see `list_input_files`)
+        base_dir: directory that the patterns are relative to
+        hasher: `FileHasher` to compute the content digests
+        extra: any other JSON-serializable value that affects the outcome, such as the task arguments
+
+    Returns:
+        Hex digest
+
+    """
+    hasher_fp = hashlib.blake2b(digest_size=16)
+    header = [
+        task_key,
+        sys.version,
+        sys.executable,
+        __version__,
+        json.dumps(extra, sort_keys=True, default=str),
+        *_tool_environment(),
+    ]
+    hasher_fp.update('\0'.join(header).encode())
+    for path in list_input_files(base_dir, inputs):
+        hasher_fp.update(f'\0{path.relative_to(base_dir).as_posix()}\0{hasher.digest(path)}'.encode())
+    hasher.save()
+    return hasher_fp.hexdigest()
+
+
+class ResultCache:
+    """Store of outputs from successful task runs with size-bounded least-recently-used eviction."""
+
+    def __init__(self, cache_dir: Path, *, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        """Initialize the cache in `cache_dir`."""
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hasher = FileHasher(cache_dir / _HASH_INDEX)
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / _RESULTS_DIR / f'{key}.json'
+
+    def load(self, key: str) -> Optional[List[CachedOutput]]:
+        """Return the recorded outputs for a fingerprint and mark the entry as recently used."""
+        path = self._path(key)
+        try:
+            records = json.loads(path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+        with suppress(OSError):
+            path.touch()
+        return [CachedOutput(**record) for record in records]
+
+    def store(self, key: str, outputs: List[CachedOutput]) -> None:
+        """Record outputs for a fingerprint, then evict the least recently used entries over `max_bytes`."""
+        write_atomic(self._path(key), json.dumps([asdict(output) for output in outputs]))
+        self.evict()
+
+    def evict(self) -> None:
+        """Delete the least recently used entries until the total size is within `max_bytes`."""
+        entries = []
+        for path in (self.cache_dir / _RESULTS_DIR).glob('*.json'):
+            with suppress(OSError):
+                stat = path.stat()
+                entries.append((stat.st_mtime_ns, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            LOGGER.debug('Evicting cached task result', path=path)
+            path.unlink(missing_ok=True)
+            total -= size
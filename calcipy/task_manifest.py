@@ -0,0 +1,175 @@
+"""Precomputed manifest of task metadata for fast CLI startup.
+
+The manifest records the name, aliases, docstring, and arguments of every task so that `--list` and shell completion
+(along with `--version`) can be answered without importing invoke or the task modules, and so that other invocations
+only import the task modules that are actually run (see `calcipy.collection.LazyTask`).
+
+Regenerate after changing any task signature or docstring with: `python -m calcipy.task_manifest`
+
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import textwrap
+from operator import itemgetter
+from pathlib import Path
+from typing import Any
+
+from . import __pkg_name__, __version__
+
+MANIFEST_PATH = Path(__file__).parent / 'tasks' / 'manifest.json'
+"""Location of the packaged task manifest."""
+
+MANIFEST_VERSION = 1
+"""Incremented when the manifest structure changes so that stale files are ignored."""
+
+
+def read_manifest(path: Path = MANIFEST_PATH) -> dict[str, Any] | None:
+    """Return the task manifest or None if missing or from a different manifest version."""
+    try:
+        manifest = json.loads(path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get('version') == MANIFEST_VERSION else None
+
+
+def _helpline(doc: str) -> str | None:
+    """Return the first line of the docstring to match `invoke.util.helpline`."""
+    doc = doc.lstrip()
+    return doc.splitlines()[0] if doc else None
+
+
+def _selected(manifest: dict[str, Any], namespaces: list[str] | None) -> list[tuple[str, list[dict[str, Any]]]]:
+    """Return the `(prefix, entries)` pairs for the root tasks (when all namespaces are selected) and namespaces."""
+    selected = [('', manifest['tasks'])] if namespaces is None else []
+    names = sorted(manifest['namespaces']) if namespaces is None else sorted(namespaces)
+    return selected + [(name, manifest['namespaces'][name]['tasks']) for name in names]
+
+
+def _list_pairs(manifest: dict[str, Any], namespaces: list[str] | None) -> list[tuple[str, str | None]]:
+    """Return the `(name with aliases, help)` pairs in the same order as `invoke.program.Program._make_pairs`."""
+    pairs = []
+    for prefix, entries in _selected(manifest, namespaces):
+        for entry in sorted(entries, key=itemgetter('name')):
+            aliases = [f'{prefix}.{alias}' if prefix else alias for alias in entry['aliases']]
+            if entry['default']:
+                aliases.insert(0, prefix)
+            name = f'{prefix}.{entry["name"]}' if prefix else entry['name']
+            alias_str = f' ({", ".join(aliases)})' if aliases else ''
+            pairs.append((name + alias_str, _helpline(entry['doc'])))
+    return pairs
+
+
+def _terminal_width() -> int:
+    """Return the terminal width with the same fallback as `invoke.terminals.pty_size`."""
+    try:
+        return os.get_terminal_size(sys.stdout.fileno()).columns or 80
+    except (AttributeError, OSError, ValueError):
+        return 80
+
+
+def print_task_list(manifest: dict[str, Any], namespaces: list[str] | None = None) -> None:
+    """Print the flat task list formatted identically to `invoke --list`."""
+    pairs = _list_pairs(manifest, namespaces)
+    print('Subcommands:\n')  # noqa: T201
+    # Match invoke.program.Program.print_columns
+    leading_indent, col_padding = 2, 3
+    name_width = max(len(name) for name, _ in pairs)
+    desc_width = _terminal_width() - name_width - leading_indent - col_padding - 1
+    wrapper = textwrap.TextWrapper(width=desc_width)
+    for name, help_str in pairs:
+        spec = ' ' * leading_indent + name.ljust(name_width) + ' ' * col_padding
+        chunks = wrapper.wrap(help_str) if help_str else []
+        if not chunks:
+            print(spec.rstrip())  # noqa: T201
+            continue
+        print(spec + chunks[0])  # noqa: T201
+        for chunk in chunks[1:]:
+            print(' ' * len(spec) + chunk)  # noqa: T201
+    print()  # noqa: T201
+
+
+def print_task_names(manifest: dict[str, Any], namespaces: list[str] | None = None) -> None:
+    """Print task names and aliases for shell completion to match `invoke.completion.complete.print_task_names`."""
+    names: dict[str, list[str]] = {}
+    for prefix, entries in _selected(manifest, namespaces):
+        for entry in entries:
+            aliases = [f'{prefix}.{alias}' if prefix else alias for alias in entry['aliases']]
+            if entry['default']:
+                aliases.append(prefix)
+            names[f'{prefix}.{entry["name"]}' if prefix else entry['name']] = aliases
+
+    def _sort_key(name: str) -> tuple[list[str], str]:
+        parts = name.split('.')
+        return parts[:-1], parts[-1]
+
+    for name in sorted(names, key=_sort_key):
+        print(name)  # noqa: T201
+        for alias in names[name]:
+            print(alias)  # noqa: T201
+
+
+def try_fast_path(argv: list[str], namespaces: list[str] | None = None) -> bool:
+    """Answer `--version`, `--list`, and task-name completion directly from the manifest.
+
+    Any other arguments (including flag completion, which needs the parser) fall back to the full program. Bare `--help`
+    also falls back, because most of its output is the core options of the installed version of invoke, but the tasks
+    are still only loaded from the manifest.
+
+    Args:
+        argv: CLI arguments without the program name
+        namespaces: subset of namespaces to include or None for all tasks
+
+    Returns:
+        True if the request was handled
+
+    """
+    if argv in (['--version'], ['-V']):
+        print(f'{__pkg_name__} {__version__}')  # noqa: T201
+        return True
+    manifest = read_manifest()
+    if manifest is None or (namespaces and not set(namespaces).issubset(manifest['namespaces'])):
+        return False
+    if argv in (['--list'], ['-l']):
+        print_task_list(manifest, namespaces)
+        return True
+    tokens = argv[3:]  # Skip '--complete', '--', and the program name
+    if argv[:2] == ['--complete', '--'] and not (tokens and tokens[-1].startswith('-')):
+        print_task_names(manifest, namespaces)
+        return True
+    return False
+
+
+def build_manifest() -> dict[str, Any]:
+    """Build the manifest by importing every task module.
+
+    Returns:
+        JSON-serializable manifest
+
+    """
+    from calcipy.collection import manifest_entry  # noqa: PLC0415
+    from calcipy.tasks.all_tasks import ns  # noqa: PLC0415
+
+    def _entries(collection: Any) -> list[dict[str, Any]]:
+        return [
+            manifest_entry(task, name, is_default=collection.default == name)
+            for name, task in sorted(collection.tasks.items())
+        ]
+
+    return {
+        'version': MANIFEST_VERSION,
+        'tasks': _entries(ns),
+        'namespaces': {name: {'tasks': _entries(sub)} for name, sub in sorted(ns.collections.items())},
+    }
+
+
+def write_manifest(path: Path = MANIFEST_PATH) -> None:
+    """Write the manifest to the packaged location."""
+    path.write_text(json.dumps(build_manifest(), indent=2) + '\n', encoding='utf-8')
+
+
+if __name__ == '__main__':
+    write_manifest()
@@ -17,6 +17,7 @@ from .most_tasks import ns
         'message': 'String message to display',
     },
     show_task_info=False,
+    barrier=True,
 )
 def summary(_ctx: Context, *, message: str) -> None:
     """Summary Task."""
@@ -29,6 +30,7 @@ def summary(_ctx: Context, *, message: str) -> None:
         'total': 'Total steps',
     },
     show_task_info=False,
+    barrier=True,
 )
 def progress(_ctx: Context, *, index: int, total: int) -> None:
     """Progress Task."""
@@ -42,6 +44,9 @@ TaskList = List[Union[Call, DeferredTask]]
 def with_progress(items: Any, offset: int = 0) -> TaskList:
     """Inject intermediary 'progress' tasks.
 
+    The summary and progress tasks are barriers, so with `--jobs` each progress message is shown in order before the
+    task that it announces starts, while the announced tasks can still run concurrently.
+
     Args:
         items: list of tasks
         offset: Optional offset to shift counters
@@ -8,6 +8,9 @@ from invoke.context import Context
 
 from calcipy.collection import Collection
 
+PYTHON_INPUTS = ('**/*.py', '**/*.pyi', '.calcipy.json', 'pyproject.toml', 'poetry.lock', 'uv.lock')
+"""Input file patterns for tasks that only depend on the Python sources, configuration, and locked tools."""
+
 DEFAULTS = {
     'tags': {
         'filename': 'CODE_TAG_SUMMARY.md',
@@ -1,35 +1,106 @@
 """Document CLI."""
 
+import json
 import webbrowser
 from contextlib import suppress
+from functools import lru_cache
 from pathlib import Path
 
+from beartype.typing import Any, Dict, List
 from corallium.file_helpers import (
     MKDOCS_CONFIG,
     open_in_browser,
+    read_package_name,
     read_yaml_file,
 )
+from corallium.log import LOGGER
 from invoke.context import Context
 from invoke.exceptions import UnexpectedExit
 
 from calcipy.cli import task
 from calcipy.invoke_helpers import get_project_path, run
 from calcipy.markup_writer import write_template_formatted_sections
+from calcipy.task_cache import CACHE_DIR_NAME, FileHasher, fingerprint, write_atomic
 
+from . import cl, test
 from .executable_utils import python_m
 
+DOC_BUILD_MANIFEST = 'doc_build.json'
+"""Name of the file in the cache directory with the fingerprint of the inputs to the last documentation build."""
+
+_HASH_INDEX = 'doc_hashes.json'
+
+
+@lru_cache(maxsize=4)
+def _load_mkdocs_config(path_config: Path, _mtime_ns: int) -> Dict[str, Any]:
+    return read_yaml_file(path_config) or {}
+
+
+def read_mkdocs_config() -> Dict[str, Any]:
+    """Return the project's mkdocs configuration, which is only parsed again when the file is modified."""
+    path_config = get_project_path() / MKDOCS_CONFIG
+    mtime_ns = path_config.stat().st_mtime_ns if path_config.is_file() else 0
+    return _load_mkdocs_config(path_config, mtime_ns)
+
 
 def get_out_dir() -> Path:
     """Returns the mkdocs-specified site directory."""
-    mkdocs_config = read_yaml_file(get_project_path() / MKDOCS_CONFIG)
-    return Path(mkdocs_config.get('site_dir', 'releases/site'))
+    return Path(read_mkdocs_config().get('site_dir', 'releases/site'))
 
 
-@task()
+def doc_inputs(path_project: Path) -> List[str]:
+    """Return the glob patterns of the files that can change the documentation built by mkdocs.
+
+    The patterns include the docs directory, `mkdocs.yml`, the package sources for mkdocstrings, any other
+    directories that mkdocs watches, and `coverage.json`.
+
+    """
+    config = read_mkdocs_config()
+    pkg = read_package_name(cwd=path_project)
+    watched = [f'{Path(path).as_posix()}/**' for path in config.get('watch') or []]
+    return [
+        f'{config.get("docs_dir", "docs")}/**',
+        MKDOCS_CONFIG.as_posix(),
+        'coverage.json',
+        f'{pkg}/**/*.py',
+        f'src/{pkg}/**/*.py',
+        *watched,
+    ]
+
+
+@task(after=[cl.write, test.coverage])  # Both write files that are published in the documentation
 def build(ctx: Context) -> None:
-    """Build documentation with mkdocs."""
+    """Build documentation with mkdocs.
+
+    The build is skipped when the site exists and none of the `doc_inputs` changed since the last build, unless
+    the global `--no-cache` option is set.
+
+    """
     write_template_formatted_sections()
-    run(ctx, f'{python_m()} mkdocs build --site-dir {get_out_dir()}')
+    path_project = get_project_path()
+    site_dir = get_out_dir()
+    path_manifest = path_project / CACHE_DIR_NAME / DOC_BUILD_MANIFEST
+    no_cache = False
+    with suppress(AttributeError):
+        no_cache = ctx.config.gto.no_cache
+    use_cache = not (no_cache or ctx.config.run.dry)
+    key = ''
+    if use_cache:
+        hasher = FileHasher(path_project / CACHE_DIR_NAME / _HASH_INDEX)
+        inputs = doc_inputs(path_project)
+        key = fingerprint('doc.build', inputs, base_dir=path_project, hasher=hasher, extra=site_dir.as_posix())
+        previous = ''
+        with suppress(OSError, ValueError):
+            previous = json.loads(path_manifest.read_text(encoding='utf-8')).get('fingerprint', '')
+        if key == previous and (path_project / site_dir / 'index.html').is_file():
+            LOGGER.text(
+                'Skipping mkdocs build (documentation inputs unchanged since the last build)', site_dir=site_dir
+            )
+            return
+
+    run(ctx, f'{python_m()} mkdocs build --site-dir {site_dir}')
+    if use_cache:
+        write_atomic(path_manifest, json.dumps({'fingerprint': key}))
 
 
 def _is_mkdocs_local() -> bool:
@@ -43,8 +114,7 @@ def _is_mkdocs_local() -> bool:
         bool: True if configured for local file output rather than hosted
 
     """
-    mkdocs_config = read_yaml_file(get_project_path() / MKDOCS_CONFIG)
-    return mkdocs_config.get('use_directory_urls') is False
+    return read_mkdocs_config().get('use_directory_urls') is False
 
 
 @task()
@@ -58,7 +128,7 @@ def watch(ctx: Context) -> None:
         run(ctx, f'{python_m()} mkdocs serve --dirtyreload')
 
 
-@task()
+@task(after=[build])
 def deploy(ctx: Context) -> None:
     """Deploy docs to the Github `gh-pages` branch."""
     if _is_mkdocs_local():  # pragma: no cover
@@ -1,15 +1,16 @@
 """Utilities for working in calcipy's python environment."""
 
+import json
+import os
 import sys
 from contextlib import suppress
 from functools import lru_cache
 from pathlib import Path
 
-from beartype.typing import Optional
+from beartype.typing import Dict, Iterable, List, Optional, Sequence
 from invoke.context import Context
-from invoke.runners import Result
 
-from calcipy.invoke_helpers import run
+from calcipy.task_cache import CACHE_DIR_NAME
 
 
 @lru_cache(maxsize=1)
@@ -41,23 +42,151 @@ PYRIGHT_MESSAGE = """
 `pyright` was not found and must be installed separately (such as 'brew install pyright' on Mac).
     See the online documentation for your system: https://microsoft.github.io/pyright/#/installation
 """
+PTW_MESSAGE = """
+`ptw` was not found in the active Python environment. Install 'calcipy[test]' or 'pytest-watcher'
+"""
+TY_MESSAGE = """
+`ty` was not found. Install 'calcipy[types]' or see: https://docs.astral.sh/ty/installation
+"""
+UV_MESSAGE = """
+`uv` was not found and must be installed separately.
+    See the online documentation for your system: https://docs.astral.sh/uv/getting-started/installation
+"""
+
+KNOWN_EXECUTABLES = ('git', 'prek', 'ptw', 'pyright', 'ruff', 'ty', 'uv')
+"""Executables that calcipy may call, which are all resolved in a single pass."""
+
+EXECUTABLE_MESSAGES = {
+    'prek': PRE_COMMIT_MESSAGE,
+    'ptw': PTW_MESSAGE,
+    'pyright': PYRIGHT_MESSAGE,
+    'ty': TY_MESSAGE,
+    'uv': UV_MESSAGE,
+}
+"""Installation instructions for executables that are not Python dependencies of calcipy."""
+
+EXECUTABLE_CACHE_NAME = 'executables.json'
+"""Name of the file in the cache directory with the resolved executables."""
+
+
+def _search_dirs() -> List[Path]:
+    """Return the active Python directory followed by each unique directory on `PATH`."""
+    dirs = [python_dir().absolute()]
+    for raw in os.environ.get('PATH', '').split(os.pathsep):
+        if raw and (path := Path(raw)) not in dirs:
+            dirs.append(path)
+    return dirs
+
+
+def _cache_key(search_dirs: Sequence[Path]) -> List[List[object]]:
+    """Return a key that changes with `PATH` or when any searched directory is modified.
+
+    Installing or removing an executable modifies its directory, so the modification time of each directory (including
+    the virtual environment's) invalidates the cached result without having to list the directory.
+
+    """
+
+    def _mtime(path: Path) -> Optional[int]:
+        with suppress(OSError):
+            return path.stat().st_mtime_ns
+        return None
+
+    return [[str(path), _mtime(path)] for path in search_dirs]
+
+
+def _candidate_names(names: Iterable[str]) -> Dict[str, str]:
+    """Return a lookup of file name to executable name, including the `PATHEXT` variants on Windows."""
+    if os.name != 'nt':
+        return {name: name for name in names}
+    extensions = [ext.lower() for ext in os.environ.get('PATHEXT', '.COM;.EXE;.BAT;.CMD').split(';') if ext]
+    return {f'{name}{ext}': name for name in names for ext in ['', *extensions]}
+
+
+def discover_executables(names: Iterable[str], search_dirs: Sequence[Path]) -> Dict[str, Optional[str]]:
+    """Resolve each executable by listing every directory once, in order, without a subprocess.
 
-_EXECUTABLE_CACHE: dict[str, Optional[Result]] = {}
-"""Runtime cache of executables."""
+    Returns:
+        Lookup of executable name to the first matching path or None if not found
 
+    """
+    candidates = _candidate_names(names)
+    found: Dict[str, Optional[str]] = dict.fromkeys(candidates.values())
+    for directory in search_dirs:
+        if all(found.values()):
+            break
+        with suppress(OSError), os.scandir(directory) as entries:
+            for entry in entries:
+                name = candidates.get(entry.name.lower() if os.name == 'nt' else entry.name)
+                if name and not found[name] and entry.is_file() and os.access(entry.path, os.X_OK):
+                    found[name] = entry.path
+    return found
+
+
+@lru_cache(maxsize=4)
+def executable_paths(base_dir: Optional[Path] = None) -> Dict[str, Optional[str]]:
+    """Return the resolved `KNOWN_EXECUTABLES`, which are cached on disk until `PATH` or a directory changes.
+
+    Args:
+        base_dir: project directory for the cache. Defaults to the working directory
+
+    Returns:
+        Lookup of executable name to path or None if not found
+
+    """
+    search_dirs = _search_dirs()
+    key = _cache_key(search_dirs)
+    cache_path = (base_dir or Path.cwd()) / CACHE_DIR_NAME / EXECUTABLE_CACHE_NAME
+    with suppress(OSError, ValueError):
+        cached = json.loads(cache_path.read_text(encoding='utf-8'))
+        if cached.get('key') == key and set(KNOWN_EXECUTABLES) <= set(cached.get('paths', {})):
+            return cached['paths']
+
+    paths = discover_executables(KNOWN_EXECUTABLES, search_dirs)
+    with suppress(OSError):
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        cache_path.write_text(json.dumps({'key': key, 'paths': paths}, indent=2) + '\n', encoding='utf-8')
+    return paths
+
+
+def find_executable(executable: str, base_dir: Optional[Path] = None) -> Optional[Path]:
+    """Return the path to the executable from the active Python directory or `PATH`, or None if not found."""
+    if executable in KNOWN_EXECUTABLES:
+        path = executable_paths(base_dir)[executable]
+    else:
+        path = discover_executables([executable], _search_dirs())[executable]
+    return Path(path) if path else None
+
+
+def _missing_message(executable: str) -> str:
+    return EXECUTABLE_MESSAGES.get(executable) or f'\n`{executable}` was not found on PATH\n'
 
-def check_installed(ctx: Context, executable: str, message: str) -> None:
+
+def check_installed(ctx: Context, executable: str, message: Optional[str] = None) -> None:  # noqa: ARG001
     """If the required executable isn't present, raise a clear user error.
 
+    Args:
+        ctx: invoke context (unused, but kept for compatibility)
+        executable: name of the executable
+        message: optional error message. Defaults to the message from `EXECUTABLE_MESSAGES`
+
     Raises:
-        RuntimeError: if not missing
+        RuntimeError: if not found
 
     """
-    if executable in _EXECUTABLE_CACHE:
-        res = _EXECUTABLE_CACHE[executable]
-    else:
-        res = run(ctx, f'which {executable}', warn=True, hide=True)
-        _EXECUTABLE_CACHE[executable] = res
+    if find_executable(executable) is None:
+        raise RuntimeError(message or _missing_message(executable))
+
+
+def check_all_installed(executables: Iterable[str], base_dir: Optional[Path] = None) -> None:
+    """Check every executable at once so that a pipeline fails before starting any task.
 
-    if not res or res.exited == 1:
-        raise RuntimeError(message)
+    Args:
+        executables: names of the required executables
+        base_dir: project directory for the cache of executable paths. Defaults to the working directory
+
+    Raises:
+        RuntimeError: with the messages for every missing executable
+
+    """
+    if missing := sorted({name for name in executables if find_executable(name, base_dir) is None}):
+        raise RuntimeError(''.join(_missing_message(name) for name in missing))
@@ -10,7 +10,8 @@ from invoke.context import Context
 from calcipy.cli import task
 from calcipy.invoke_helpers import run
 
-from .executable_utils import PRE_COMMIT_MESSAGE, check_installed, python_dir, python_m
+from .defaults import PYTHON_INPUTS
+from .executable_utils import check_installed, python_dir, python_m
 
 # ==============================================================================
 # Linting
@@ -49,7 +50,7 @@ def _inner_task(
     run(ctx, f'{cmd} {target} {cli_args}'.strip())
 
 
-@task(default=True)
+@task(default=True, inputs=[*PYTHON_INPUTS, 'ruff.toml', '.ruff.toml'])
 def check(ctx: Context) -> None:
     """Run ruff as check-only."""
     _inner_task(ctx, command='ruff check')
@@ -94,10 +95,11 @@ PRE_COMMIT_HOOK_STAGES = [
     help={
         'no_update': 'Skip updating the prek hooks',
     },
+    requires=['prek'],
 )
 def pre_commit(ctx: Context, *, no_update: bool = False) -> None:
     """Run prek."""
-    check_installed(ctx, executable='prek', message=PRE_COMMIT_MESSAGE)
+    check_installed(ctx, executable='prek')
 
     run(ctx, 'prek install')
     if not no_update:
@@ -5,6 +5,7 @@ from invoke.context import Context
 from calcipy.cli import task
 from calcipy.invoke_helpers import run
 
+from . import pack
 from .executable_utils import python_m
 
 
@@ -13,6 +14,7 @@ from .executable_utils import python_m
     help={
         'session': 'Optional session to run',
     },
+    after=[pack.lock],
 )
 def noxfile(ctx: Context, *, session: str = '') -> None:
     """Run nox from the local noxfile."""
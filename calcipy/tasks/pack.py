@@ -12,7 +12,7 @@ from calcipy.cli import task
 from calcipy.invoke_helpers import run
 
 
-@task()
+@task(requires=['uv'])
 def lock(ctx: Context) -> None:
     """Update package manager lock file."""
     if can_skip.can_skip(prerequisites=[PROJECT_TOML], targets=[get_lock()]):
@@ -1,17 +1,28 @@
 """Test CLI."""
 
+import importlib.util
+import shlex
+import time
 from pathlib import Path
 
-from beartype.typing import Optional
+from beartype.typing import Dict, List, Optional, Sequence
 from corallium.file_helpers import open_in_browser, read_package_name
+from corallium.log import LOGGER
+from corallium.markup_table import format_table
 from invoke.context import Context
 
+from calcipy import coverage_contexts, coverage_report, duration_history, import_graph
 from calcipy.cli import task
-from calcipy.experiments import check_duplicate_test_names
-from calcipy.invoke_helpers import run
+from calcipy.experiments import check_duplicate_test_names, check_redundant_tests
+from calcipy.invoke_helpers import get_project_path, run
+from calcipy.task_cache import CACHE_DIR_NAME
 
+from . import lint
 from .defaults import from_ctx
-from .executable_utils import python_dir, python_m
+from .executable_utils import check_installed, python_dir, python_m
+
+HISTORY_PLUGIN = 'calcipy.pytest_duration_history'
+"""Pytest plugin that records the duration of each test for sharding, ordering, and "test.slowest"."""
 
 
 def _inner_task(
@@ -23,16 +34,52 @@ def _inner_task(
     marker: str = '',
     min_cover: int = 0,
     run_as_module: bool = True,
+    test_paths: Sequence[str] = ('./tests',),
+    shard: str = '',
+    workers: str = '',
+    dist: str = 'load',
 ) -> None:
     """Shared task logic."""
+    cli_args += _xdist_args(workers, dist)
     if keyword:
         cli_args += f' -k "{keyword}"'
     if marker:
         cli_args += f' -m "{marker}"'
-    if fail_under := min_cover or int(from_ctx(ctx, 'test', 'min_cover')):
+    run_kwargs = {}
+    if shard:
+        # Coverage of a single shard is incomplete, so check the threshold after "test.combine"
+        cli_args += f' -p calcipy.pytest_shard --calcipy-shard={shard}'
+        run_kwargs['env'] = {'COVERAGE_FILE': f'.coverage.shard-{shard.replace("/", "-of-")}'}
+    elif fail_under := min_cover or int(from_ctx(ctx, 'test', 'min_cover')):
         cli_args += f' --cov-fail-under={fail_under}'
     cmd = f'{python_m()} {command}' if run_as_module else str(python_dir() / command).replace('\\', '/')
-    run(ctx, f'{cmd} ./tests{cli_args}')
+    run(ctx, f'{cmd} {" ".join(test_paths)}{cli_args}', **run_kwargs)
+
+
+DIST_MODES = ('load', 'loadfile', 'loadgroup')
+"""Supported pytest-xdist scheduling modes."""
+
+
+def _xdist_args(workers: str, dist: str) -> str:
+    """Return the pytest-xdist arguments or an empty string to run in a single process.
+
+    Raises:
+        ValueError: if the number of workers or scheduling mode is not supported
+        RuntimeError: if pytest-xdist is not installed
+
+    """
+    if not workers:
+        return ''
+    if workers not in {'auto', 'logical'} and not workers.isdigit():
+        msg = f'Expected "auto", "logical", or a number of workers, but received: {workers!r}'
+        raise ValueError(msg)
+    if dist not in DIST_MODES:
+        msg = f'Expected one of {DIST_MODES} for the scheduling mode, but received: {dist!r}'
+        raise ValueError(msg)
+    if importlib.util.find_spec('xdist') is None:
+        msg = 'pytest-xdist is required to run tests with "--workers". Install with: uv add --dev pytest-xdist'
+        raise RuntimeError(msg)
+    return f' --numprocesses={workers} --dist={dist}'
 
 
 @task()
@@ -43,47 +90,106 @@ def check(_ctx: Context) -> None:
         RuntimeError: if duplicate tests
 
     """
-    if duplciates := check_duplicate_test_names.run(Path('tests')):
+    if duplciates := check_duplicate_test_names.run(Path('tests'), cache_dir=Path.cwd() / CACHE_DIR_NAME):
         raise RuntimeError(f'Duplicate test names found ({duplciates}). See above for details.')  # noqa: EM102
 
 
+@task(
+    help={
+        'min_size': 'Minimum number of AST nodes for tests to be compared by structure',
+    },
+)
+def redundant(_ctx: Context, *, min_size: int = check_redundant_tests.DEFAULT_MIN_SIZE) -> None:
+    """Report clusters of identical or structurally similar tests that may be redundant.
+
+    When "test.pytest" has recorded durations, the time that could be saved by keeping only the slowest test of each
+    cluster is shown. See `calcipy.experiments.check_redundant_tests` for how tests are compared
+
+    """
+    cache_dir = Path.cwd() / CACHE_DIR_NAME
+    durations = duration_history.median_durations(
+        cache_dir / duration_history.HISTORY_NAME, python=duration_history.python_version()
+    )
+    clusters = check_redundant_tests.run(Path('tests'), cache_dir=cache_dir, min_size=min_size, durations=durations)
+    if not clusters:
+        LOGGER.text('No redundant tests were found')
+        return
+    records = [
+        {
+            'Cluster': str(idx) if not offset else '',
+            'Kind': cluster.kind if not offset else '',
+            'Test': test,
+            'Savings (s)': f'{cluster.seconds:.3f}' if cluster.seconds is not None and not offset else '',
+        }
+        for idx, cluster in enumerate(clusters, start=1)
+        for offset, test in enumerate(cluster.tests)
+    ]
+    _print_table('Redundant Tests', ['Cluster', 'Kind', 'Test', 'Savings (s)'], records)
+
+
 KM_HELP = {
     # See: https://docs.pytest.org/en/latest/usage.html#specifying-tests-selecting-tests
     'keyword': 'Only run tests that match the string pattern',
     'marker': 'Only run tests matching given mark expression',
 }
 
+_XDIST_HELP = {
+    'workers': 'Run tests in parallel with pytest-xdist ("auto", "logical", or a number)',
+    'dist': f'pytest-xdist scheduling mode with "--workers" (one of: {", ".join(DIST_MODES)})',
+}
+
+_COVERAGE_HELP = {
+    'min_cover': 'Fail if coverage less than threshold',
+    'out_dir': 'Optional path to coverage directory. Typically ".cover" or "releases/tests"',
+    'view': 'If True, open the created files',
+}
+
 
 @task(
     default=True,
     help={
         'min_cover': 'Fail if coverage less than threshold',
+        'shard': 'Only run shard "i/n" of the tests balanced by "test.shard-durations". See "test.combine"',
         **KM_HELP,
+        **_XDIST_HELP,
     },
 )
-def pytest(ctx: Context, *, keyword: str = '', marker: str = '', min_cover: int = 0) -> None:
+def pytest(
+    ctx: Context,
+    *,
+    keyword: str = '',
+    marker: str = '',
+    min_cover: int = 0,
+    shard: str = '',
+    workers: str = '',
+    dist: str = 'load',
+) -> None:
     """Run pytest with default arguments.
 
     Additional arguments can be set in the environment variable 'PYTEST_ADDOPTS'
 
     """
     pkg_name = read_package_name()
-    durations = '--durations=25 --durations-min="0.1"'
+    durations = f'--durations=25 --durations-min="0.1" -p {HISTORY_PLUGIN}'
     _inner_task(
         ctx,
         cli_args=f' --cov={pkg_name} --cov-branch --cov-report=term-missing {durations}',
         keyword=keyword,
         marker=marker,
         min_cover=min_cover,
+        shard=shard,
+        workers=workers,
+        dist=dist,
     )
 
 
-@task(help=KM_HELP)
+@task(help=KM_HELP, requires=['ptw'])
 def watch(ctx: Context, *, keyword: str = '', marker: str = '') -> None:
     """Run pytest with polling and optimized to stop on first error."""
+    check_installed(ctx, executable='ptw')
     _inner_task(
         ctx,
-        cli_args=' --failed-first --new-first --exitfirst -vv --no-cov',
+        cli_args=f' --failed-first --new-first --exitfirst -vv --no-cov -p {HISTORY_PLUGIN} --calcipy-fastest-first',
         keyword=keyword,
         marker=marker,
         command='ptw . --now',
@@ -93,31 +199,169 @@ def watch(ctx: Context, *, keyword: str = '', marker: str = '') -> None:
 
 @task(
     help={
-        'min_cover': 'Fail if coverage less than threshold',
-        'out_dir': 'Optional path to coverage directory. Typically ".cover" or "releases/tests"',
-        'view': 'If True, open the created files',
+        'since': 'Git ref to compare with (uses the merge base). Defaults to "main" or the commit of the --lines data',
+        'lines': 'Select tests by the changed lines they cover (requires "test.coverage --contexts")',
+        **KM_HELP,
     },
 )
-def coverage(ctx: Context, *, min_cover: int = 0, out_dir: Optional[str] = None, view: bool = False) -> None:
+def affected(ctx: Context, *, since: str = '', lines: bool = False, keyword: str = '', marker: str = '') -> None:
+    """Run only the tests that import a module changed since the git ref.
+
+    Imports are found statically, so see `calcipy.import_graph` for the limitations.
+    With `--lines`, see `calcipy.coverage_contexts` for line-level selection
+
+    """
+    base_dir = Path.cwd()
+    cache_dir = base_dir / CACHE_DIR_NAME
+    db_path = get_project_path() / coverage_contexts.CONTEXT_DB_NAME
+    if lines and not db_path.is_file():
+        msg = f'No coverage context data was found at {db_path}. Run "test.coverage --contexts" first'
+        raise RuntimeError(msg)
+    if lines:
+        since = since or coverage_contexts.recorded_commit(db_path) or 'main'
+        changes = coverage_contexts.changed_lines(base_dir, since)
+        test_paths = coverage_contexts.select_tests(base_dir, db_path, changes, cache_dir=cache_dir)
+        changed = list(changes)
+    else:
+        since = since or 'main'
+        changed = import_graph.changed_files(base_dir, since)
+        test_paths = import_graph.affected_tests(base_dir, changed, cache_dir=cache_dir)
+    if test_paths is None:
+        LOGGER.text('Running all tests because a global or non-documentation file changed', since=since)
+        test_paths = ['./tests']
+    elif not test_paths:
+        LOGGER.text('No tests are affected by the changes', since=since, changed=len(changed))
+        return
+    _inner_task(
+        ctx, cli_args=' --no-cov', keyword=keyword, marker=marker, test_paths=[shlex.quote(path) for path in test_paths]
+    )
+
+
+@task(
+    help={
+        **_COVERAGE_HELP,
+        'contexts': 'Record the tests that cover each line for "test.affected --lines"',
+        **_XDIST_HELP,
+    },
+    after=[lint.fix],
+)
+def coverage(
+    ctx: Context,
+    *,
+    min_cover: int = 0,
+    out_dir: Optional[str] = None,
+    view: bool = False,
+    contexts: bool = False,
+    workers: str = '',
+    dist: str = 'load',
+) -> None:
     """Generate useful coverage outputs after running pytest.
 
-    Creates `coverage.json` used in `doc.build`
+    Creates `coverage.json` used in `doc.build`. With `--workers`, coverage is measured by pytest-cov in each
+    pytest-xdist worker and combined into a single data file before the reports are written
 
     """
     pkg_name = read_package_name()
-    run(ctx, f'{python_m()} coverage run --branch --source={pkg_name} --module pytest ./tests')
+    plugin = f' -p {coverage_contexts.PLUGIN}' if contexts else ''
+    if workers:
+        # "coverage run" only measures the main process, while pytest-cov starts coverage in each worker
+        cli_args = f' --cov={pkg_name} --cov-branch --cov-report={_xdist_args(workers, dist)}{plugin}'
+        run(ctx, f'{python_m()} pytest ./tests{cli_args}')
+    else:
+        run(ctx, f'{python_m()} coverage run --branch --source={pkg_name} --module pytest ./tests{plugin}')
+    if contexts and not ctx.config.run.dry:
+        db_path = get_project_path() / coverage_contexts.CONTEXT_DB_NAME
+        # The full test suite ran, so the tests that are missing from the data were deleted or renamed
+        count = coverage_contexts.update_database(db_path, base_dir=Path.cwd(), prune=True)
+        LOGGER.text(f'Updated the covered lines of {count} tests', path=db_path)
+
+    _coverage_reports(ctx, min_cover=min_cover, out_dir=out_dir, view=view)
 
+
+def _coverage_reports(ctx: Context, *, min_cover: int, out_dir: Optional[str], view: bool) -> None:
+    """Write the terminal, HTML, and JSON coverage reports (`coverage.json` is used by "_handle_coverage")."""
     cov_dir = Path(out_dir or from_ctx(ctx, 'test', 'out_dir'))
+    if ctx.config.run.dry:
+        LOGGER.text('Skipping the coverage reports in a dry run', out_dir=cov_dir)
+        return
     cov_dir.mkdir(exist_ok=True, parents=True)
     print()  # noqa: T201
-
-    fail_under = f' --fail-under={min_cover}' if min_cover > 0 else ''
-    for cli_args in (
-        f'report --show-missing{fail_under}',  # Write to STDOUT
-        f'html --directory={cov_dir}',  # Write to HTML
-        'json',  # Create coverage.json file for "_handle_coverage"
-    ):
-        run(ctx, f'{python_m()} coverage {cli_args}')
+    coverage_report.write_reports(cov_dir, min_cover=min_cover or int(from_ctx(ctx, 'test', 'min_cover')))
 
     if view:  # pragma: no cover
         open_in_browser(cov_dir / 'index.html')
+
+
+@task(help=_COVERAGE_HELP)
+def combine(ctx: Context, *, min_cover: int = 0, out_dir: Optional[str] = None, view: bool = False) -> None:
+    """Combine the coverage data from each "test.pytest --shard" and write the same outputs as "test.coverage"."""
+    run(ctx, f'{python_m()} coverage combine')
+    _coverage_reports(ctx, min_cover=min_cover, out_dir=out_dir, view=view)
+
+
+@task(
+    help={
+        'limit': 'Number of tests and runs to show',
+        'window': 'Number of recent runs of each test for the rolling median',
+    },
+)
+def slowest(_ctx: Context, *, limit: int = 10, window: int = 5) -> None:
+    """Report the slowest tests, regressions, and suite time from the history recorded by "test.pytest"."""
+    db_path = Path.cwd() / CACHE_DIR_NAME / duration_history.HISTORY_NAME
+    python = duration_history.python_version()
+    if not (runs := duration_history.recent_runs(db_path, limit=limit, python=python)):
+        LOGGER.text('No test durations have been recorded. Run "test.pytest" first', path=db_path, python=python)
+        return
+
+    medians = duration_history.median_durations(db_path, window=window, python=python)
+    records = [
+        {'Test': nodeid, 'Median (s)': f'{median:.3f}'}
+        for nodeid, median in sorted(medians.items(), key=lambda item: (-item[1], item[0]))[:limit]
+    ]
+    _print_table(f'Slowest Tests (median of last {window} runs)', ['Test', 'Median (s)'], records)
+
+    records = [
+        {
+            'Test': reg.nodeid,
+            'Latest (s)': f'{reg.latest:.3f}',
+            'Median (s)': f'{reg.median:.3f}',
+            'Ratio': f'{reg.ratio:.1f}x',
+        }
+        for reg in duration_history.regressions(db_path, window=window, python=python)[:limit]
+    ]
+    _print_table('Regressions in the Latest Run', ['Test', 'Latest (s)', 'Median (s)', 'Ratio'], records)
+
+    records = [
+        {
+            'Started': time.strftime('%Y-%m-%d %H:%M', time.localtime(run.started)),
+            'Commit': run.commit_sha[:8],
+            'Shard': run.shard or 'all',
+            'Tests': str(run.tests),
+            'Wall (s)': f'{run.wall:.2f}',
+        }
+        for run in runs
+    ]
+    _print_table(f'Suite Time (Python {python})', ['Started', 'Commit', 'Shard', 'Tests', 'Wall (s)'], records)
+
+
+@task(help={'window': 'Number of recent runs of each test for the rolling median'})
+def shard_durations(_ctx: Context, *, window: int = 5) -> None:
+    """Write the median durations of full "test.pytest" runs to the file that balances "test.pytest --shard".
+
+    Commit the file so that every shard computes the same partition. Tests that are missing from the file are spread
+    round-robin by count
+
+    """
+    db_path = Path.cwd() / CACHE_DIR_NAME / duration_history.HISTORY_NAME
+    durations = duration_history.median_durations(db_path, window=window, include_shards=False)
+    if not durations:
+        LOGGER.text('No test durations have been recorded. Run "test.pytest" first', path=db_path)
+        return
+    path = Path.cwd() / duration_history.SHARD_DURATIONS_NAME
+    duration_history.write_shard_durations(path, durations)
+    LOGGER.text('Wrote the shard durations', path=path, tests=len(durations))
+
+
+def _print_table(title: str, headers: List[str], records: List[Dict[str, str]]) -> None:
+    LOGGER.text(title, is_header=True)
+    print(format_table(headers, records) if records else 'None')  # noqa: T201
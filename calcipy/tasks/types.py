@@ -6,24 +6,27 @@ from invoke.context import Context
 from calcipy.cli import task
 from calcipy.invoke_helpers import run
 
-from .executable_utils import PYRIGHT_MESSAGE, check_installed, python_m
+from . import lint
+from .defaults import PYTHON_INPUTS
+from .executable_utils import check_installed, python_m
 
 
-@task()
+@task(after=[lint.fix], inputs=[*PYTHON_INPUTS, 'pyrightconfig.json'], requires=['pyright'])
 def pyright(ctx: Context) -> None:
     """Run pyright using the config in `pyproject.toml`."""
-    check_installed(ctx, executable='pyright', message=PYRIGHT_MESSAGE)
+    check_installed(ctx, executable='pyright')
     run(ctx, 'pyright')
 
 
-@task()
+@task(after=[lint.fix], inputs=[*PYTHON_INPUTS, 'mypy.ini', '.mypy.ini'])
 def mypy(ctx: Context) -> None:
     """Run mypy."""
     run(ctx, f'{python_m()} mypy')
 
 
-@task()
+@task(after=[lint.fix], inputs=[*PYTHON_INPUTS, 'ty.toml'], requires=['ty'])
 def ty(ctx: Context) -> None:
     """Run ty type checker."""
+    check_installed(ctx, executable='ty')
     pkg = read_package_name()
     run(ctx, f'ty check {pkg} tests')
@@ -0,0 +1,127 @@
+"""Record task and subprocess spans as Chrome trace events.
+
+The output can be opened with https://ui.perfetto.dev or `chrome://tracing`. Spans include wall time, the CPU
+time of this process, and the CPU time of child processes from `getrusage`.
+
+Child resource usage is only reported by the OS once a child has been waited on and is process-wide, so spans
+that overlap (such as when running with `--jobs`) may include usage from the other concurrent subprocesses. The OS
+only reports the largest RSS of any terminated child rather than a per-span peak, so each span records
+`max_child_rss_kb_so_far`, which is the largest RSS of any child of this process up to the end of the span.
+
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from beartype.typing import Any, Dict, Iterator, List, Optional
+
+if sys.platform != 'win32':
+    import resource
+
+
+def _child_usage() -> Dict[str, float]:
+    """Return the cumulative CPU time and the largest RSS (in KB) of any terminated child process."""
+    if sys.platform == 'win32':  # pragma: no cover
+        return {}
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    # ru_maxrss is in bytes on macOS and in kilobytes on Linux
+    max_rss_kb = usage.ru_maxrss / 1024 if sys.platform == 'darwin' else usage.ru_maxrss
+    return {'cpu_s': usage.ru_utime + usage.ru_stime, 'max_rss_kb': max_rss_kb}
+
+
+class Tracer:
+    """Thread-safe collector of Chrome trace-event spans."""
+
+    def __init__(self) -> None:
+        """Initialize the tracer and its time origin."""
+        self._origin_ns = time.perf_counter_ns()
+        self._events: List[Dict[str, Any]] = []
+        self._thread_names: Dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, category: str, **args: Any) -> Iterator[None]:
+        """Record a complete ('X') event for the duration of the context.
+
+        Yields:
+            None
+
+        """
+        start_ns = time.perf_counter_ns()
+        start_cpu = time.process_time()
+        start_child = _child_usage()
+        try:
+            yield
+        finally:
+            end_ns = time.perf_counter_ns()
+            tid = threading.get_ident()
+            end_child = _child_usage()
+            event_args = {
+                **{key: str(value) for key, value in args.items()},
+                'wall_s': round((end_ns - start_ns) / 1e9, 6),
+                'cpu_s': round(time.process_time() - start_cpu, 6),
+            }
+            if end_child:
+                event_args['child_cpu_s'] = round(end_child['cpu_s'] - start_child['cpu_s'], 6)
+                event_args['max_child_rss_kb_so_far'] = end_child['max_rss_kb']
+            event = {
+                'name': name,
+                'cat': category,
+                'ph': 'X',
+                'ts': (start_ns - self._origin_ns) / 1000,
+                'dur': (end_ns - start_ns) / 1000,
+                'pid': os.getpid(),
+                'tid': tid,
+                'args': event_args,
+            }
+            with self._lock:
+                self._events.append(event)
+                self._thread_names[tid] = threading.current_thread().name
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the Chrome trace-event JSON object."""
+        with self._lock:
+            events = list(self._events)
+            thread_names = [
+                {'name': 'thread_name', 'ph': 'M', 'pid': os.getpid(), 'tid': tid, 'args': {'name': name}}
+                for tid, name in self._thread_names.items()
+            ]
+        return {'traceEvents': [*thread_names, *events], 'displayTimeUnit': 'ms'}
+
+    def write(self, path: Path) -> None:
+        """Write the Chrome trace-event JSON file."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict()), encoding='utf-8')
+
+
+_TRACER: Optional[Tracer] = None
+"""Active tracer, if tracing was enabled."""
+
+
+def start_tracing() -> Tracer:
+    """Enable tracing for the remainder of the process."""
+    global _TRACER  # noqa: PLW0603
+    _TRACER = Tracer()
+    return _TRACER
+
+
+@contextmanager
+def span(name: str, category: str, **args: Any) -> Iterator[None]:
+    """Record a span when tracing is enabled, otherwise do nothing.
+
+    Yields:
+        None
+
+    """
+    if _TRACER is None:
+        yield
+    else:
+        with _TRACER.span(name, category, **args):
+            yield
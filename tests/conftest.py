@@ -32,3 +32,9 @@ def ctx() -> MockContext:
     """
     MockContext.run_command = property(lambda self: self.run.call_args[0][0])  # type: ignore[attr-defined]  # ty: ignore[unresolved-attribute]
     return MockContext(run=True)
+
+
+@pytest.fixture
+def installed_executables(monkeypatch):
+    """Resolve every executable to a placeholder path so that tasks don't depend on the local installation."""
+    monkeypatch.setattr('calcipy.tasks.executable_utils.find_executable', Path)
@@ -1,5 +1,6 @@
 from pathlib import Path
 
+from calcipy.experiments import check_duplicate_test_names
 from calcipy.experiments.check_duplicate_test_names import run
 
 
@@ -22,3 +23,49 @@ def test_check_duplicate_test_names():
     duplicates = run(Path(__file__).parents[1])
 
     assert duplicates == ['test_intentional_duplicate']
+
+
+def _write_tests(tmp_path):
+    (tmp_path / 'nested').mkdir()
+    (tmp_path / 'test_a.py').write_text('def test_shared():\n    pass\n\n\ndef test_a():\n    pass\n')
+    (tmp_path / 'nested' / 'test_b.py').write_text(
+        'def test_shared():\n    pass\n\n\n'
+        'class TestB:\n    def test_b(self):\n        pass\n\n    def test_b(self):\n        pass\n\n\n'
+        'class TestC:\n    def test_b(self):\n        pass\n\n\n'
+        'async def test_async():\n    pass\n\n\nasync def test_async():\n    pass\n'
+    )
+    (tmp_path / 'test_invalid.py').write_text('def test_(:\n')
+
+
+def test_run_scopes(tmp_path):
+    _write_tests(tmp_path)
+
+    duplicates = run(tmp_path)
+
+    assert duplicates == ['nested/test_b.py::TestB::test_b', 'nested/test_b.py::test_async', 'test_shared']
+
+
+def test_run_cache(tmp_path, monkeypatch):
+    _write_tests(tmp_path)
+    cache_dir = tmp_path / '.cache'
+    scanned = []
+    original = check_duplicate_test_names.scan_test_names
+
+    def _scan_test_names(source):
+        scanned.append(source.split('(', 1)[0])
+        return original(source)
+
+    monkeypatch.setattr(check_duplicate_test_names, 'scan_test_names', _scan_test_names)
+    run(tmp_path, cache_dir=cache_dir)
+    (tmp_path / 'test_a.py').write_text('def test_renamed():\n    pass\n')
+    duplicates = run(tmp_path, cache_dir=cache_dir)
+
+    assert scanned == ['def test_shared', 'def test_shared', 'def test_', 'def test_renamed']
+    assert duplicates == ['nested/test_b.py::TestB::test_b', 'nested/test_b.py::test_async']
+
+
+def test_run_parallel(tmp_path, monkeypatch):
+    _write_tests(tmp_path)
+    monkeypatch.setattr(check_duplicate_test_names, 'PARALLEL_MIN_FILES', 1)
+
+    assert run(tmp_path, workers=2) == run(tmp_path, workers=1)
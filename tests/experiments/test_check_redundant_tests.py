@@ -0,0 +1,54 @@
+from calcipy.experiments.check_redundant_tests import fingerprint_tests, run
+
+_SOURCE = '''
+def test_a():
+    """Docstrings are ignored."""
+    result = sorted([3, 1, 2])
+    assert result == [1, 2, 3]
+
+
+def test_b():
+    result = sorted([3, 1, 2])
+    assert result == [1, 2, 3]
+
+
+def test_c():
+    value = reversed([5, 4, 6])
+    assert value == [4, 5, 6]
+
+
+class TestD:
+    def test_d(self):
+        assert True
+
+'''
+
+
+def test_fingerprint_tests():
+    tests = fingerprint_tests(_SOURCE)['tests']
+
+    assert [test[:2] for test in tests] == [['test_a', 2], ['test_b', 8], ['test_c', 13], ['TestD::test_d', 19]]
+    (_, _, identical_a, similar_a, _), (_, _, identical_b, similar_b, _), (_, _, identical_c, similar_c, _) = tests[:3]
+    assert identical_a == identical_b != identical_c
+    assert similar_a == similar_b == similar_c
+    assert fingerprint_tests('def test_(:') == {'tests': []}
+
+
+def test_run(tmp_path):
+    (tmp_path / 'test_sample.py').write_text(_SOURCE)
+    (tmp_path / 'test_copy.py').write_text('class TestCopy:\n    def test_copy(self):\n        assert True\n')
+    durations = {
+        f'{tmp_path.as_posix()}/test_sample.py::test_a': 1.0,
+        f'{tmp_path.as_posix()}/test_sample.py::test_b[x]': 2.0,
+        f'{tmp_path.as_posix()}/test_sample.py::test_b[y]': 3.0,
+    }
+
+    clusters = run(tmp_path, min_size=10, durations=durations)
+
+    assert [(cluster.kind, [test.split('::')[-1] for test in cluster.tests]) for cluster in clusters] == [
+        ('identical', ['test_copy', 'test_d']),
+        ('identical', ['test_a', 'test_b']),
+        ('similar', ['test_a', 'test_b', 'test_c']),
+    ]
+    assert clusters[0].seconds is None
+    assert clusters[1].seconds == 1.0
@@ -0,0 +1,66 @@
+from calcipy.experiments.startup_benchmark import (
+    ImportTiming,
+    StartupResult,
+    attribute_by_package,
+    find_regressions,
+    measure,
+    parse_importtime,
+    scenarios,
+)
+
+_IMPORTTIME = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   invoke.util
+import time:       300 |        420 | invoke
+Subcommands:
+import time:        80 |         80 | calcipy
+"""
+
+
+def test_parse_importtime():
+    timings = parse_importtime(_IMPORTTIME)
+
+    assert timings == [
+        ImportTiming('invoke.util', 120, 120),
+        ImportTiming('invoke', 300, 420),
+        ImportTiming('calcipy', 80, 80),
+    ]
+    assert attribute_by_package(timings) == [('invoke', 0.42), ('calcipy', 0.08)]
+
+
+def test_find_regressions():
+    results = [
+        StartupResult('calcipy-lint', 'list', cold_ms=100.0, warm_ms=50.0, modules=91),
+        StartupResult('calcipy-lint', 'version', cold_ms=100.0, warm_ms=50.0, modules=10),
+    ]
+    budget = {'calcipy-lint': {'list': {'cold_ratio': 100, 'warm_ratio': 30, 'modules': 90}}}
+
+    regressions = find_regressions(results, budget, tolerance=0.25)
+
+    assert regressions == [
+        'calcipy-lint list: warm_ratio=50.0 exceeds 37.5 (baseline 30 + 25%)',
+        'calcipy-lint version: missing from the budget (run with --update)',
+    ]
+
+
+def test_measure(monkeypatch):
+    calls = []
+
+    def fake_run(code, args, *, env, importtime=False):
+        calls.append((code, env))
+        return (40.0 if importtime else 20.0), _IMPORTTIME
+
+    monkeypatch.setattr('calcipy.experiments.startup_benchmark._run', fake_run)
+
+    runs = 3
+    result = measure('calcipy', 'calcipy.scripts:start', 'noop', ['lint.check'], runs=runs, reference=(10.0, 5.0))
+
+    assert result.metrics() == {'cold_ratio': 2.0, 'warm_ratio': 4.0, 'modules': 3}
+    assert result.packages[0] == ('invoke', 0.42)
+    assert len(calls) == runs + 2  # Cold, warm, and importtime
+    assert all(code.startswith('import calcipy.collection') for code, _ in calls)
+    assert all(env['CALCIPY_DAEMON_SOCKET'].endswith('no-daemon.sock') for _, env in calls)
+
+
+def test_scenarios():
+    assert 'noop_no_daemon' in scenarios('calcipy-client')
+    assert 'noop' in scenarios('calcipy-lint')
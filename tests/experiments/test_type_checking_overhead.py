@@ -0,0 +1,28 @@
+from calcipy.experiments.type_checking_overhead import TypeCheckRun, format_report, parse_junit_durations
+
+_JUNIT = """<?xml version="1.0" encoding="utf-8"?>
+<testsuites><testsuite name="pytest">
+<testcase classname="tests.test_cli" name="test_a" time="0.5" />
+<testcase classname="tests.test_cli" name="test_b" time="0.25" />
+<testcase classname="tests.test_collection" name="test_c" time="1.0" />
+</testsuite></testsuites>
+"""
+
+
+def test_parse_junit_durations(tmp_path):
+    junit_path = tmp_path / 'junit.xml'
+    junit_path.write_text(_JUNIT)
+
+    assert parse_junit_durations(junit_path) == {'tests.test_cli': 0.75, 'tests.test_collection': 1.0}
+
+
+def test_format_report():
+    on_run = TypeCheckRun('ERROR', 3.0, {'tests.test_cli': 1.5, 'tests.test_collection': 1.1})
+    off_run = TypeCheckRun('OFF', 2.0, {'tests.test_cli': 0.75, 'tests.test_collection': 1.0})
+
+    assert format_report([on_run], [off_run], top=1).splitlines() == [
+        '| Tests | ERROR (s) | OFF (s) | Overhead |',
+        '|:------|-----:|-----:|-----:|',
+        '| Total (wall time) | 3.000 | 2.000 | +50.0% |',
+        '| tests.test_cli | 1.500 | 0.750 | +100.0% |',
+    ]
@@ -0,0 +1,49 @@
+import json
+
+import pytest
+from beartype.typing import Any, Dict
+
+from calcipy.markup_writer._coverage_json import read_coverage_summary
+
+_COVERAGE_DATA: Dict[str, Any] = {
+    'meta': {'format': 3, 'timestamp': '2021-06-03T19:37:11.980123', 'show_contexts': False},
+    'files': {
+        'pkg/{odd} "name" [1].py': {
+            'executed_lines': [1, 2, 3],
+            'summary': {'covered_lines': 3, 'num_statements': 4, 'percent_covered': 75.0, 'missing_lines': 1},
+            'missing_lines': [4],
+            'excluded_lines': [],
+            'executed_branches': [[2, 3], [3, -1]],
+            'functions': {'f': {'executed_lines': [2], 'summary': {'covered_lines': 1}, 'name': 'a\\"}]'}},
+        },
+        'pkg/empty.py': {'summary': {'covered_lines': 0, 'num_statements': 0, 'percent_covered': 100.0}},
+    },
+    'totals': {'covered_lines': 3, 'num_statements': 4, 'percent_covered': 75.0, 'missing_lines': 1},
+    'extra': [None, True, 1.5e-3, {'nested': 'value'}],
+}
+
+
+@pytest.mark.parametrize('chunk_size', [1, 3, 64, 1 << 20])
+@pytest.mark.parametrize('indent', [None, 2])
+def test_read_coverage_summary(fix_test_cache, chunk_size, indent):
+    path_coverage = fix_test_cache / 'coverage.json'
+    path_coverage.write_text(json.dumps(_COVERAGE_DATA, indent=indent), encoding='utf-8')
+
+    result = read_coverage_summary(path_coverage, chunk_size=chunk_size)
+
+    assert result == {
+        'meta': _COVERAGE_DATA['meta'],
+        'files': {
+            path_file: {'summary': file_obj['summary']} for path_file, file_obj in _COVERAGE_DATA['files'].items()
+        },
+        'totals': _COVERAGE_DATA['totals'],
+    }
+
+
+@pytest.mark.parametrize('text', ['', '{"files": {"a.py": {"executed_lines": [1, 2', '{"meta": "open'])
+def test_read_coverage_summary_truncated(fix_test_cache, text):
+    path_coverage = fix_test_cache / 'coverage.json'
+    path_coverage.write_text(text, encoding='utf-8')
+
+    with pytest.raises(ValueError, match='JSON'):
+        read_coverage_summary(path_coverage, chunk_size=4)
@@ -6,8 +6,14 @@ from pathlib import Path
 import pytest
 from beartype.typing import List
 
+from calcipy import task_cache
 from calcipy.markup_writer._writer import (
+    _CHUNK_SIZE,
     _CLI_ALLOWED_PREFIXES,
+    SECTION_MANIFEST_NAME,
+    _compile_key_matcher,
+    _contains_marker,
+    _find_markers,
     _format_cov_table,
     _handle_cli_output,
     _handle_coverage,
@@ -15,8 +21,12 @@ from calcipy.markup_writer._writer import (
     _parse_var_comment,
     _ParseSkipError,
     _ReplacementMachine,
+    _run_cli_commands,
+    _SectionManifest,
+    _SourceCache,
     write_template_formatted_sections,
 )
+from calcipy.task_cache import list_input_files
 from tests.configuration import TEST_DATA_DIR
 
 SAMPLE_README_PATH = TEST_DATA_DIR / 'sample_doc_files' / 'README.md'
@@ -60,6 +70,33 @@ def test_format_cov_table(snapshot):
     assert '\n'.join(result) == snapshot
 
 
+def test_format_cov_table_rollup_and_top():
+    result = _format_cov_table(_COVERAGE_SAMPLE_DATA, rollup=1, top=1)
+
+    rows = [line for line in result if line.startswith('| `')]
+    assert rows == ['| `calcipy/` | 97         | 46      | 3        | 52.6%    |']
+    assert 'Showing the 1 of 1 directories with the lowest coverage' not in result
+
+
+def test_format_cov_table_top():
+    result = _format_cov_table(_COVERAGE_SAMPLE_DATA, top=1)
+
+    rows = [line.split('|')[1].strip() for line in result if line.startswith('| `')]
+    assert rows == ['`calcipy/doit_tasks/code_tags.py`']
+    assert 'Showing the 1 of 2 files with the lowest coverage' in result
+
+
+def test_handle_coverage_options(fix_test_cache):
+    path_cover = fix_test_cache / 'coverage.json'
+    path_cover.write_text(json.dumps(_COVERAGE_SAMPLE_DATA))
+    line = '<!-- {cts} COVERAGE rollup=2; top=5; -->'
+
+    result = _handle_coverage(line, Path('fake.md'), path_coverage=path_cover)
+
+    assert result[0] == line
+    assert any(row.startswith('| `calcipy/doit_tasks/` |') for row in result)
+
+
 def test_write_template_formatted_sections(fix_test_cache, snapshot):
     path_new_readme = fix_test_cache / SAMPLE_README_PATH.name
     shutil.copyfile(SAMPLE_README_PATH, path_new_readme)
@@ -175,7 +212,267 @@ def test_replacement_machine_handler_skip():
     assert result == ['<!-- {cts} SKIP_ME test; -->', 'inner content', '<!-- {cte} -->']
 
 
+@pytest.mark.parametrize(
+    ('line', 'expected'),
+    [
+        ('<!-- {cts} KEY; -->', {'cts'}),
+        ('{% [cte] %}', {'cte'}),
+        ('<!-- {cts] KEY; -->', set()),
+        ('<!-- [cte} -->', set()),
+    ],
+)
+def test_find_markers(line, expected):
+    assert _find_markers(line) == expected
+
+
+def test_replacement_machine_streams_fresh_sections(fix_test_cache):
+    calls: List[str] = []
+    section = [_SOURCE_LINE, 'unchanged', '<!-- {cte} -->']
+    manifest = _SectionManifest(fix_test_cache / 'cache', {'SOURCE_FILE=': lambda _line, _path: []})
+    path_md = fix_test_cache / 'doc.md'
+    fingerprint = manifest.fingerprint('SOURCE_FILE=', _SOURCE_LINE, path_md)
+    assert fingerprint
+    manifest.record(f'{path_md.resolve().as_posix()}#0', fingerprint, section)
+    consumed: List[str] = []
+
+    def _lines():
+        for line in section:
+            consumed.append(line)
+            yield line
+
+    stream = _ReplacementMachine(manifest).stream(_lines(), {'SOURCE_FILE=': partial(_count_calls, calls)}, path_md)
+
+    assert next(stream) == _SOURCE_LINE
+    assert next(stream) == 'unchanged'
+    assert consumed == section[:2]  # Yielded before the end marker was read
+    assert list(stream) == section[2:]
+    assert not calls
+
+
 def test_handle_cli_output_allowed_prefixes():
     assert './run' in _CLI_ALLOWED_PREFIXES
     assert 'uv ' in _CLI_ALLOWED_PREFIXES
     assert 'python -m ' in _CLI_ALLOWED_PREFIXES
+
+
+_SOURCE_LINE = '<!-- {cts} SOURCE_FILE=source.py; -->'
+
+
+def _count_calls(calls: List[str], line: str, path_md: Path) -> List[str]:
+    calls.append(line)
+    return _handle_source_file(line, path_md)
+
+
+def _write_source_sections(path_md: Path, cache_dir: Path, calls: List[str]) -> None:
+    write_template_formatted_sections(
+        handler_lookup={'SOURCE_FILE=': partial(_count_calls, calls)},
+        paths=[path_md],
+        inputs_lookup={'SOURCE_FILE=': lambda _line, _path: [path_md.parent / 'source.py']},
+        cache_dir=cache_dir,
+    )
+
+
+def test_write_template_formatted_sections_skips_files_without_markers(fix_test_cache):
+    path_md = fix_test_cache / 'no_markers.md'
+    path_md.write_text('# Title\n\nNo sections\n', encoding='utf-8')
+    calls: List[str] = []
+
+    _write_source_sections(path_md, fix_test_cache / 'cache', calls)
+
+    assert not calls
+    assert not (fix_test_cache / 'cache' / SECTION_MANIFEST_NAME).is_file()
+
+
+def test_write_template_formatted_sections_only_regenerates_stale_sections(fix_test_cache):
+    cache_dir = fix_test_cache / 'cache'
+    path_source = fix_test_cache / 'source.py'
+    path_source.write_text('print(1)\n', encoding='utf-8')
+    path_md = fix_test_cache / 'doc.md'
+    path_md.write_text(f'# Doc\n\n{_SOURCE_LINE}\n<!-- {{cte}} -->\n', encoding='utf-8')
+    calls: List[str] = []
+
+    _write_source_sections(path_md, cache_dir, calls)
+    generated = path_md.read_text(encoding='utf-8')
+    mtime_ns = path_md.stat().st_mtime_ns
+    _write_source_sections(path_md, cache_dir, calls)
+
+    assert calls == [_SOURCE_LINE]
+    assert 'print(1)' in generated
+    assert path_md.stat().st_mtime_ns == mtime_ns
+    assert (cache_dir / SECTION_MANIFEST_NAME).is_file()
+
+    path_source.write_text('print(2)\n', encoding='utf-8')
+    _write_source_sections(path_md, cache_dir, calls)
+
+    assert calls == [_SOURCE_LINE, _SOURCE_LINE]
+    assert 'print(2)' in path_md.read_text(encoding='utf-8')
+
+
+def test_write_template_formatted_sections_regenerates_edited_sections(fix_test_cache):
+    cache_dir = fix_test_cache / 'cache'
+    (fix_test_cache / 'source.py').write_text('print(1)\n', encoding='utf-8')
+    path_md = fix_test_cache / 'doc.md'
+    path_md.write_text(f'{_SOURCE_LINE}\n<!-- {{cte}} -->\n', encoding='utf-8')
+    calls: List[str] = []
+    _write_source_sections(path_md, cache_dir, calls)
+    generated = path_md.read_text(encoding='utf-8')
+
+    path_md.write_text(generated.replace('print(1)', 'edited'), encoding='utf-8')
+    _write_source_sections(path_md, cache_dir, calls)
+
+    assert calls == [_SOURCE_LINE, _SOURCE_LINE]
+    assert path_md.read_text(encoding='utf-8') == generated
+
+
+_TIME_COMMAND = 'python -c "import time; print(time.time_ns())"'
+
+
+def test_run_cli_commands_caches_output(fix_test_cache):
+    cache_dir = fix_test_cache / 'cache'
+
+    first = _run_cli_commands([_TIME_COMMAND, _TIME_COMMAND], cache_dir=cache_dir)
+    second = _run_cli_commands([_TIME_COMMAND], cache_dir=cache_dir)
+    uncached = _run_cli_commands([_TIME_COMMAND])
+
+    assert list(first) == [_TIME_COMMAND]
+    assert first[_TIME_COMMAND].output.strip().isdigit()
+    assert second == first
+    assert uncached != first
+
+
+def test_run_cli_commands_does_not_cache_failures(fix_test_cache):
+    command = 'python -c "import sys, time; print(time.time_ns()); sys.exit(1)"'
+    cache_dir = fix_test_cache / 'cache'
+
+    first = _run_cli_commands([command], cache_dir=cache_dir)
+    second = _run_cli_commands([command], cache_dir=cache_dir)
+
+    assert first[command].exit_code == 1
+    assert second[command].output != first[command].output
+
+
+def test_write_template_formatted_sections_cli_output(fix_test_cache):
+    path_md = fix_test_cache / 'cli.md'
+    path_md.write_text(
+        '<!-- {cts} CLI_OUTPUT=python -m calcipy --help; -->\n<!-- {cte} -->\n'
+        '<!-- {cts} CLI_OUTPUT=rm -rf /; -->\nkept\n<!-- {cte} -->\n',
+        encoding='utf-8',
+    )
+
+    write_template_formatted_sections(paths=[path_md], cache_dir=fix_test_cache / 'cache')
+
+    text = path_md.read_text(encoding='utf-8')
+    assert text.startswith('<!-- {cts} CLI_OUTPUT=python -m calcipy --help; -->\n```txt\n')
+    assert '<!-- {cts} CLI_OUTPUT=rm -rf /; -->\nkept\n<!-- {cte} -->\n' in text
+
+
+def test_write_template_formatted_sections_lists_cli_inputs_once(fix_test_cache, monkeypatch):
+    calls: List[Path] = []
+
+    def _list_input_files(base_dir, patterns):
+        calls.append(base_dir)
+        return list_input_files(base_dir, patterns)
+
+    monkeypatch.setattr(task_cache, 'list_input_files', _list_input_files)
+    commands = ['python -m platform', 'python -m site --user-base']
+    path_md = fix_test_cache / 'cli.md'
+    path_md.write_text(''.join(f'<!-- {{cts}} CLI_OUTPUT={cmd}; -->\n<!-- {{cte}} -->\n' for cmd in commands))
+    runs = 2
+
+    outputs = []
+    for _ in range(runs):
+        write_template_formatted_sections(paths=[path_md], cache_dir=fix_test_cache / 'cache')
+        outputs.append(path_md.read_text(encoding='utf-8'))
+
+    # The project files are listed once per run for the manifest of every section and the cache of every command
+    assert len(calls) == runs
+    assert outputs[0].count('```txt') == len(commands)
+    assert outputs[1] == outputs[0]
+
+
+def test_contains_marker_across_chunks(fix_test_cache):
+    path_md = fix_test_cache / 'large.md'
+    path_md.write_text('x' * (_CHUNK_SIZE - 2) + '{cts} rating=1; -->\n', encoding='utf-8')
+    path_plain = fix_test_cache / 'plain.md'
+    path_plain.write_text('x' * _CHUNK_SIZE + '{cte}\n', encoding='utf-8')
+
+    assert _contains_marker(path_md)
+    assert not _contains_marker(path_plain)
+    assert not _contains_marker(fix_test_cache / 'missing.md')
+
+
+def test_compile_key_matcher_prefers_longest_key():
+    matcher = _compile_key_matcher(('COVERAGE', 'COVERAGE_TEST'))
+
+    assert matcher.findall('<!-- {cts} COVERAGE_TEST; -->') == ['COVERAGE_TEST']
+    assert matcher.findall('<!-- {cts} COVERAGE; -->') == ['COVERAGE']
+
+
+def test_write_template_formatted_sections_keeps_file_on_error(fix_test_cache):
+    def _fail(line: str, path_md: Path) -> List[str]:
+        raise ValueError(line)
+
+    path_md = fix_test_cache / 'error.md'
+    original = 'before\n<!-- {cts} FAIL; -->\n<!-- {cte} -->\n'
+    path_md.write_text(original, encoding='utf-8')
+
+    with pytest.raises(ValueError, match='FAIL'):
+        write_template_formatted_sections(handler_lookup={'FAIL': _fail}, paths=[path_md])
+
+    assert path_md.read_text(encoding='utf-8') == original
+    assert sorted(path.name for path in fix_test_cache.glob('*error.md*')) == ['error.md']
+
+
+_SAMPLE_SOURCE = """import functools
+
+
+class Example:
+    \"\"\"Example class.\"\"\"
+
+    @functools.cache
+    def method(self) -> int:
+        return 1
+
+
+def function() -> None:
+    pass
+"""
+
+
+@pytest.mark.parametrize(
+    ('value', 'expected'),
+    [
+        ('source.py#L4', ['class Example:']),
+        ('source.py#L12-L13', ['def function() -> None:', '    pass']),
+        ('source.py::function', ['def function() -> None:', '    pass']),
+        ('source.py::Example.method', ['@functools.cache', 'def method(self) -> int:', '    return 1']),
+    ],
+)
+def test_handle_source_file_selection(fix_test_cache, value, expected):
+    (fix_test_cache / 'source.py').write_text(_SAMPLE_SOURCE, encoding='utf-8')
+    line = f'<!-- {{cts}} SOURCE_FILE={value}; -->'
+
+    result = _handle_source_file(line, fix_test_cache / 'doc.md')
+
+    assert result == [line, '```py', *expected, '```', '<!-- {cte} -->']
+
+
+@pytest.mark.parametrize('value', ['source.py::Missing', 'source.py#L0', 'source.py#L1-L99', 'source.py#lines'])
+def test_handle_source_file_invalid_selection(fix_test_cache, value):
+    (fix_test_cache / 'source.py').write_text(_SAMPLE_SOURCE, encoding='utf-8')
+
+    with pytest.raises(_ParseSkipError):
+        _handle_source_file(f'<!-- {{cts}} SOURCE_FILE={value}; -->', fix_test_cache / 'doc.md')
+
+
+def test_source_cache_reads_and_parses_once(fix_test_cache):
+    path_source = fix_test_cache / 'source.py'
+    path_source.write_text(_SAMPLE_SOURCE, encoding='utf-8')
+    sources = _SourceCache()
+
+    symbols = sources.symbols(path_source)
+    path_source.unlink()
+
+    assert sources.symbols(path_source) is symbols
+    assert sources.lines(path_source)[0] == 'import functools'
+    assert set(symbols) == {'Example', 'Example.method', 'function'}
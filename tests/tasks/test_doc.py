@@ -1,6 +1,9 @@
+from unittest.mock import patch
+
 import pytest
 
-from calcipy.tasks.doc import build, deploy, get_out_dir
+from calcipy.collection import GlobalTaskOptions
+from calcipy.tasks.doc import build, deploy, doc_inputs, get_out_dir, read_mkdocs_config
 from calcipy.tasks.executable_utils import python_m
 
 
@@ -12,6 +15,63 @@ from calcipy.tasks.executable_utils import python_m
     ],
 )
 def test_doc(ctx, task, kwargs, commands, assert_run_commands):
-    task(ctx, **kwargs)
+    ctx.config.gto = GlobalTaskOptions(no_cache=True)  # Don't record a build that didn't run
+
+    with patch('calcipy.tasks.doc.write_template_formatted_sections'):  # Don't rewrite the project documentation
+        task(ctx, **kwargs)
 
     assert_run_commands(ctx, commands)
+
+
+@pytest.fixture
+def doc_project(tmp_path):
+    (tmp_path / 'pyproject.toml').write_text('[project]\nname = "mypkg"\n', encoding='utf-8')
+    (tmp_path / 'mkdocs.yml').write_text('site_dir: site\nwatch:\n  - scripts\n', encoding='utf-8')
+    (tmp_path / 'docs').mkdir()
+    (tmp_path / 'docs' / 'index.md').write_text('# Docs\n', encoding='utf-8')
+    (tmp_path / 'mypkg').mkdir()
+    (tmp_path / 'mypkg' / '__init__.py').write_text('', encoding='utf-8')
+    (tmp_path / 'tests').mkdir()
+    (tmp_path / 'tests' / 'test_mypkg.py').write_text('', encoding='utf-8')
+    with (
+        patch('calcipy.tasks.doc.get_project_path', return_value=tmp_path),
+        patch('calcipy.tasks.doc.write_template_formatted_sections'),
+    ):
+        yield tmp_path
+
+
+def test_doc_inputs(doc_project):
+    assert doc_inputs(doc_project) == [
+        'docs/**',
+        'mkdocs.yml',
+        'coverage.json',
+        'mypkg/**/*.py',
+        'src/mypkg/**/*.py',
+        'scripts/**',
+    ]
+
+
+def test_read_mkdocs_config_reloads_modified_file(doc_project):
+    first = read_mkdocs_config()
+    (doc_project / 'mkdocs.yml').write_text('site_dir: other\n', encoding='utf-8')
+
+    assert read_mkdocs_config() is not first
+    assert read_mkdocs_config() is read_mkdocs_config()
+    assert get_out_dir().as_posix() == 'other'
+
+
+def test_build_skips_unchanged_docs(ctx, doc_project):
+    command = f'{python_m()} mkdocs build --site-dir site'
+
+    build(ctx)
+    (doc_project / 'site').mkdir()
+    (doc_project / 'site' / 'index.html').write_text('', encoding='utf-8')
+    (doc_project / 'tests' / 'test_mypkg.py').write_text('assert True\n', encoding='utf-8')
+    build(ctx)
+    ctx.config.gto = GlobalTaskOptions(no_cache=True)
+    build(ctx)
+    ctx.config.gto = GlobalTaskOptions()
+    (doc_project / 'mypkg' / '__init__.py').write_text('"""Changed."""\n', encoding='utf-8')
+    build(ctx)
+
+    assert [call.args[0] for call in ctx.run.call_args_list] == [command] * 3
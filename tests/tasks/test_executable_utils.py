@@ -1,9 +1,139 @@
-from calcipy.tasks.executable_utils import _EXECUTABLE_CACHE, check_installed
+import json
+import os
+import sys
 
+import pytest
+from invoke.config import Config
+from invoke.exceptions import Exit
+from invoke.tasks import Call, Task
 
-def test_check_installed_cache_hit(ctx):
-    _EXECUTABLE_CACHE['test_exec'] = ctx.run('which test_exec', warn=True, hide=True)
+from calcipy.collection import TASK_REQUIRES_ATTR, CalcipyExecutor, Collection, GlobalTaskOptions
+from calcipy.task_cache import CACHE_DIR_NAME
+from calcipy.tasks import executable_utils
+from calcipy.tasks.executable_utils import (
+    EXECUTABLE_CACHE_NAME,
+    KNOWN_EXECUTABLES,
+    PYRIGHT_MESSAGE,
+    check_all_installed,
+    check_installed,
+    discover_executables,
+    executable_paths,
+)
 
-    check_installed(ctx, executable='test_exec', message='missing')
 
-    del _EXECUTABLE_CACHE['test_exec']
+def _make_executable(path):
+    path.write_text('#!/bin/sh\n')
+    path.chmod(0o755)
+    return path
+
+
+@pytest.fixture
+def search_path(tmp_path, monkeypatch):
+    """Isolate discovery to a temporary `PATH` and working directory.
+
+    Yields:
+        Path: the only directory on `PATH`
+
+    """
+    bin_dir = tmp_path / 'bin'
+    bin_dir.mkdir()
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv('PATH', str(bin_dir))
+    executable_paths.cache_clear()
+    yield bin_dir
+    executable_paths.cache_clear()
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='Uses POSIX file permissions')
+def test_discover_executables_first_match(tmp_path):
+    first, second = tmp_path / 'first', tmp_path / 'second'
+    first.mkdir()
+    second.mkdir()
+    (first / 'tool').write_text('not executable')
+    (first / 'other').mkdir()
+    expected = _make_executable(second / 'tool')
+    _make_executable(second / 'other')
+    _make_executable(tmp_path / 'tool')
+
+    result = discover_executables(['tool', 'other', 'missing'], [first, second, tmp_path, tmp_path / 'nope'])
+
+    assert result == {'tool': str(expected), 'other': str(second / 'other'), 'missing': None}
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='Uses POSIX file permissions')
+def test_executable_paths_persisted_and_invalidated(search_path):
+    tool = _make_executable(search_path / 'uv')
+
+    paths = executable_paths()
+
+    assert set(paths) == set(KNOWN_EXECUTABLES)
+    assert paths['uv'] == str(tool)
+    cache_path = search_path.parent / CACHE_DIR_NAME / EXECUTABLE_CACHE_NAME
+    cached = json.loads(cache_path.read_text())
+    assert cached['paths'] == paths
+    # A stale entry is reused while the key matches
+    cached['paths']['uv'] = 'cached'
+    cache_path.write_text(json.dumps(cached))
+    executable_paths.cache_clear()
+    assert executable_paths()['uv'] == 'cached'
+    # Removing the executable modifies the directory, which invalidates the cache
+    tool.unlink()
+    os.utime(search_path, ns=(0, 0))
+    executable_paths.cache_clear()
+    assert executable_paths()['uv'] is None
+
+
+@pytest.mark.usefixtures('search_path')
+def test_check_installed_missing(ctx):
+    with pytest.raises(RuntimeError, match='pyright'):
+        check_installed(ctx, executable='pyright')
+    with pytest.raises(RuntimeError, match='custom'):
+        check_installed(ctx, executable='not-a-real-exec', message='custom')
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='Uses POSIX file permissions')
+def test_check_installed_unknown_executable(ctx, search_path):
+    _make_executable(search_path / 'test_exec')
+
+    check_installed(ctx, executable='test_exec')
+
+
+@pytest.mark.usefixtures('search_path')
+def test_check_all_installed():
+    with pytest.raises(RuntimeError) as exc_info:
+        check_all_installed(['pyright', 'prek', 'pyright'])
+
+    message = str(exc_info.value)
+    assert message.count('`pyright` was not found') == 1
+    assert executable_utils.PRE_COMMIT_MESSAGE in message
+
+
+def test_executor_checks_requirements_before_running(monkeypatch):
+    ran = []
+    task: Task = Task(lambda _ctx: ran.append(True), name='needs_pyright')  # type: ignore[type-arg]
+    setattr(task, TASK_REQUIRES_ATTR, ('pyright',))
+    monkeypatch.setattr(executable_utils, 'find_executable', lambda _name, _base_dir=None: None)
+    config = Config()
+    config.gto = GlobalTaskOptions()
+    executor = CalcipyExecutor(Collection(), config=config)
+
+    with pytest.raises(Exit, match='pyright') as exc_info:
+        executor.check_requirements([Call(task)])
+
+    assert exc_info.value.message == PYRIGHT_MESSAGE
+    config.gto = GlobalTaskOptions(keep_going=True)
+    executor.check_requirements([Call(task)])
+    config.gto = GlobalTaskOptions()
+    config.run.dry = True
+    executor.check_requirements([Call(task)])
+    assert not ran
+
+
+@pytest.mark.usefixtures('search_path')
+def test_executable_paths_cache_in_base_dir(tmp_path):
+    project = tmp_path / 'project'
+    project.mkdir()
+
+    executable_paths(project)
+
+    assert (project / CACHE_DIR_NAME / EXECUTABLE_CACHE_NAME).is_file()
@@ -1,5 +1,5 @@
 from pathlib import Path
-from unittest.mock import call, patch
+from unittest.mock import patch
 
 import pytest
 
@@ -15,18 +15,9 @@ from calcipy.tasks.lint import PRE_COMMIT_HOOK_STAGES, check, fix, pre_commit, w
         (fix, {}, [f'{python_m()} ruff check "calcipy" ./tests --fix']),
         (fix, {'unsafe': True}, [f'{python_m()} ruff check "calcipy" ./tests --fix --unsafe-fixes']),
         (watch, {}, [f'{python_m()} ruff check "calcipy" ./tests --watch']),
-        (
-            pre_commit,
-            {},
-            [
-                call('which prek', warn=True, hide=True),
-                'prek install',
-                'prek autoupdate',
-                *[f'prek run --all-files --hook-stage {stg}' for stg in PRE_COMMIT_HOOK_STAGES],
-            ],
-        ),
     ],
 )
+@pytest.mark.usefixtures('installed_executables')
 def test_lint(ctx, task, kwargs, commands, assert_run_commands):
     task(ctx, **kwargs)
 
@@ -50,3 +41,17 @@ def test_lint_check_src_layout(ctx, tmp_path, monkeypatch):
         check(ctx)
 
     ctx.run.assert_called_once_with(f'{python_m()} ruff check "src/mypkg" ./tests')
+
+
+@pytest.mark.usefixtures('installed_executables')
+@pytest.mark.parametrize(
+    ('kwargs', 'setup'),
+    [
+        ({}, ['prek install', 'prek autoupdate']),
+        ({'no_update': True}, ['prek install']),
+    ],
+)
+def test_pre_commit(ctx, kwargs, setup, assert_run_commands):
+    pre_commit(ctx, **kwargs)
+
+    assert_run_commands(ctx, [*setup, *(f'prek run --all-files --hook-stage {stg}' for stg in PRE_COMMIT_HOOK_STAGES)])
@@ -12,6 +12,7 @@ from calcipy.tasks.pack import bump_tag, lock, sync_pyproject_versions
         (lock, {}, [call('uv lock')]),
     ],
 )
+@pytest.mark.usefixtures('installed_executables')
 def test_pack(ctx, task, kwargs, commands, monkeypatch, assert_run_commands):
     mock_can_skip = patch('calcipy.tasks.pack.can_skip.can_skip', return_value=False)
     mock_get_lock = patch('calcipy.tasks.pack.get_lock', return_value=Path('uv.lock'))
@@ -1,14 +1,24 @@
-from unittest.mock import call
+from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 
+from calcipy.duration_history import SHARD_DURATIONS_NAME, TestDuration, read_shard_durations, record_run
 from calcipy.tasks.executable_utils import python_dir, python_m
-from calcipy.tasks.test import check, coverage, watch
+from calcipy.tasks.test import affected, check, combine, coverage, redundant, shard_durations, slowest, watch
 from calcipy.tasks.test import pytest as task_pytest
 
 _COV = '--cov=calcipy --cov-branch --cov-report=term-missing --durations=25 --durations-min="0.1"'
+_COV += ' -p calcipy.pytest_duration_history'
 _MARKERS = 'mark1 and not mark 2'
-_FAILFIRST = '--failed-first --new-first --exitfirst -vv --no-cov'
+_FAILFIRST = '--failed-first --new-first --exitfirst -vv --no-cov -p calcipy.pytest_duration_history'
+_FAILFIRST += ' --calcipy-fastest-first'
+
+
+@pytest.fixture(autouse=True)
+def write_reports():
+    with patch('calcipy.tasks.test.coverage_report.write_reports', return_value=100.0) as mock_write:
+        yield mock_write
 
 
 @pytest.mark.parametrize(
@@ -27,9 +37,6 @@ _FAILFIRST = '--failed-first --new-first --exitfirst -vv --no-cov'
             {'out_dir': '.cover'},
             [
                 f'{python_m()} coverage run --branch --source=calcipy --module pytest ./tests',
-                call(f'{python_m()} coverage report --show-missing'),
-                call(f'{python_m()} coverage html --directory=.cover'),
-                call(f'{python_m()} coverage json'),
             ],
         ),
     ],
@@ -41,6 +48,7 @@ _FAILFIRST = '--failed-first --new-first --exitfirst -vv --no-cov'
         'coverage',
     ],
 )
+@pytest.mark.usefixtures('installed_executables')
 def test_test(ctx, task, kwargs, commands, assert_run_commands):
     task(ctx, **kwargs)
 
@@ -53,6 +61,188 @@ def test_test_with_min_cover(ctx):
     ctx.run.assert_called_once_with(f'{python_m()} pytest ./tests {_COV} --cov-fail-under=80')
 
 
+def test_test_shard(ctx):
+    task_pytest(ctx, shard='1/2', min_cover=80)
+
+    ctx.run.assert_called_once_with(
+        f'{python_m()} pytest ./tests {_COV} -p calcipy.pytest_shard --calcipy-shard=1/2',
+        env={'COVERAGE_FILE': '.coverage.shard-1-of-2'},
+    )
+
+
+def test_test_workers(ctx):
+    with patch('calcipy.tasks.test.importlib.util.find_spec', return_value=object()):
+        task_pytest(ctx, workers='auto', dist='loadfile')
+
+    ctx.run.assert_called_once_with(f'{python_m()} pytest ./tests {_COV} --numprocesses=auto --dist=loadfile')
+
+
+@pytest.mark.parametrize(
+    ('kwargs', 'match'),
+    [
+        ({'workers': 'many'}, 'a number of workers'),
+        ({'workers': '4', 'dist': 'worksteal'}, 'scheduling mode'),
+    ],
+)
+def test_test_workers_invalid(ctx, kwargs, match):
+    with pytest.raises(ValueError, match=match):
+        task_pytest(ctx, **kwargs)
+
+
+def test_test_workers_missing_xdist(ctx):
+    with (
+        patch('calcipy.tasks.test.importlib.util.find_spec', return_value=None),
+        pytest.raises(RuntimeError, match='pytest-xdist is required'),
+    ):
+        task_pytest(ctx, workers='2')
+
+    ctx.run.assert_not_called()
+
+
+def test_coverage_workers(ctx, write_reports):
+    with patch('calcipy.tasks.test.importlib.util.find_spec', return_value=object()):
+        coverage(ctx, out_dir='.cover', workers='4')
+
+    cov = '--cov=calcipy --cov-branch --cov-report='
+    ctx.run.assert_called_once_with(f'{python_m()} pytest ./tests {cov} --numprocesses=4 --dist=load')
+    write_reports.assert_called_once_with(Path('.cover'), min_cover=0)
+
+
+def test_coverage_dry_run(ctx, write_reports):
+    ctx.config.run.dry = True
+
+    coverage(ctx, out_dir='.cover')
+
+    write_reports.assert_not_called()
+
+
+def test_combine(ctx, write_reports):
+    combine(ctx, min_cover=80, out_dir='.cover')
+
+    ctx.run.assert_called_once_with(f'{python_m()} coverage combine')
+    write_reports.assert_called_once_with(Path('.cover'), min_cover=80)
+
+
 def test_test_check(ctx):
     with pytest.raises(RuntimeError, match=r'Duplicate test names.+test_intentional_duplicate.+'):
         check(ctx)
+
+
+@pytest.mark.parametrize(
+    ('selected', 'expected'),
+    [
+        (
+            ['tests/test_a.py', 'tests/sub/test_b.py'],
+            f'{python_m()} pytest tests/test_a.py tests/sub/test_b.py --no-cov',
+        ),
+        (None, f'{python_m()} pytest ./tests --no-cov'),
+    ],
+)
+def test_affected(ctx, selected, expected):
+    with (
+        patch('calcipy.tasks.test.import_graph.changed_files', return_value=['calcipy/a.py']) as mock_changed,
+        patch('calcipy.tasks.test.import_graph.affected_tests', return_value=selected),
+    ):
+        affected(ctx, since='v1.0.0')
+
+    assert mock_changed.call_args.args[1] == 'v1.0.0'
+    ctx.run.assert_called_once_with(expected)
+
+
+def test_affected_none(ctx):
+    with (
+        patch('calcipy.tasks.test.import_graph.changed_files', return_value=['README.md']),
+        patch('calcipy.tasks.test.import_graph.affected_tests', return_value=[]),
+    ):
+        affected(ctx)
+
+    ctx.run.assert_not_called()
+
+
+def test_affected_lines(ctx, tmp_path, monkeypatch):
+    monkeypatch.setattr('calcipy.tasks.test.get_project_path', lambda: tmp_path)
+    with pytest.raises(RuntimeError, match=r'test\.coverage --contexts'):
+        affected(ctx, lines=True)
+
+    (tmp_path / 'coverage-contexts.db').touch()
+    with (
+        patch('calcipy.tasks.test.coverage_contexts.recorded_commit', return_value='abc123'),
+        patch('calcipy.tasks.test.coverage_contexts.changed_lines', return_value={'a.py': {1}}) as mock_changed,
+        patch('calcipy.tasks.test.coverage_contexts.select_tests', return_value=['tests/test_a.py::test_a[x y]']),
+    ):
+        affected(ctx, lines=True)
+
+    assert mock_changed.call_args.args[1] == 'abc123'
+    ctx.run.assert_called_once_with(f"{python_m()} pytest 'tests/test_a.py::test_a[x y]' --no-cov")
+
+
+def test_coverage_contexts(ctx, tmp_path, monkeypatch):
+    monkeypatch.setattr('calcipy.tasks.test.get_project_path', lambda: tmp_path)
+    with patch('calcipy.tasks.test.coverage_contexts.update_database', return_value=3) as mock_update:
+        coverage(ctx, out_dir=str(tmp_path / '.cover'), contexts=True)
+
+    assert mock_update.call_args.args[0] == tmp_path / 'coverage-contexts.db'
+    assert mock_update.call_args.kwargs['prune']
+    plugin = '-p calcipy.pytest_coverage_context'
+    ctx.run.assert_any_call(f'{python_m()} coverage run --branch --source=calcipy --module pytest ./tests {plugin}')
+
+
+def test_redundant(ctx, tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'tests').mkdir()
+    (tmp_path / 'tests' / 'test_a.py').write_text('def test_a():\n    assert 1\n\n\ndef test_b():\n    assert 1\n')
+    record_run(
+        tmp_path / '.calcipy_cache' / 'test_durations.db',
+        [TestDuration(nodeid='tests/test_a.py::test_a', call=0.5)],
+        wall=0.5,
+    )
+
+    redundant(ctx)
+
+    output = capsys.readouterr().out
+    assert '| 1       | identical | tests/test_a.py::test_a | 0.000       |' in output
+    assert '|         |           | tests/test_a.py::test_b |             |' in output
+    assert (tmp_path / '.calcipy_cache' / 'test_fingerprints.json').is_file()
+
+
+def test_slowest(ctx, tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    db_path = tmp_path / '.calcipy_cache' / 'test_durations.db'
+    runs = (1.0, 1.0, 4.0)
+    for seconds in runs:
+        tests = [TestDuration(nodeid='test_a', call=seconds), TestDuration(nodeid='test_b', call=0.5)]
+        record_run(db_path, tests, wall=seconds + 0.5, commit_sha='0123456789abcdef')
+
+    slowest(ctx, limit=5)
+
+    output = capsys.readouterr().out
+    assert '| test_a | 1.000      |' in output
+    assert '| test_a | 4.000      | 1.000      | 4.0x  |' in output
+    assert output.count('| 01234567 | all   | 2     |') == len(runs)
+
+
+def test_slowest_empty(ctx, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    slowest(ctx)
+
+    assert not (tmp_path / '.calcipy_cache').exists()
+
+
+def test_shard_durations(ctx, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    db_path = tmp_path / '.calcipy_cache' / 'test_durations.db'
+    record_run(db_path, [TestDuration(nodeid='test_a', call=1.0)], wall=1.0)
+    record_run(db_path, [TestDuration(nodeid='test_b', call=1.0)], wall=1.0, shard='1/2')
+
+    shard_durations(ctx)
+
+    assert read_shard_durations(tmp_path / SHARD_DURATIONS_NAME) == {'test_a': 1.0}
+
+
+def test_shard_durations_empty(ctx, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    shard_durations(ctx)
+
+    assert not (tmp_path / SHARD_DURATIONS_NAME).exists()
@@ -1,5 +1,3 @@
-from unittest.mock import call
-
 import pytest
 
 from calcipy.tasks.executable_utils import python_m
@@ -9,18 +7,12 @@ from calcipy.tasks.types import mypy, pyright, ty
 @pytest.mark.parametrize(
     ('task', 'kwargs', 'commands'),
     [
-        (
-            pyright,
-            {},
-            [
-                call('which pyright', warn=True, hide=True),
-                'pyright',
-            ],
-        ),
+        (pyright, {}, ['pyright']),
         (mypy, {}, [f'{python_m()} mypy']),
         (ty, {}, ['ty check calcipy tests']),
     ],
 )
+@pytest.mark.usefixtures('installed_executables')
 def test_types(ctx, task, kwargs, commands, assert_run_commands):
     task(ctx, **kwargs)
 
@@ -1,4 +1,9 @@
-from calcipy.cli import task
+from pathlib import Path
+
+import pytest
+from invoke.exceptions import ParseError
+
+from calcipy.cli import parse_global_options, task
 
 
 def test_task_decorator_without_parens():
@@ -8,3 +13,19 @@ def test_task_decorator_without_parens():
 
     assert callable(my_task)
     assert my_task.__wrapped__.__name__ == 'my_task'  # type: ignore[attr-defined]  # ty: ignore[unresolved-attribute]
+
+
+def test_parse_global_options():
+    gto, remaining = parse_global_options(
+        ['-vv', '--jobs=3', '--no-cache', 'lint.check', '--working-dir', '.', '-j', '2']
+    )
+
+    assert (gto.verbose, gto.jobs, gto.no_cache) == (2, 2, True)
+    assert gto.working_dir == Path.cwd()
+    assert remaining == ['lint.check']
+
+
+@pytest.mark.parametrize('value', ['0', '-1', 'many'])
+def test_parse_global_options_invalid_jobs(value):
+    with pytest.raises(ParseError, match=r"Invalid value for --jobs: .+ Use 'auto' or a positive integer"):
+        parse_global_options(['-j', value])
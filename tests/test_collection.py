@@ -1,8 +1,135 @@
+import threading
+
 import pytest
+from invoke.config import Config
+from invoke.context import Context
 
-from calcipy.collection import GlobalTaskOptions
+from calcipy.cli import task
+from calcipy.collection import CalcipyExecutor, Collection, GlobalTaskOptions, run_task_graph
 
 
 def test_global_task_options_invalid_verbose():
     with pytest.raises(ValueError, match='verbose must be one of'):
         GlobalTaskOptions(verbose=99)
+
+
+def test_global_task_options_invalid_jobs():
+    with pytest.raises(ValueError, match='jobs must be a positive integer'):
+        GlobalTaskOptions(jobs=0)
+
+
+def test_run_task_graph_respects_dependencies():
+    order = []
+
+    def _run_node(node: str) -> str:
+        order.append(node)
+        return node.upper()
+
+    results = run_task_graph(['a', 'b', 'c'], {0: {2}, 1: {0}}, _run_node, jobs=3)
+
+    assert order == ['c', 'a', 'b']
+    assert results == ['A', 'B', 'C']
+
+
+def test_run_task_graph_runs_independent_nodes_concurrently():
+    barrier = threading.Barrier(2, timeout=5)
+
+    run_task_graph(['a', 'b'], {}, lambda _node: barrier.wait(), jobs=2)
+
+
+def test_run_task_graph_circular():
+    with pytest.raises(ValueError, match='Circular task ordering'):
+        run_task_graph(['a', 'b'], {0: {1}, 1: {0}}, lambda node: node, jobs=2)
+
+
+def test_run_task_graph_stops_after_failure():
+    started = []
+
+    def _run_node(node: str) -> None:
+        started.append(node)
+        if node == 'a':
+            raise RuntimeError(node)
+
+    with pytest.raises(RuntimeError, match='a'):
+        run_task_graph(['a', 'b'], {1: {0}}, _run_node, jobs=2)
+
+    assert started == ['a']
+
+
+def _make_executor(*tasks, jobs: int = 2, capture_output: bool = False) -> CalcipyExecutor:
+    collection = Collection()
+    for task_ in tasks:
+        collection.add_task(task_)
+    config = Config()
+    config.gto = GlobalTaskOptions(jobs=jobs, capture_output=capture_output)
+    return CalcipyExecutor(collection, config=config)
+
+
+_CALLED: list[str] = []
+
+
+@task()
+def alpha(_ctx: Context) -> None:
+    """Alpha."""
+    _CALLED.append('alpha')
+
+
+@task(after=[alpha])
+def beta(_ctx: Context) -> None:
+    """Beta."""
+    _CALLED.append('beta')
+
+
+@task(pre=[beta])
+def gamma(_ctx: Context) -> None:
+    """Gamma."""
+    _CALLED.append('gamma')
+
+
+def test_calcipy_executor_expand_graph():
+    executor = _make_executor(alpha, beta, gamma)
+
+    calls, dependencies = executor.expand_graph(executor.normalize(('gamma', 'alpha')))
+
+    assert [call.task.name for call in calls] == ['beta', 'gamma', 'alpha']
+    assert dependencies == {0: {2}, 1: {0}, 2: set()}
+
+
+def test_calcipy_executor_execute():
+    _CALLED.clear()
+    executor = _make_executor(alpha, beta)
+
+    executor.execute('beta', 'alpha')
+
+    assert _CALLED == ['alpha', 'beta']
+
+
+@task(barrier=True)
+def announce(_ctx: Context, *, message: str) -> None:
+    """Announce."""
+    _CALLED.append(message)
+
+
+@task(post=[announce.with_kwargs(message='first'), alpha, announce.with_kwargs(message='second'), beta])
+def pipeline(_ctx: Context) -> None:
+    """Pipeline."""
+
+
+def test_calcipy_executor_expand_graph_barriers():
+    executor = _make_executor(pipeline, alpha, beta, announce)
+
+    calls, dependencies = executor.expand_graph(executor.normalize(('pipeline',)))
+
+    assert [call.task.name for call in calls][::2] == ['pipeline', 'alpha', 'beta']
+    assert dependencies == {0: set(), 1: {0}, 2: {0, 1}, 3: {0, 1}, 4: {0, 1, 2, 3}}
+
+
+def test_calcipy_executor_runs_serially_when_capturing(monkeypatch):
+    executor = _make_executor(alpha, beta, jobs=4, capture_output=True)
+    monkeypatch.setattr('calcipy.collection.run_task_graph', _fail_if_called)
+
+    executor.execute('alpha')
+
+
+def _fail_if_called(*_args, **_kwargs):
+    raise AssertionError('Expected the tasks to run serially')
@@ -0,0 +1,107 @@
+import sqlite3
+from contextlib import closing
+
+from coverage import CoverageData
+
+from calcipy.coverage_contexts import parse_diff, recorded_commit, select_tests, update_database
+
+_DIFF = """\
+diff --git pkg/core.py pkg/core.py
+index 1111111..2222222 100644
+--- pkg/core.py
++++ pkg/core.py
+@@ -3 +3 @@ def add(a, b):
+-    return a + b
++    return b + a
+@@ -10,0 +11,2 @@ def sub(a, b):
++--- not a header
++    pass
+diff --git pkg/new.py pkg/new.py
+new file mode 100644
+--- /dev/null
++++ pkg/new.py
+@@ -0,0 +1 @@
++VALUE = 1
+diff --git pkg/old.py pkg/old.py
+deleted file mode 100644
+--- pkg/old.py
++++ /dev/null
+@@ -1,2 +0,0 @@
+-A = 1
+-B = 2
+"""
+
+
+def test_parse_diff():
+    assert parse_diff(_DIFF.splitlines()) == {
+        'pkg/core.py': {3, 10, 11},
+        'pkg/new.py': set(),
+        'pkg/old.py': {1, 2},
+    }
+
+
+def _write(base_dir, rel_path, text=''):
+    path = base_dir / rel_path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    return path
+
+
+def _record(data_file, lines_by_context):
+    data = CoverageData(basename=str(data_file))
+    for context, lines in lines_by_context.items():
+        data.set_context(context)
+        data.add_lines({str(path): linenos for path, linenos in lines.items()})
+    data.write()
+
+
+def test_update_and_select(tmp_path):
+    core = _write(tmp_path, 'pkg/core.py', 'def add(a, b):\n    return a + b\n\ndef sub(a, b):\n    return a - b\n')
+    _write(tmp_path, 'pkg/__init__.py')
+    _write(tmp_path, 'tests/test_add.py', 'from pkg.core import add\n')
+    _write(tmp_path, 'tests/test_sub.py', 'from pkg.core import sub\n')
+    db_path = tmp_path / 'contexts.db'
+    data_file = tmp_path / '.coverage'
+    _record(data_file, {'': {core: [1, 4]}, 'tests/test_add.py::test_add': {core: [2]}})
+
+    assert update_database(db_path, base_dir=tmp_path, data_file=data_file) == 1
+    assert recorded_commit(db_path) is None
+    # A later run only replaces the tests that ran
+    _record(data_file, {'tests/test_sub.py::test_sub[1-2]': {core: [5]}})
+    assert update_database(db_path, base_dir=tmp_path, data_file=data_file) == 1
+
+    def _select(changes):
+        return select_tests(tmp_path, db_path, changes, cache_dir=tmp_path / '.cache')
+
+    assert _select({'pkg/core.py': {2}}) == ['tests/test_add.py::test_add']
+    assert _select({'pkg/core.py': {2, 5}}) == ['tests/test_add.py::test_add', 'tests/test_sub.py::test_sub[1-2]']
+    assert _select({'pkg/core.py': {3}}) == []
+    # Import-time lines and files without coverage fall back to the import graph
+    assert _select({'pkg/core.py': {4}}) == ['tests/test_add.py', 'tests/test_sub.py']
+    assert _select({'pkg/core.py': {2}, 'tests/test_add.py': set()}) == ['tests/test_add.py']
+    assert _select({'pyproject.toml': set()}) is None
+
+
+def test_update_database_prune(tmp_path):
+    core = _write(tmp_path, 'pkg/core.py', 'def add(a, b):\n    return a + b\n\ndef sub(a, b):\n    return a - b\n')
+    old = _write(tmp_path, 'pkg/old.py', 'A = 1\n')
+    _write(tmp_path, 'pkg/__init__.py')
+    _write(tmp_path, 'tests/test_core.py', 'import pkg.old\n')
+    db_path = tmp_path / 'contexts.db'
+    data_file = tmp_path / '.coverage'
+    _record(data_file, {'tests/test_core.py::test_add': {core: [2]}, 'tests/test_core.py::test_old': {old: [1]}})
+    update_database(db_path, base_dir=tmp_path, data_file=data_file)
+    # The full suite ran after renaming 'test_add' and deleting 'test_old'
+    data_file.unlink()
+    _record(data_file, {'tests/test_core.py::test_addition': {core: [2]}})
+
+    assert update_database(db_path, base_dir=tmp_path, data_file=data_file, prune=True) == 1
+
+    def _select(changes):
+        return select_tests(tmp_path, db_path, changes, cache_dir=tmp_path / '.cache')
+
+    assert _select({'pkg/core.py': {2}}) == ['tests/test_core.py::test_addition']
+    # Files that are no longer covered fall back to the import graph instead of selecting nothing
+    assert _select({'pkg/old.py': {1}}) == ['tests/test_core.py']
+    with closing(sqlite3.connect(db_path)) as conn:
+        assert conn.execute('SELECT path FROM files').fetchall() == [('pkg/core.py',)]
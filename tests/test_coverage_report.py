@@ -0,0 +1,88 @@
+import json
+import subprocess  # noqa: S404
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from calcipy.coverage_report import write_html, write_reports
+
+
+@pytest.fixture
+def coverage_data(tmp_path, monkeypatch):
+    (tmp_path / 'sample.py').write_text(
+        'def covered():\n    return 1\n\n\ndef missed():\n    return 2\n\n\ncovered()\n'
+    )
+    subprocess.run(  # noqa: S603
+        [sys.executable, '-m', 'coverage', 'run', '--data-file=.coverage', 'sample.py'], cwd=tmp_path, check=True
+    )
+    monkeypatch.chdir(tmp_path)
+    return tmp_path / '.coverage'
+
+
+def test_write_reports(coverage_data, capsys):
+    out_dir = coverage_data.parent / '.cover'
+
+    with patch('coverage.control.analysis_from_file_reporter', wraps=_analysis_from_file_reporter) as mock_analyze:
+        total = write_reports(out_dir, data_file=coverage_data)
+
+    assert total == pytest.approx(80.0)
+    assert mock_analyze.call_count == 1
+    assert 'sample.py' in capsys.readouterr().out
+    assert (out_dir / 'index.html').is_file()
+    report = json.loads((coverage_data.parent / 'coverage.json').read_text())
+    assert report['files']['sample.py']['missing_lines'] == [6]
+
+
+def test_write_reports_fail_under_from_config(coverage_data):
+    (coverage_data.parent / '.coveragerc').write_text('[report]\nfail_under = 90\n', encoding='utf-8')
+
+    with pytest.raises(RuntimeError, match='total of 80 is less than fail-under=90'):
+        write_reports(coverage_data.parent / '.cover', data_file=coverage_data)
+
+
+def test_write_reports_unknown_coverage_version(coverage_data, monkeypatch):
+    monkeypatch.setattr('coverage.version_info', (6, 5, 0, 'final', 0))
+
+    with patch('coverage.control.analysis_from_file_reporter', wraps=_analysis_from_file_reporter) as mock_analyze:
+        total = write_reports(coverage_data.parent / '.cover', data_file=coverage_data)
+
+    assert total == pytest.approx(80.0)
+    assert mock_analyze.call_count > 1
+
+
+def test_write_reports_fail_under(coverage_data):
+    with pytest.raises(RuntimeError, match='total of 80 is less than fail-under=90'):
+        write_reports(coverage_data.parent / '.cover', min_cover=90, data_file=coverage_data)
+
+    assert (coverage_data.parent / 'coverage.json').is_file()
+
+
+def test_write_html(coverage_data):
+    from coverage import Coverage  # noqa: PLC0415
+
+    out_dir = coverage_data.parent / '.cover'
+    cov = Coverage(data_file=coverage_data)
+    cov.load()
+
+    first = write_html(cov, out_dir)
+    page = out_dir / 'sample_py.html'
+    mtime = page.stat().st_mtime_ns
+    (out_dir / 'deleted_py.html').write_text('stale')
+    (out_dir / 'notes.txt').write_text('not generated')
+    second = write_html(cov, out_dir)
+
+    assert first.written > 1
+    assert first.unchanged == first.removed == 0
+    assert second.written <= 1  # Only the timestamp in index.html can change
+    assert second.written + second.unchanged == first.written
+    assert second.removed == 1
+    assert page.stat().st_mtime_ns == mtime
+    assert not (out_dir / 'deleted_py.html').exists()
+    assert (out_dir / 'notes.txt').is_file()
+
+
+def _analysis_from_file_reporter(*args, **kwargs):
+    from coverage.results import analysis_from_file_reporter  # noqa: PLC0415
+
+    return analysis_from_file_reporter(*args, **kwargs)
@@ -0,0 +1,108 @@
+import os
+import socket
+import stat
+import subprocess  # noqa: S404
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pytest
+
+from calcipy import __version__
+from calcipy.daemon import _exit_code
+from calcipy.daemon_client import (
+    SOCKET_ENV_VAR,
+    connect,
+    current_uid,
+    ensure_private_dir,
+    is_supported,
+    peer_uid,
+    socket_path,
+)
+
+_skip_no_unix = pytest.mark.skipif(not hasattr(socket, 'AF_UNIX'), reason='Requires Unix sockets')
+
+
+def test_socket_path(monkeypatch, tmp_path):
+    monkeypatch.delenv(SOCKET_ENV_VAR, raising=False)
+    monkeypatch.delenv('XDG_RUNTIME_DIR', raising=False)
+    assert socket_path().name.startswith('calcipy-')
+    assert socket_path().parent.name == f'calcipy-{current_uid()}'
+
+    monkeypatch.setenv('XDG_RUNTIME_DIR', str(tmp_path))
+    assert socket_path().parent == tmp_path
+
+    monkeypatch.setenv(SOCKET_ENV_VAR, '/tmp/other.sock')  # noqa: S108
+    assert socket_path() == Path('/tmp/other.sock')  # noqa: S108
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='Uses POSIX file permissions')
+def test_ensure_private_dir(tmp_path):
+    private = tmp_path / 'private'
+    ensure_private_dir(private)
+    assert stat.S_IMODE(private.stat().st_mode) == stat.S_IRWXU
+
+    private.chmod(0o755)
+    with pytest.raises(PermissionError, match='other users can access it'):
+        ensure_private_dir(private)
+
+
+@_skip_no_unix
+def test_peer_uid():
+    left, right = socket.socketpair(socket.AF_UNIX)
+    with left, right:
+        assert peer_uid(left) in {None, current_uid()}
+
+
+@_skip_no_unix
+def test_connect_ignores_non_socket(tmp_path, capsys):
+    path = tmp_path / 'fake.sock'
+    path.write_text('')
+
+    assert connect(path) is None
+    assert 'not a socket owned by the current user' in capsys.readouterr().err
+
+
+@pytest.mark.parametrize(
+    ('code', 'expected'),
+    [
+        (None, 0),
+        (0, 0),
+        (2, 2),
+        ('error message', 1),
+    ],
+)
+def test_exit_code(code, expected):
+    assert _exit_code(SystemExit(code)) == expected
+
+
+@pytest.mark.skipif(not (is_supported() and hasattr(os, 'fork')), reason='Requires Unix sockets and fork')
+def test_daemon_round_trip():
+    path = Path(tempfile.gettempdir()) / f'calcipy-test-{os.getpid()}.sock'
+    env = {**os.environ, SOCKET_ENV_VAR: str(path)}
+    start = 'import sys; sys.argv = ["calcipy", *sys.argv[1:]]; from {} import {}; {}()'
+    daemon = subprocess.Popen(  # noqa: S603
+        [sys.executable, '-c', start.format('calcipy.scripts', 'start', 'start'), '--daemon'],
+        env=env,
+    )
+    try:
+        for _ in range(100):
+            if (client := connect(path)) is not None:
+                client.close()
+                break
+            time.sleep(0.1)
+
+        client_cmd = [sys.executable, '-c', start.format('calcipy.daemon_client', 'main', 'main')]
+        result = subprocess.run([*client_cmd, '--version'], capture_output=True, text=True, env=env, check=False)  # noqa: S603
+        assert (result.returncode, result.stdout) == (0, f'calcipy {__version__}\n')
+
+        result = subprocess.run([*client_cmd, 'unknown-task'], capture_output=True, text=True, env=env, check=False)  # noqa: S603
+        assert result.returncode == 1
+        assert "No idea what 'unknown-task' is!" in result.stderr
+
+        subprocess.run([*client_cmd, '--stop'], env=env, check=True)  # noqa: S603
+        assert daemon.wait(timeout=10) == 0
+        assert not path.exists()
+    finally:
+        daemon.kill()
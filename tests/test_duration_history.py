@@ -0,0 +1,64 @@
+import pytest
+
+from calcipy import duration_history
+from calcipy.duration_history import TestDuration, median_durations, recent_runs, record_run, regressions
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return tmp_path / 'history.db'
+
+
+def _record(db_path, durations, **kwargs):
+    tests = [TestDuration(nodeid=nodeid, call=call) for nodeid, call in durations.items()]
+    return record_run(db_path, tests, wall=sum(durations.values()), **kwargs)
+
+
+def test_median_durations(db_path):
+    for call in (1.0, 3.0, 2.0, 9.0):
+        _record(db_path, {'test_a': call, 'test_b': 0.5}, python='3.12')
+    _record(db_path, {'test_a': 100.0}, python='3.12', shard='1/2')
+    _record(db_path, {'test_a': 50.0}, python='3.13')
+    record_run(db_path, [TestDuration(nodeid='test_b', setup=1.0, call=80.0, outcome='failed')], wall=1.0)
+
+    assert median_durations(db_path, window=3, python='3.12') == {'test_a': 9.0, 'test_b': 0.5}
+    assert median_durations(db_path, window=3, python='3.12', include_shards=False) == {'test_a': 3.0, 'test_b': 0.5}
+    assert median_durations(db_path, window=1) == {'test_a': 50.0, 'test_b': 0.5}
+    assert median_durations(db_path.with_name('missing.db')) == {}
+
+
+def test_regressions(db_path):
+    for call in (1.0, 1.2, 0.8):
+        _record(db_path, {'test_a': call, 'test_b': 2.0, 'test_c': 0.01})
+    _record(db_path, {'test_a': 3.0, 'test_b': 1.0, 'test_c': 0.04, 'test_new': 5.0})
+
+    found = regressions(db_path)
+
+    assert [(reg.nodeid, reg.latest, reg.median) for reg in found] == [('test_a', 3.0, 1.0)]
+    assert found[0].ratio == pytest.approx(3.0)
+    assert regressions(db_path.with_name('missing.db')) == []
+
+
+def test_recent_runs(db_path, monkeypatch):
+    monkeypatch.setattr(duration_history, 'MAX_RUNS', 3)
+    for idx in range(5):
+        _record(db_path, {f'test_{idx}': float(idx), 'test_x': 1.0}, commit_sha=f'sha{idx}', python='3.12')
+
+    runs = recent_runs(db_path, limit=2)
+
+    assert [(run.commit_sha, run.tests, run.wall) for run in runs] == [('sha3', 2, 4.0), ('sha4', 2, 5.0)]
+    assert [run.commit_sha for run in recent_runs(db_path)] == ['sha2', 'sha3', 'sha4']
+    assert median_durations(db_path, window=10)['test_x'] == 1.0
+    assert 'test_0' not in median_durations(db_path)
+    assert recent_runs(db_path, python='2.7') == []
+
+
+def test_read_write_shard_durations(tmp_path):
+    path = tmp_path / duration_history.SHARD_DURATIONS_NAME
+
+    assert duration_history.read_shard_durations(path) == {}
+    duration_history.write_shard_durations(path, {'b': 2.00049, 'a': 1.0})
+    assert path.read_text() == '{\n "a": 1.0,\n "b": 2.0\n}\n'
+    assert duration_history.read_shard_durations(path) == {'a': 1.0, 'b': 2.0}
+    path.write_text('[')
+    assert duration_history.read_shard_durations(path) == {}
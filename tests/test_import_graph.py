@@ -0,0 +1,134 @@
+import subprocess  # noqa: S404
+
+import pytest
+
+from calcipy.import_graph import (
+    GRAPH_CACHE_NAME,
+    ImportGraph,
+    affected_tests,
+    changed_files,
+    module_name,
+    parse_imports,
+)
+
+
+@pytest.mark.parametrize(
+    ('rel_path', 'expected'),
+    [
+        ('calcipy/tasks/lint.py', 'calcipy.tasks.lint'),
+        ('calcipy/__init__.py', 'calcipy'),
+        ('src/pkg/mod.py', 'pkg.mod'),
+        ('tests/conftest.py', 'tests.conftest'),
+        ('noxfile.py', 'noxfile'),
+    ],
+)
+def test_module_name(rel_path, expected):
+    assert module_name(rel_path) == expected
+
+
+def test_parse_imports():
+    source = """
+import os, pkg.sub
+from . import sibling
+from ..other import name
+from .mod import *
+def func():
+    from pkg import lazy
+"""
+
+    result = parse_imports(source, 'pkg.child.module', is_package=False)
+
+    assert result == [
+        'os',
+        'pkg',
+        'pkg.child',
+        'pkg.child.mod',
+        'pkg.child.sibling',
+        'pkg.lazy',
+        'pkg.other',
+        'pkg.other.name',
+        'pkg.sub',
+    ]
+    assert parse_imports('from . import sibling', 'pkg', is_package=True) == ['pkg', 'pkg.sibling']
+
+
+def test_import_graph_dependents():
+    graph = ImportGraph.from_entries(
+        {
+            'pkg/__init__.py': [],
+            'pkg/core.py': [],
+            'pkg/api.py': ['pkg.core'],
+            'pkg/removed_user.py': ['pkg.removed'],
+            'tests/conftest.py': ['pkg.api'],
+            'tests/test_core.py': ['pkg.core'],
+            'tests/test_other.py': ['os'],
+            'tests/sub/test_sub.py': [],
+        }
+    )
+
+    assert graph.dependents(['pkg.core']) == {
+        'pkg.core',
+        'pkg.api',
+        'tests.conftest',
+        'tests.test_core',
+        'tests.test_other',
+        'tests.sub.test_sub',
+    }
+    assert graph.dependents(['tests.test_core']) == {'tests.test_core'}
+    # Any change to the package __init__ affects every submodule
+    assert 'pkg.removed_user' in graph.dependents(['pkg'])
+    assert graph.dependents(['pkg.removed']) == {'pkg.removed', 'pkg.removed_user'}
+
+
+def _write(base_dir, rel_path, text=''):
+    path = base_dir / rel_path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+
+
+@pytest.fixture
+def project(tmp_path):
+    _write(tmp_path, 'pkg/__init__.py')
+    _write(tmp_path, 'pkg/core.py')
+    _write(tmp_path, 'pkg/cli.py', 'from .core import run\n')
+    _write(tmp_path, 'tests/__init__.py')
+    _write(tmp_path, 'tests/test_core.py', 'from pkg import core\n')
+    _write(tmp_path, 'tests/test_cli.py', 'from pkg.cli import main\n')
+    _write(tmp_path, 'tests/helpers.py', 'import pkg.cli\n')
+    return tmp_path
+
+
+def test_affected_tests(project):
+    cache_dir = project / '.cache'
+
+    assert affected_tests(project, ['pkg/cli.py'], cache_dir=cache_dir) == ['tests/test_cli.py']
+    assert affected_tests(project, ['pkg/core.py', 'README.md'], cache_dir=cache_dir) == [
+        'tests/test_cli.py',
+        'tests/test_core.py',
+    ]
+    assert affected_tests(project, ['docs/index.md'], cache_dir=cache_dir) == []
+    assert affected_tests(project, ['pyproject.toml'], cache_dir=cache_dir) is None
+    assert affected_tests(project, ['tests/data/sample.json'], cache_dir=cache_dir) is None
+    assert affected_tests(project, ['pkg/templates/base.jinja'], cache_dir=cache_dir) is None
+    assert affected_tests(project, ['pkg/cli.py', 'run'], cache_dir=cache_dir) is None
+    assert (cache_dir / GRAPH_CACHE_NAME).is_file()
+
+    # Only the modified file is parsed again
+    _write(project, 'tests/test_cli.py', 'import os\n')
+    assert affected_tests(project, ['pkg/cli.py'], cache_dir=cache_dir) == []
+
+
+def test_changed_files(project):
+    def _git(*args):
+        subprocess.run(['git', *args], cwd=project, check=True, capture_output=True)  # noqa: S603, S607
+
+    _git('init', '--initial-branch=main')
+    _git('add', '.')
+    _git('-c', 'user.name=test', '-c', 'user.email=test@example.com', 'commit', '-m', 'initial')
+    _git('checkout', '-b', 'feature')
+    _write(project, 'pkg/core.py', 'VALUE = 1\n')
+    _write(project, 'pkg/new.py')
+
+    assert changed_files(project, 'main') == ['pkg/core.py', 'pkg/new.py']
+    with pytest.raises(RuntimeError, match='merge-base'):
+        changed_files(project, 'not-a-ref')
@@ -1,5 +1,4 @@
-
-from calcipy.invoke_helpers import get_doc_subdir
+from calcipy.invoke_helpers import get_doc_subdir, record_results, run
 
 
 def test_get_doc_subdir_no_copier_answers(tmp_path):
@@ -24,3 +23,11 @@ def test_get_doc_subdir_copier_at_repo_root(tmp_path):
     result = get_doc_subdir(sub_dir)
 
     assert result == sub_dir / 'documentation' / 'docs'
+
+
+def test_record_results(ctx):
+    with record_results() as results:
+        run(ctx, 'echo recorded')
+    run(ctx, 'echo not recorded')
+
+    assert len(results) == 1
@@ -0,0 +1,31 @@
+from contextlib import redirect_stdout
+
+from calcipy.output_capture import SpillingCapture
+
+
+def test_spilling_capture():
+    assert SpillingCapture().path is None
+    capture = SpillingCapture(tail_chars=10)
+
+    with redirect_stdout(capture):
+        print('0123456xyz')  # noqa: T201
+        print('abcdef')  # noqa: T201
+
+    assert capture.tail() == 'yz\nabcdef\n'
+    path = capture.path
+    assert path
+    capture.close(keep=True)
+    assert path.read_text() == '0123456xyz\nabcdef\n'
+    path.unlink()
+
+
+def test_spilling_capture_deletes_log():
+    capture = SpillingCapture()
+    capture.write('output')
+    path = capture.path
+
+    capture.close()
+
+    assert path
+    assert not path.is_file()
+    assert capture.closed
@@ -0,0 +1,39 @@
+import os
+import subprocess  # noqa: S404
+import sys
+from pathlib import Path
+
+from calcipy.duration_history import TestDuration, median_durations, recent_runs, record_run
+
+
+def _run(tmp_path, *args):
+    cmd = [sys.executable, '-m', 'pytest', '-p', 'calcipy.pytest_duration_history', '-p', 'no:randomly', '-v', *args]
+    env = {**os.environ, 'PYTHONPATH': str(Path(__file__).parents[1])}
+    return subprocess.run(cmd, cwd=tmp_path, env=env, capture_output=True, text=True, check=False)  # noqa: S603
+
+
+def test_duration_history_plugin(tmp_path):
+    (tmp_path / 'test_sample.py').write_text(
+        'import time\n\ndef test_slow():\n    time.sleep(0.2)\n\ndef test_fast():\n    pass\n\n'
+        'def test_fail():\n    assert False\n',
+    )
+    history = tmp_path / '.calcipy_cache' / 'test_durations.db'
+
+    _run(tmp_path)
+
+    medians = median_durations(history)
+    assert set(medians) == {'test_sample.py::test_slow', 'test_sample.py::test_fast'}
+    assert medians['test_sample.py::test_slow'] > medians['test_sample.py::test_fast']
+    assert [run.tests for run in recent_runs(history)] == [3]
+
+    record_run(history, [TestDuration(nodeid='test_sample.py::test_fail', call=1.0)], wall=1.0)
+    (tmp_path / 'test_new.py').write_text('def test_new():\n    pass\n')
+    result = _run(tmp_path, '--calcipy-fastest-first')
+
+    order = [line.split(' ', 1)[0] for line in result.stdout.splitlines() if line.startswith('test_') and '::' in line]
+    assert order == [
+        'test_new.py::test_new',
+        'test_sample.py::test_fast',
+        'test_sample.py::test_slow',
+        'test_sample.py::test_fail',
+    ]
@@ -0,0 +1,62 @@
+import os
+import subprocess  # noqa: S404
+import sys
+from pathlib import Path
+
+import pytest
+
+from calcipy.duration_history import SHARD_DURATIONS_NAME, TestDuration, record_run, write_shard_durations
+from calcipy.pytest_shard import parse_shard, partition
+
+
+@pytest.mark.parametrize(('value', 'expected'), [('1/4', (1, 4)), ('3/3', (3, 3))])
+def test_parse_shard(value, expected):
+    assert parse_shard(value) == expected
+
+
+@pytest.mark.parametrize('value', ['0/2', '3/2', '1', 'a/b', '-1/2'])
+def test_parse_shard_invalid(value):
+    with pytest.raises(ValueError, match='Expected the shard'):
+        parse_shard(value)
+
+
+def test_partition():
+    durations = {'a': 5.0, 'b': 4.0, 'c': 3.0, 'd': 3.0, 'e': 1.0}
+    nodeids = ['e', 'd', 'c', 'b', 'a', 'x', 'y']
+
+    shards = partition(nodeids, durations, 2)
+
+    # Tests without a duration are spread round-robin starting from the shard with the fewest tests
+    assert shards == [['a', 'd', 'x'], ['b', 'c', 'e', 'y']]
+    assert partition(list(reversed(nodeids)), durations, 2) == shards
+    assert partition(nodeids, {}, 3) == [['a', 'd', 'y'], ['b', 'e'], ['c', 'x']]
+
+
+def test_shard_plugin(tmp_path):
+    (tmp_path / 'test_sample.py').write_text(
+        '\n'.join(f'def test_{idx}():\n    pass\n' for idx in range(5)),
+    )
+    history = tmp_path / 'history.db'
+
+    def _run(*args):
+        cmd = [sys.executable, '-m', 'pytest', '-p', 'calcipy.pytest_duration_history', '-p', 'calcipy.pytest_shard']
+        cmd.extend(['-p', 'no:randomly', '-q', f'--calcipy-history={history}', *args])
+        env = {**os.environ, 'PYTHONPATH': str(Path(__file__).parents[1])}
+        return subprocess.run(cmd, cwd=tmp_path, env=env, capture_output=True, text=True, check=False)  # noqa: S603
+
+    assert '5 passed' in _run().stdout
+    record_run(history, [TestDuration(nodeid='test_sample.py::test_0', call=10.0)], wall=10.0)
+
+    # Without the committed durations, the local history is ignored and the tests are split by count
+    assert '3 passed, 2 deselected' in _run('--calcipy-shard=1/2').stdout
+    assert '2 passed, 3 deselected' in _run('--calcipy-shard=2/2').stdout
+
+    durations = {f'test_sample.py::test_{idx}': 0.1 for idx in range(1, 5)}
+    write_shard_durations(tmp_path / SHARD_DURATIONS_NAME, {**durations, 'test_sample.py::test_0': 10.0})
+    assert '1 passed, 4 deselected' in _run('--calcipy-shard=1/2').stdout
+    assert '4 passed, 1 deselected' in _run('--calcipy-shard=2/2').stdout
+
+    other = tmp_path / 'other.json'
+    write_shard_durations(other, {'test_sample.py::test_4': 10.0})
+    assert '3 passed, 2 deselected' in _run('--calcipy-shard=1/2', f'--calcipy-shard-durations={other}').stdout
+    assert 'Expected the shard' in _run('--calcipy-shard=3/2').stderr
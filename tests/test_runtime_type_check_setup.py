@@ -0,0 +1,46 @@
+import json
+
+import pytest
+
+from calcipy._runtime_type_check_setup import runtime_type_checking_scope
+
+
+def test_runtime_type_checking_scope(tmp_path, monkeypatch):
+    config_path = tmp_path / '.calcipy.json'
+    monkeypatch.delenv('RUNTIME_TYPE_CHECKING_INCLUDE', raising=False)
+    monkeypatch.delenv('RUNTIME_TYPE_CHECKING_EXCLUDE', raising=False)
+
+    assert runtime_type_checking_scope(config_path) == (['calcipy'], [])
+
+    config_path.write_text(json.dumps({'runtime_type_checking': {'exclude': ['calcipy.md_writer']}}))
+    assert runtime_type_checking_scope(config_path) == (['calcipy'], ['calcipy.md_writer'])
+
+    monkeypatch.setenv('RUNTIME_TYPE_CHECKING_INCLUDE', 'calcipy.tasks, calcipy.cli')
+    monkeypatch.setenv('RUNTIME_TYPE_CHECKING_EXCLUDE', 'calcipy.tasks.doc')
+    assert runtime_type_checking_scope(config_path) == (['calcipy.tasks', 'calcipy.cli'], ['calcipy.tasks.doc'])
+
+
+@pytest.mark.parametrize(
+    ('config', 'match', 'expected'),
+    [
+        (
+            {'include': 5, 'exclude': ['calcipy.md_writer']},
+            r'"runtime_type_checking\.include" .* list of strings: 5',
+            (['calcipy'], ['calcipy.md_writer']),
+        ),
+        (
+            {'include': ['calcipy.tasks'], 'exclude': [None]},
+            r'"runtime_type_checking\.exclude" .* list of strings: \[None\]',
+            (['calcipy.tasks'], []),
+        ),
+        ('calcipy', r'"runtime_type_checking" .* must be an object', (['calcipy'], [])),
+    ],
+)
+def test_runtime_type_checking_scope_invalid(tmp_path, monkeypatch, config, match, expected):
+    config_path = tmp_path / '.calcipy.json'
+    monkeypatch.delenv('RUNTIME_TYPE_CHECKING_INCLUDE', raising=False)
+    monkeypatch.delenv('RUNTIME_TYPE_CHECKING_EXCLUDE', raising=False)
+    config_path.write_text(json.dumps({'runtime_type_checking': config}))
+
+    with pytest.warns(UserWarning, match=match):
+        assert runtime_type_checking_scope(config_path) == expected
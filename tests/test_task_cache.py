@@ -0,0 +1,75 @@
+import os
+
+from calcipy.task_cache import CachedOutput, FileHasher, ResultCache, fingerprint, list_input_files
+
+
+def _fingerprint(tmp_path, hasher, **kwargs):
+    return fingerprint('pkg.task', ['**/*.py'], base_dir=tmp_path, hasher=hasher, extra=kwargs)
+
+
+def test_list_input_files(tmp_path):
+    (tmp_path / 'sub').mkdir()
+    (tmp_path / 'sub' / 'mod.py').write_text('')
+    (tmp_path / 'data.txt').write_text('')
+
+    result = list_input_files(tmp_path, ['**/*.py'])
+
+    assert result == [tmp_path / 'sub' / 'mod.py']
+
+
+def test_list_input_files_anchored(tmp_path):
+    for rel in ('top.py', 'sub/mod.py', 'sub/tests/test_x.py', 'tests/test_y.py', '.venv/lib/site.py'):
+        (tmp_path / rel).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / rel).write_text('')
+
+    assert list_input_files(tmp_path, ['*.py']) == [tmp_path / 'top.py']
+    assert list_input_files(tmp_path, ['tests/**']) == [tmp_path / 'tests' / 'test_y.py']
+    assert '.venv' not in {path.parts[len(tmp_path.parts)] for path in list_input_files(tmp_path, ['**/*.py'])}
+
+
+def test_fingerprint(tmp_path):
+    path_py = tmp_path / 'mod.py'
+    path_py.write_text('a = 1')
+    hasher = FileHasher(tmp_path / 'index.json')
+
+    initial = _fingerprint(tmp_path, hasher)
+    (tmp_path / 'notes.txt').write_text('not an input')
+
+    assert _fingerprint(tmp_path, FileHasher(tmp_path / 'index.json')) == initial
+    assert _fingerprint(tmp_path, hasher, keyword='other') != initial
+    path_py.write_text('a = 2')
+    assert _fingerprint(tmp_path, hasher) != initial
+
+
+def test_fingerprint_environment(tmp_path, monkeypatch):
+    (tmp_path / 'mod.py').write_text('a = 1')
+    hasher = FileHasher(tmp_path / 'index.json')
+    monkeypatch.delenv('PYTEST_ADDOPTS', raising=False)
+
+    initial = _fingerprint(tmp_path, hasher)
+    monkeypatch.setenv('UNRELATED_VARIABLE', 'x')
+    assert _fingerprint(tmp_path, hasher) == initial
+    monkeypatch.setenv('PYTEST_ADDOPTS', '-x')
+    assert _fingerprint(tmp_path, hasher) != initial
+
+
+def test_result_cache(tmp_path):
+    cache = ResultCache(tmp_path)
+    outputs = [CachedOutput(command='ruff check', stdout='All checks passed!\n', stderr='')]
+
+    cache.store('abc', outputs)
+
+    assert cache.load('abc') == outputs
+    assert cache.load('missing') is None
+
+
+def test_result_cache_evicts_least_recently_used(tmp_path):
+    cache = ResultCache(tmp_path, max_bytes=150)
+    output = CachedOutput(command='cmd', stdout='x' * 50, stderr='')
+    cache.store('old', [output])
+    os.utime(tmp_path / 'results' / 'old.json', ns=(0, 0))
+
+    cache.store('new', [output])
+
+    assert cache.load('old') is None
+    assert cache.load('new') == [output]
@@ -0,0 +1,75 @@
+import pytest
+from invoke.exceptions import Exit
+from invoke.program import Program
+
+from calcipy import __pkg_name__, __version__
+from calcipy.collection import LazyTask
+from calcipy.task_manifest import build_manifest, print_task_list, read_manifest, try_fast_path
+from calcipy.tasks.all_tasks import ns
+
+
+def test_manifest_is_current():
+    assert read_manifest() == build_manifest(), 'Regenerate with: python -m calcipy.task_manifest'
+
+
+def test_print_task_list_matches_invoke(capsys, monkeypatch):
+    monkeypatch.setattr('calcipy.task_manifest._terminal_width', lambda: 80)
+    monkeypatch.setattr('invoke.program.pty_size', lambda: (80, 24))
+    Program(namespace=ns).run(['calcipy', '--list'], exit=False)
+    expected = capsys.readouterr().out
+
+    print_task_list(build_manifest())
+
+    assert capsys.readouterr().out == expected
+
+
+def test_try_fast_path(capsys):
+    assert try_fast_path(['--complete', '--', 'calcipy', 'lint.'], ['lint'])
+    assert capsys.readouterr().out.splitlines()[:2] == ['lint.check', 'lint']
+    assert not try_fast_path(['--complete', '--', 'calcipy', 'lint.check', '--'])
+    assert not try_fast_path(['lint.check'])
+    assert not try_fast_path(['--help'])
+
+
+def test_try_fast_path_version_matches_invoke(capsys):
+    Program(name=__pkg_name__, version=__version__, namespace=ns).run(['calcipy', '--version'], exit=False)
+    expected = capsys.readouterr().out
+
+    assert try_fast_path(['--version'])
+    assert try_fast_path(['-V'], ['lint'])
+
+    assert capsys.readouterr().out == expected * 2
+
+
+def test_lazy_task():
+    manifest = read_manifest()
+    assert manifest
+    entry = next(entry for entry in manifest['namespaces']['lint']['tasks'] if entry['name'] == 'fix')
+
+    task = LazyTask(entry)
+
+    assert [arg.name for arg in task.get_arguments()] == ['unsafe']
+    assert task._loaded is None  # noqa: SLF001
+    assert task.calcipy_after == ()
+    assert task == ns.collections['lint'].tasks['fix']
+
+
+@pytest.mark.parametrize(
+    ('error', 'match'),
+    [
+        (RuntimeError("The 'calcipy[doc]' extras are missing"), r"Unable to run 'fix': The 'calcipy\[doc\]' extras"),
+        (ModuleNotFoundError("No module named 'ruff'"), r"No module named 'ruff'\. Install the missing extras"),
+    ],
+)
+def test_lazy_task_missing_extras(monkeypatch, error, match):
+    manifest = read_manifest()
+    assert manifest
+    entry = next(entry for entry in manifest['namespaces']['lint']['tasks'] if entry['name'] == 'fix')
+
+    def raise_error(_name):
+        raise error
+
+    monkeypatch.setattr('calcipy.collection.importlib.import_module', raise_error)
+
+    with pytest.raises(Exit, match=match):
+        LazyTask(entry).load()
@@ -0,0 +1,20 @@
+import json
+
+from calcipy.tracing import Tracer
+
+
+def test_tracer(tmp_path):
+    tracer = Tracer()
+    path_trace = tmp_path / 'trace.json'
+
+    with tracer.span('outer', 'task', kwargs={'keyword': 'test'}), tracer.span('echo', 'run'):
+        pass
+    tracer.write(path_trace)
+
+    events = json.loads(path_trace.read_text())['traceEvents']
+    spans = [event for event in events if event['ph'] == 'X']
+    assert [event['name'] for event in spans] == ['echo', 'outer']
+    assert spans[1]['args']['kwargs'] == "{'keyword': 'test'}"
+    assert {'wall_s', 'cpu_s'} <= set(spans[1]['args'])
+    assert 'child_peak_rss_kb' not in spans[1]['args']
+    assert any(event['ph'] == 'M' for event in events)